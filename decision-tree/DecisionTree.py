@@ -1,6 +1,16 @@
+import heapq
+import itertools
+import json
+import os
+import struct
+import warnings
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
 import numpy as np
-from collections import Counter
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+
+from metrics import classification_metrics, sklearn_metrics
 
 # Function to calculate entropy
 def entropy(y):
@@ -14,12 +24,27 @@ def entropy(y):
     Returns:
     float: Entropy value.
     """
-    class_labels = np.unique(y)
-    entropy_val = 0
-    for label in class_labels:
-        p = len(y[y == label]) / len(y)
-        entropy_val += -p * np.log2(p)
-    return entropy_val
+    _, counts = np.unique(y, return_counts=True)
+    return entropy_from_counts(counts)
+
+# Function to calculate entropy from class counts
+def entropy_from_counts(counts):
+    """
+    Calculate entropy from class-count vectors.
+    Works on the last axis, so a whole contingency table (one row of class counts per feature value) is handled at once.
+
+    Args:
+    counts (np.array): Class counts, shape (..., n_classes).
+
+    Returns:
+    np.array or float: Entropy of every count vector. Empty count vectors have entropy 0.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    totals = counts.sum(axis=-1, keepdims=True)
+    p = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(p > 0, -p * np.log2(p), 0.0)
+    return terms.sum(axis=-1)
 
 # Function to calculate information gain for a feature
 def information_gain(X, y, feature_idx):
@@ -35,116 +60,1409 @@ def information_gain(X, y, feature_idx):
     Returns:
     float: Information gain for the feature.
     """
-    # Entropy of the original dataset
-    original_entropy = entropy(y)
+    _, value_codes = np.unique(X[:, feature_idx], return_inverse=True)
+    classes, y_codes = np.unique(y, return_inverse=True)
+
+    # Contingency table: one row of class counts per feature value
+    n_values = value_codes.max() + 1
+    counts = np.bincount(value_codes * len(classes) + y_codes, minlength=n_values * len(classes))
+    return contingency_gains(counts.reshape(n_values, len(classes)))
+
+# Function to calculate information gain from contingency tables
+def contingency_gains(counts):
+    """
+    Calculate the Information Gain of splitting on a feature from its contingency table.
+    Works on the last two axes, so the tables of several features (or several nodes) are handled at once.
+
+    Args:
+    counts (np.array): Class counts per feature value, shape (..., n_values, n_classes).
+
+    Returns:
+    np.array or float: Entropy of the pooled class counts minus the weighted entropy of every value's class counts.
+                       Empty tables have a gain of 0.
+    """
+    counts = np.asarray(counts)
+    value_totals = counts.sum(axis=-1)
+    n = value_totals.sum(axis=-1)
+    weighted_entropy = np.divide((value_totals * entropy_from_counts(counts)).sum(axis=-1), n,
+                                 out=np.zeros(np.shape(n)), where=n > 0)
+    return entropy_from_counts(counts.sum(axis=-2)) - weighted_entropy
+
+# Function to encode a feature matrix as integer value codes
+def encode_features(X):
+    """
+    Encode every feature as integer codes into its sorted distinct values.
+    Codes of feature f are shifted by offsets[f], so every (feature, value) pair gets its own slot in one flat range.
+
+    Args:
+    X (np.array): Feature matrix.
+
+    Returns:
+    tuple: (codes (np.array of shape (n_samples, n_features)), list of value arrays per feature,
+            offsets (np.array of length n_features + 1)).
+    """
+    # Codes never exceed the total number of distinct values, which is at most n_samples * n_features
+    codes = np.empty(X.shape, dtype=np.int32 if X.size < 2**31 else np.int64)
+    values = []
+    for f in range(X.shape[1]):
+        values_f, codes[:, f] = np.unique(X[:, f], return_inverse=True)
+        values.append(values_f)
+    offsets = np.concatenate(([0], np.cumsum([len(v) for v in values])))
+    codes += offsets[:-1]
+    return codes, values, offsets
+
+# Function to calculate the information gain of every feature at once
+def split_gains(codes, y_codes, offsets, n_classes, rows=None, chunk_size=16384, features=None, min_samples_leaf=1):
+    """
+    Calculate the Information Gain of every feature in a single pass.
+    Builds the class-count contingency tables of all features with np.bincount on combined (value, label) codes
+    and derives every feature's gain from them. Rows are gathered in chunks, so the temporaries stay bounded in size.
+    Nodes with fewer (row, feature) codes than there are feature values only count the values they contain, so small
+    nodes deep in the tree do not pay for every distinct value of every feature.
+
+    Args:
+    codes (np.array): Offset value codes from encode_features, shape (n_samples, n_features).
+    y_codes (np.array): Integer class codes in [0, n_classes).
+    offsets (np.array): Feature offsets from encode_features (or a slice of them, together with the matching
+                        columns of codes).
+    n_classes (int): Number of classes.
+    rows (np.array): Indices of the samples at this node (all samples if None).
+    chunk_size (int): Number of rows per bincount pass.
+    features (np.array): Columns of codes to score (all columns if None).
+    min_samples_leaf (int): Features whose split would leave a branch with fewer samples get a gain of -inf.
+
+    Returns:
+    tuple: (gains (np.array of shape (n_features,)), number of distinct values per feature at this node,
+            contingency table (np.array of shape (total_values, n_classes)), or for small nodes one row per value
+            present at the node, in code order).
+    """
+    if rows is None:
+        rows = np.arange(len(y_codes))
+    if features is not None and np.all(np.diff(features) == 1):
+        # A contiguous range of columns is a cheap view
+        first, last = features[0], features[-1] + 1
+        codes, offsets, features = codes[:, first:last], offsets[first:last + 1], None
+    if features is None:
+        shift = offsets[0]  # Codes of the first feature in the slice start here
+        offsets = offsets - shift
+    else:
+        # Pack the selected features' code ranges next to each other
+        sizes = offsets[np.asarray(features) + 1] - offsets[features]
+        local = np.concatenate(([0], np.cumsum(sizes)))
+        shift = offsets[features] - local[:-1]
+        offsets = local
+    n_columns = len(offsets) - 1
+    if len(rows) * n_columns < offsets[-1]:
+        # Small node: fewer codes than (feature, value) slots, so count only the values present here instead of
+        # zero-filling the table of every value of every feature. The gathered block is smaller than that table.
+        block = codes[rows] if features is None else codes[rows[:, None], features]
+        present, inverse = np.unique((block - shift).astype(np.int64, copy=False), return_inverse=True)
+        flat = (inverse.reshape(block.shape) * n_classes + y_codes[rows, None]).ravel()
+        counts = np.bincount(flat, minlength=len(present) * n_classes).reshape(len(present), n_classes)
+        offsets = np.searchsorted(present, offsets)  # Every feature has a value at the node, so no range is empty
+    else:
+        counts = np.zeros(offsets[-1] * n_classes, dtype=np.int64)
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            block = codes[chunk] if features is None else codes[chunk[:, None], features]
+            flat = ((block - shift).astype(np.int64, copy=False) * n_classes + y_codes[chunk, None]).ravel()
+            counts += np.bincount(flat, minlength=len(counts))
+        counts = counts.reshape(offsets[-1], n_classes)
+
+    value_totals = counts.sum(axis=1)
+    parent_entropy = entropy_from_counts(counts[offsets[0]:offsets[1]].sum(axis=0))
+    weighted_entropy = np.add.reduceat(value_totals * entropy_from_counts(counts), offsets[:-1]) / len(rows)
+    n_present = np.add.reduceat(value_totals > 0, offsets[:-1])
+    gains = parent_entropy - weighted_entropy
+    if min_samples_leaf > 1:
+        smallest = np.minimum.reduceat(np.where(value_totals > 0, value_totals, len(rows)), offsets[:-1])
+        gains[smallest < min_samples_leaf] = -np.inf
+    return gains, n_present, counts
+
+# Function to pre-bin continuous features
+def bin_features(X, max_bins=256):
+    """
+    Discretize every feature into at most max_bins quantile bins stored as uint8.
+    A value x falls into bin b when thresholds[b - 1] < x <= thresholds[b], so a split "bin <= b" is the same as the
+    raw-value test "x <= thresholds[b]".
+
+    Args:
+    X (np.array): Feature matrix.
+    max_bins (int): Maximum number of bins per feature (at most 256).
+
+    Returns:
+    tuple: (binned (np.array of uint8, shape (n_samples, n_features)), list of threshold arrays per feature).
+    """
+    if not 2 <= max_bins <= 256:
+        raise ValueError("max_bins must be between 2 and 256")
+    thresholds = [bin_edges(X[:, f], max_bins) for f in range(X.shape[1])]
+    return apply_bins(X, thresholds), thresholds
+
+# Function to find the bin thresholds of one feature
+def bin_edges(column, max_bins=256):
+    """
+    Calculate the bin thresholds of one feature (see bin_features).
+
+    Args:
+    column (np.array): Values of the feature.
+    max_bins (int): Maximum number of bins.
+
+    Returns:
+    np.array: Sorted thresholds, at most max_bins - 1 of them.
+    """
+    distinct = np.unique(column)
+    if len(distinct) <= max_bins:
+        # Few distinct values: one bin per value, split halfway between neighbours
+        return (distinct[:-1] + distinct[1:]) / 2
+    return np.unique(np.quantile(column, np.linspace(0, 1, max_bins + 1)[1:-1]))
+
+# Function to bin rows with known thresholds
+def apply_bins(X, thresholds):
+    """
+    Bin the rows of X with thresholds from bin_features.
+
+    Args:
+    X (np.array): Feature matrix.
+    thresholds (list): Threshold array of every feature.
+
+    Returns:
+    np.array: Binned feature matrix of uint8.
+    """
+    binned = np.empty(X.shape, dtype=np.uint8)
+    for f, edges in enumerate(thresholds):
+        binned[:, f] = np.searchsorted(edges, X[:, f], side='left')
+    return binned
+
+# Function to iterate over arrays in chunks
+def iter_chunks(X, y, chunk_size=65536):
+    """
+    Yield (X, y) in consecutive row chunks, reading each chunk into memory only when it is reached
+    (e.g. from np.memmap arrays).
+
+    Args:
+    X (np.array): Feature matrix.
+    y (np.array): Target variable.
+    chunk_size (int): Number of rows per chunk.
+
+    Yields:
+    tuple: (X chunk, y chunk) as in-memory arrays.
+    """
+    for start in range(0, len(X), chunk_size):
+        yield np.asarray(X[start:start + chunk_size]), np.asarray(y[start:start + chunk_size])
+
+# Function to build per-feature class histograms of binned data
+def bin_histogram(binned, y_codes, n_classes, n_bins=256, rows=None, chunk_size=16384):
+    """
+    Count the samples of every class in every bin of every feature.
+    Rows are processed in chunks so the temporary combined codes stay bounded in size.
+
+    Args:
+    binned (np.array): Binned feature matrix from bin_features.
+    y_codes (np.array): Integer class codes in [0, n_classes).
+    n_classes (int): Number of classes.
+    n_bins (int): Number of bin slots per feature.
+    rows (np.array): Indices of the samples to count (all samples if None).
+    chunk_size (int): Number of rows per bincount pass.
+
+    Returns:
+    np.array: Histogram of shape (n_features, n_bins, n_classes).
+    """
+    if rows is None:
+        rows = np.arange(len(y_codes))
+    n_features = binned.shape[1]
+    feature_offsets = np.arange(n_features, dtype=np.int64) * n_bins
+    hist = np.zeros(n_features * n_bins * n_classes, dtype=np.int64)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        flat = (binned[chunk] + feature_offsets) * n_classes + y_codes[chunk, None]
+        hist += np.bincount(flat.ravel(), minlength=len(hist))
+    return hist.reshape(n_features, n_bins, n_classes)
+
+# Function to find the best binary threshold split from a histogram
+def threshold_gains(hist, min_samples_leaf=1):
+    """
+    Calculate the Information Gain of every "bin <= b" split of every feature with a cumulative histogram scan.
+
+    Args:
+    hist (np.array): Histogram of shape (n_features, n_bins, n_classes) from bin_histogram.
+    min_samples_leaf (int): Minimum number of samples on each side of a split.
+
+    Returns:
+    np.array: Gains of shape (n_features, n_bins - 1); splits leaving a side with fewer than min_samples_leaf
+              samples (or empty) get -inf.
+    """
+    left = np.cumsum(hist, axis=1)[:, :-1]
+    total = hist.sum(axis=1, keepdims=True)
+    right = total - left
+    n_left = left.sum(axis=2)
+    n_right = right.sum(axis=2)
+    n = total.sum(axis=2)
+    parent_entropy = entropy_from_counts(total)
+    gains = parent_entropy - (n_left * entropy_from_counts(left) + n_right * entropy_from_counts(right)) / n
+    gains[(n_left < max(min_samples_leaf, 1)) | (n_right < max(min_samples_leaf, 1))] = -np.inf
+    return gains
 
-    # Values and corresponding counts for the feature
-    values, counts = np.unique(X[:, feature_idx], return_counts=True)
+# Flat array representation of a fitted tree
+class FlatTree:
+    """
+    A decision tree stored as flat NumPy arrays, one entry per node (the root is node 0).
+
+    Node arrays:
+    feature (int32): Feature tested at the node, -1 for leaves.
+    threshold (float64): Threshold of a binary node ("x <= threshold" goes left), NaN otherwise.
+    left, right (int32): Children of a binary node, -1 otherwise.
+    branch_start, branch_count (int32): Slice of the branch tables holding a multiway node's branches (count 0 otherwise).
+    value (int32): Class code predicted at the node (the majority class for internal nodes).
+    n_samples (int64): Number of training samples that reached the node.
+    impurity (float64): Entropy of the class distribution of those samples.
+
+    Branch tables (one entry per branch of a multiway node, values sorted within each node's slice):
+    branch_values (float64): Feature value of the branch.
+    branch_children (int32): Child node of the branch.
+    """
+    NODE_ARRAYS = ("feature", "threshold", "left", "right", "branch_start", "branch_count", "value", "n_samples",
+                   "impurity")
+    ARRAYS = NODE_ARRAYS + ("branch_values", "branch_children")
+
+    def __init__(self):
+        # Nodes are appended to lists while the tree grows, then frozen into arrays by finalize()
+        self.lists = {name: [] for name in self.NODE_ARRAYS}
+        self.branch_lists = {"branch_values": [], "branch_children": []}
+        self.class_counts = {}  # Node -> class counts, turned into value/n_samples/impurity by finalize()
+
+    def add_node(self):
+        """Append a new leaf node and return its id."""
+        for name, default in zip(self.NODE_ARRAYS, (-1, np.nan, -1, -1, 0, 0, -1, 0, 0.0)):
+            self.lists[name].append(default)
+        return len(self.lists["feature"]) - 1
+
+    def set_class_counts(self, node, class_counts):
+        """Set the class counts of a node's training samples, from which its prediction and statistics are derived."""
+        self.class_counts[node] = class_counts
+
+    def set_threshold_split(self, node, feature, threshold):
+        """Turn a node into a binary split and return the ids of its (left, right) children."""
+        left, right = self.add_node(), self.add_node()
+        self.lists["feature"][node] = feature
+        self.lists["threshold"][node] = threshold
+        self.lists["left"][node] = left
+        self.lists["right"][node] = right
+        return left, right
+
+    def set_multiway_split(self, node, feature, values):
+        """Turn a node into a multiway split over sorted values and return the ids of its children."""
+        children = [self.add_node() for _ in values]
+        self.lists["feature"][node] = feature
+        self.lists["branch_start"][node] = len(self.branch_lists["branch_values"])
+        self.lists["branch_count"][node] = len(values)
+        self.branch_lists["branch_values"].extend(values)
+        self.branch_lists["branch_children"].extend(children)
+        return children
+
+    def graft(self, node, subtree):
+        """
+        Replace the leaf `node` with a finalized subtree (whose root is its node 0), renumbering the subtree's nodes.
+
+        Args:
+        node (int): Id of the leaf to replace.
+        subtree (FlatTree): Finalized subtree.
+        """
+        base = len(self.lists["feature"]) - 1
+        new_ids = np.arange(subtree.n_nodes) + base
+        new_ids[0] = node
+
+        def remap(children):
+            return np.where(children >= 0, new_ids[np.maximum(children, 0)], -1)
+
+        arrays = {name: getattr(subtree, name) for name in self.NODE_ARRAYS}
+        arrays["left"], arrays["right"] = remap(arrays["left"]), remap(arrays["right"])
+        arrays["branch_start"] = arrays["branch_start"] + len(self.branch_lists["branch_values"])
+        for name, values in arrays.items():
+            self.lists[name][node] = values[0].item()
+            self.lists[name].extend(values[1:].tolist())
+        self.branch_lists["branch_values"].extend(subtree.branch_values.tolist())
+        self.branch_lists["branch_children"].extend(remap(subtree.branch_children).tolist())
+
+    def finalize(self):
+        """Freeze the node lists into NumPy arrays."""
+        dtypes = {"threshold": np.float64, "n_samples": np.int64, "impurity": np.float64}
+        for name, items in self.lists.items():
+            setattr(self, name, np.array(items, dtype=dtypes.get(name, np.int32)))
+        self.branch_values = np.array(self.branch_lists["branch_values"], dtype=np.float64)
+        self.branch_children = np.array(self.branch_lists["branch_children"], dtype=np.int32)
+        if self.class_counts:
+            # Derive the statistics of all nodes at once
+            nodes = np.fromiter(self.class_counts, dtype=np.int64, count=len(self.class_counts))
+            counts = np.array(list(self.class_counts.values()))
+            self.value[nodes] = counts.argmax(axis=1)
+            self.n_samples[nodes] = counts.sum(axis=1)
+            self.impurity[nodes] = entropy_from_counts(counts)
+        del self.lists, self.branch_lists, self.class_counts
+        return self
+
+    def frozen(self):
+        """Return a finalized copy of a tree that is still growing, leaving this one open for more nodes."""
+        tree = FlatTree()
+        tree.lists = {name: list(items) for name, items in self.lists.items()}
+        tree.branch_lists = {name: list(items) for name, items in self.branch_lists.items()}
+        tree.class_counts = dict(self.class_counts)
+        return tree.finalize()
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def arrays(self):
+        """Return the arrays of a finalized tree by name (see ARRAYS)."""
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Build a finalized tree from its arrays, without copying them (they may be read-only memory maps).
+
+        Args:
+        arrays (dict): Array of every name in ARRAYS.
+
+        Returns:
+        FlatTree: The tree.
+        """
+        tree = cls()
+        del tree.lists, tree.branch_lists, tree.class_counts
+        for name in cls.ARRAYS:
+            setattr(tree, name, arrays[name])
+        return tree
+
+    @classmethod
+    def stack(cls, trees):
+        """
+        Concatenate finalized trees into one FlatTree, so that a single apply() call can route rows through all of them.
+
+        Args:
+        trees (list): Finalized FlatTree objects.
+
+        Returns:
+        tuple: (stacked FlatTree, np.array with the node id of every tree's root in the stacked tree).
+        """
+        roots = np.cumsum([0] + [t.n_nodes for t in trees[:-1]])
+        branch_offsets = np.cumsum([0] + [len(t.branch_values) for t in trees[:-1]])
+        # Node ids and branch table positions of every tree are shifted past those of the trees before it
+        shifts = {"left": roots, "right": roots, "branch_children": roots, "branch_start": branch_offsets}
+
+        arrays = {}
+        for name in cls.ARRAYS:
+            parts = [getattr(t, name) for t in trees]
+            if name in shifts:
+                parts = [np.where(a >= 0, a + shift, a) for a, shift in zip(parts, shifts[name])]
+            arrays[name] = np.concatenate(parts).astype(getattr(trees[0], name).dtype, copy=False)
+        return cls.from_arrays(arrays), roots
+
+    def branch_positions(self, nodes):
+        """
+        Return the branch table positions of the given multiway nodes, and the node owning each of them.
+
+        Args:
+        nodes (np.array): Ids of multiway nodes.
+
+        Returns:
+        tuple: (positions in the branch tables, owner node of every position).
+        """
+        counts = self.branch_count[nodes].astype(np.int64)
+        positions = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + \
+            np.repeat(self.branch_start[nodes], counts)
+        return positions, np.repeat(nodes, counts)
+
+    def parents(self):
+        """Return the parent of every node (-1 for the root)."""
+        parent = np.full(self.n_nodes, -1, dtype=np.int64)
+        binary = np.flatnonzero((self.feature >= 0) & (self.branch_count == 0))
+        parent[self.left[binary]] = binary
+        parent[self.right[binary]] = binary
+        positions, owners = self.branch_positions(np.flatnonzero(self.branch_count > 0))
+        parent[self.branch_children[positions]] = owners
+        return parent
+
+    def pruning_path(self):
+        """
+        Compute the minimal cost-complexity pruning sequence by weakest-link pruning.
+        The cost of a node is R(t) = n_samples(t) / n_samples(root) * impurity(t) and the cost of a subtree is the
+        sum over its leaves. Each step collapses the internal node with the smallest effective alpha
+        (R(t) - R(subtree of t)) / (leaves of t - 1), until only the root is left.
+
+        Returns:
+        tuple: (alphas (np.array, the effective alpha of every step, starting with 0 for the full tree),
+                impurities (np.array, total leaf cost after every step),
+                pruned (np.array, node collapsed at every step, -1 for the first entry)).
+        """
+        parent = self.parents().tolist()
+        cost = (self.n_samples / max(self.n_samples[0], 1) * self.impurity).tolist()
+        internal = (self.feature >= 0).tolist()
+        leaves = [0 if is_internal else 1 for is_internal in internal]
+        subtree_cost = [0.0 if is_internal else c for is_internal, c in zip(internal, cost)]
+        for node in range(self.n_nodes - 1, 0, -1):  # Children always come after their parent
+            leaves[parent[node]] += leaves[node]
+            subtree_cost[parent[node]] += subtree_cost[node]
+
+        def alpha(node):
+            return (cost[node] - subtree_cost[node]) / (leaves[node] - 1)
+
+        # Heap entries go stale when a descendant is collapsed; the version counter detects them
+        version = [0] * self.n_nodes
+        heap = [(alpha(node), node, 0) for node in range(self.n_nodes) if internal[node]]
+        heapq.heapify(heap)
+        collapsed = [False] * self.n_nodes
+        alphas, impurities, pruned = [0.0], [subtree_cost[0]], [-1]
+        while heap:
+            node_alpha, node, node_version = heapq.heappop(heap)
+            if node_version != version[node] or collapsed[node]:
+                continue
+            ancestor = parent[node]
+            while ancestor >= 0 and not collapsed[ancestor]:
+                ancestor = parent[ancestor]
+            if ancestor >= 0:
+                continue  # Already removed with a collapsed ancestor
+
+            cost_change, leaves_removed = cost[node] - subtree_cost[node], leaves[node] - 1
+            collapsed[node] = True
+            subtree_cost[node], leaves[node] = cost[node], 1
+            ancestor = parent[node]
+            while ancestor >= 0:
+                subtree_cost[ancestor] += cost_change
+                leaves[ancestor] -= leaves_removed
+                version[ancestor] += 1
+                heapq.heappush(heap, (alpha(ancestor), ancestor, version[ancestor]))
+                ancestor = parent[ancestor]
+            alphas.append(max(node_alpha, alphas[-1]))  # Effective alphas of the sequence never decrease
+            impurities.append(subtree_cost[0])
+            pruned.append(node)
+        return np.array(alphas), np.array(impurities), np.array(pruned, dtype=np.int64)
+
+    def collapse(self, nodes):
+        """
+        Return a copy of the tree in which the given nodes are leaves, without the nodes below them.
+
+        Args:
+        nodes (np.array): Ids of the nodes to turn into leaves.
+
+        Returns:
+        FlatTree: The pruned tree, with nodes renumbered in their original order.
+        """
+        parent = self.parents()
+        collapsed = np.zeros(self.n_nodes, dtype=bool)
+        collapsed[nodes] = True
+        removed = np.zeros(self.n_nodes, dtype=bool)
+        for node in range(1, self.n_nodes):  # Parents come first, so their flags are final
+            removed[node] = removed[parent[node]] or collapsed[parent[node]]
+        keep = ~removed
+        new_ids = np.cumsum(keep) - 1
 
-    # Weighted entropy of each subset
-    weighted_entropy = 0
-    for i, val in enumerate(values):
-        subset_y = y[X[:, feature_idx] == val]
-        weighted_entropy += (counts[i] / np.sum(counts)) * entropy(subset_y)
+        arrays = {name: getattr(self, name)[keep].copy() for name in self.NODE_ARRAYS}
+        leaf = collapsed[keep] | (arrays["feature"] < 0)
+        arrays["feature"][leaf] = -1
+        arrays["threshold"][leaf] = np.nan
+        for name in ("left", "right"):
+            children = arrays[name]
+            arrays[name] = np.where(leaf | (children < 0), -1, new_ids[np.maximum(children, 0)]).astype(np.int32)
+
+        # Keep the branch table entries of multiway nodes that are still split; their slices stay contiguous
+        used = np.zeros(len(self.branch_values), dtype=bool)
+        used[self.branch_positions(np.flatnonzero((self.branch_count > 0) & keep & ~collapsed))[0]] = True
+        new_positions = np.cumsum(used) - 1
+        arrays["branch_count"][leaf] = 0
+        multi = arrays["branch_count"] > 0
+        arrays["branch_start"][~multi] = 0
+        arrays["branch_start"][multi] = new_positions[arrays["branch_start"][multi]]
+        arrays["branch_values"] = self.branch_values[used]
+        arrays["branch_children"] = new_ids[self.branch_children[used]].astype(np.int32)
+        return FlatTree.from_arrays(arrays)
+
+    def apply(self, X, roots=None, rows=None):
+        """
+        Route every row of X down the tree, advancing all rows one level at a time with array operations.
+
+        Args:
+        X (np.array): Feature matrix.
+        roots (np.array): Start node of every item (node 0 if None).
+        rows (np.array): Row of X routed by every item, so one row can be routed from several roots
+                         (every row of X once if None).
+
+        Returns:
+        tuple: (node reached by every item, boolean mask of items that stopped at a multiway node because their
+                value had no branch).
+        """
+        n_items = len(X) if rows is None else len(rows)
+        nodes = np.zeros(n_items, dtype=np.int64) if roots is None else np.array(roots, dtype=np.int64)
+        missed = np.zeros(n_items, dtype=bool)
+        active = np.flatnonzero(self.feature[nodes] >= 0)
+        while active.size:
+            node = nodes[active]
+            x = X[active if rows is None else rows[active], self.feature[node]]
+            count = self.branch_count[node]
+
+            # Binary nodes
+            binary = count == 0
+            nodes[active[binary]] = np.where(x[binary] <= self.threshold[node[binary]],
+                                             self.left[node[binary]], self.right[node[binary]])
+
+            # Multiway nodes: binary search of the value inside each node's slice of the branch table
+            multi = ~binary
+            if multi.any():
+                x_multi = x[multi]
+                lo = self.branch_start[node[multi]].astype(np.int64)
+                hi = lo + count[multi]
+                end = hi.copy()
+                while True:
+                    searching = lo < hi
+                    if not searching.any():
+                        break
+                    mid = (lo + hi) // 2
+                    go_right = searching & (self.branch_values[np.minimum(mid, len(self.branch_values) - 1)] < x_multi)
+                    lo = np.where(go_right, mid + 1, lo)
+                    hi = np.where(searching & ~go_right, mid, hi)
+                found = lo < end
+                found[found] = self.branch_values[lo[found]] == x_multi[found]
+                items = active[multi]
+                nodes[items[found]] = self.branch_children[lo[found]]
+                missed[items[~found]] = True
+
+            active = active[~missed[active]]
+            active = active[self.feature[nodes[active]] >= 0]
+        return nodes, missed
+
+    def to_dict(self, classes):
+        """
+        Convert the tree to nested dicts: {feature: {value: subtree}} for multiway nodes,
+        {"feature", "threshold", "left", "right"} for binary nodes, and the class label for leaves.
+
+        Args:
+        classes (np.array): Class labels indexed by class code.
+
+        Returns:
+        dict or label: The tree structure.
+        """
+        def label(node):
+            return classes[self.value[node]]
 
-    # Information gain
-    return original_entropy - weighted_entropy
+        if self.feature[0] < 0:
+            return label(0)
+        root = {}
+        stack = [(0, root, "tree")]
+        while stack:
+            node, parent, key = stack.pop()
+            if self.feature[node] < 0:
+                parent[key] = label(node)
+            elif self.branch_count[node] == 0:
+                subtree = {"feature": self.feature[node], "threshold": self.threshold[node], "left": None, "right": None}
+                stack.append((self.left[node], subtree, "left"))
+                stack.append((self.right[node], subtree, "right"))
+                parent[key] = subtree
+            else:
+                branches = {}
+                start = self.branch_start[node]
+                for i in range(start, start + self.branch_count[node]):
+                    branches[self.branch_values[i]] = None
+                    stack.append((self.branch_children[i], branches, self.branch_values[i]))
+                parent[key] = {self.feature[node]: branches}
+        return root["tree"]
+
+# Arrays in shared memory for worker processes
+class SharedArrays:
+    """
+    Copies NumPy arrays into shared memory so that worker processes can map them instead of receiving pickled copies.
+    Writes by any process are visible to all of them.
+    """
+    def __init__(self, **arrays):
+        self.blocks = []
+        self.arrays = {}
+        self.specs = {}
+        for name, array in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            view[...] = array
+            self.blocks.append(block)
+            self.arrays[name] = view
+            self.specs[name] = (block.name, array.shape, array.dtype.str)
+
+    @staticmethod
+    def attach(specs):
+        """
+        Map arrays created by another process (a worker of the creating process, which owns and unlinks the blocks).
+
+        Args:
+        specs (dict): The `specs` attribute of the creating SharedArrays.
+
+        Returns:
+        tuple: (dict of arrays, list of shared memory blocks that must be kept alive while the arrays are used).
+        """
+        arrays, blocks = {}, []
+        for name, (block_name, shape, dtype) in specs.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+            blocks.append(block)
+        return arrays, blocks
+
+    def close(self):
+        """Release and delete the shared memory blocks."""
+        self.arrays.clear()
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+# Binary model format
+MODEL_MAGIC = b"DTMODEL\0"
+MODEL_VERSION = 1
+MODEL_ALIGN = 64  # Alignment of the header end and of every array in the file
+
+def save_model(path, kind, params, arrays):
+    """
+    Write a model as named arrays plus JSON parameters.
+    Layout: magic, little-endian uint64 header size, JSON header (format version, model kind, parameters, and dtype,
+    shape and offset of every array, CRC32 of the data section), then the raw array data with every array aligned to
+    MODEL_ALIGN bytes, so the file can be memory-mapped and used in place by any number of processes.
+
+    Args:
+    path (str): File to write.
+    kind (str): Model class name, checked by load_model.
+    params (dict): JSON-serializable model parameters.
+    arrays (dict): Arrays to store; object arrays are not supported.
+    """
+    specs, blocks, offset, crc = {}, [], 0, 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype.hasobject:
+            raise ValueError(f"cannot save {name}: arrays of Python objects are not supported")
+        padding = -array.nbytes % MODEL_ALIGN
+        data = array.reshape(-1).view(np.uint8)
+        crc = zlib.crc32(bytes(padding), zlib.crc32(data, crc))
+        specs[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        blocks.append((data, padding))
+        offset += array.nbytes + padding
+
+    header = json.dumps({"version": MODEL_VERSION, "kind": kind, "params": params, "arrays": specs,
+                         "data_size": offset, "crc32": crc}).encode()
+    header += b" " * (-(len(MODEL_MAGIC) + 8 + len(header)) % MODEL_ALIGN)  # The data starts aligned
+    with open(path, "wb") as f:
+        f.write(MODEL_MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for data, padding in blocks:
+            f.write(data)
+            f.write(bytes(padding))
+
+def load_model(path, kind, mmap=True, verify=True):
+    """
+    Read a model written by save_model.
+
+    Args:
+    path (str): File to read.
+    kind (str): Expected model class name.
+    mmap (bool): Memory-map the arrays read-only instead of reading them into memory. Mapped pages are shared by
+                 all processes that load the same file.
+    verify (bool): Check the CRC32 of the data section (this reads the whole file).
+
+    Returns:
+    tuple: (params dict, dict of arrays).
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MODEL_MAGIC)) != MODEL_MAGIC:
+            raise ValueError(f"{path} is not a model file")
+        (header_size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_size))
+    if header["version"] > MODEL_VERSION:
+        raise ValueError(f"{path} has format version {header['version']}, this code reads up to {MODEL_VERSION}")
+    if header["kind"] != kind:
+        raise ValueError(f"{path} holds a {header['kind']}, not a {kind}")
+
+    start, size = len(MODEL_MAGIC) + 8 + header_size, header["data_size"]
+    if os.path.getsize(path) < start + size:
+        raise ValueError(f"{path} is truncated")
+    if mmap and size:
+        data = np.memmap(path, dtype=np.uint8, mode="r", offset=start, shape=(size,))
+    else:
+        data = np.fromfile(path, dtype=np.uint8, count=size, offset=start)
+    if verify and zlib.crc32(data) != header["crc32"]:
+        raise ValueError(f"{path} is corrupted: checksum mismatch")
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        nbytes = int(np.prod(spec["shape"])) * dtype.itemsize
+        arrays[name] = data[spec["offset"]:spec["offset"] + nbytes].view(dtype).reshape(spec["shape"])
+    return header["params"], arrays
+
+# State of a tree-building worker process, set by _init_worker
+_worker = {}
+
+def _init_worker(model, specs):
+    """Initializer of tree-building worker processes: keep the model settings and map the shared arrays."""
+    arrays, blocks = SharedArrays.attach(specs)
+    _worker.update(arrays, model=model, blocks=blocks)
+
+def _worker_gains(start, end, features):
+    """Information gains of the given features for the samples indices[start:end] (multiway mode)."""
+    model, rows = _worker["model"], _worker["indices"][start:end]
+    gains, n_present, _ = split_gains(_worker["data"], _worker["y_codes"], model.offsets, len(model.classes), rows,
+                                      features=features, min_samples_leaf=model.min_samples_leaf)
+    return gains, n_present
+
+def _worker_histogram(start, end, features):
+    """Histogram of a contiguous range of features for the samples indices[start:end] (threshold mode)."""
+    model, rows = _worker["model"], _worker["indices"][start:end]
+    data = _worker["data"][:, features[0]:features[-1] + 1]
+    return bin_histogram(data, _worker["y_codes"], len(model.classes), model.n_bins, rows)
+
+def _worker_subtree(start, end, depth, hist=None, seed=None):
+    """Build the whole subtree of the samples indices[start:end] in this worker and return it as a FlatTree."""
+    model = _worker["model"]
+    model.rng = np.random.default_rng(seed)  # Seeded by the parent, so the result does not depend on scheduling
+    tree = FlatTree()
+    stack = [(tree.add_node(), start, end, depth, hist)]
+    model._grow(tree, _worker["data"], _worker["y_codes"], _worker["indices"], stack)
+    return tree.finalize()
 
 # Decision Tree class
 class DecisionTree:
-    def __init__(self, max_depth=None):
+    def __init__(self, max_depth=None, split="multiway", max_bins=256, n_jobs=1, parallel_min_samples=20000,
+                 max_features=None, random_state=None, min_samples_split=2, min_samples_leaf=1,
+                 min_impurity_decrease=0.0, max_leaf_nodes=None, ccp_alpha=0.0):
         """
         Initialize the Decision Tree classifier.
 
         Args:
         max_depth (int): Maximum depth of the tree. If None, tree grows until all leaves are pure.
+        split (str): "multiway" branches on every distinct feature value; "threshold" pre-bins the features into
+                     quantile bins and makes binary "x <= threshold" splits, which suits continuous features.
+        max_bins (int): Maximum number of bins per feature in threshold mode (at most 256).
+        n_jobs (int): Number of worker processes used by fit (-1 for all cores). Nodes with at least
+                      parallel_min_samples samples have their features scored in parallel; nodes with at most
+                      n_samples / (2 * n_jobs) samples are built as whole subtrees by a worker.
+        parallel_min_samples (int): Smallest node whose split search is spread across the workers.
+        max_features (int, float or str): Number of randomly chosen features scored at each node: an int, a fraction
+                                          of the features, "sqrt", "log2", or None for all of them. If none of the
+                                          chosen features can split the node, the remaining ones are scored too.
+        random_state (int): Seed of the feature sampling.
+        min_samples_split (int): Nodes with fewer samples are not split.
+        min_samples_leaf (int): Splits leaving fewer samples in any branch are not considered.
+        min_impurity_decrease (float): Nodes are only split if the information gain, weighted by the node's share of
+                                       the training samples, is at least this large.
+        max_leaf_nodes (int): Maximum number of leaves. If set, the tree grows best-first (largest weighted impurity
+                              decrease first) instead of depth-first.
+        ccp_alpha (float): Complexity parameter of the minimal cost-complexity pruning applied after fit (see prune).
         """
+        if split not in ("multiway", "threshold"):
+            raise ValueError("split must be 'multiway' or 'threshold'")
+        if max_leaf_nodes is not None and max_leaf_nodes < 2:
+            raise ValueError("max_leaf_nodes must be at least 2")
         self.max_depth = max_depth
-        self.tree = None
+        self.split = split
+        self.max_bins = max_bins
+        self.n_jobs = n_jobs
+        self.parallel_min_samples = parallel_min_samples
+        self.max_features = max_features
+        self.random_state = random_state
+        self.min_samples_split = min_samples_split
+        self.min_samples_leaf = min_samples_leaf
+        self.min_impurity_decrease = min_impurity_decrease
+        self.max_leaf_nodes = max_leaf_nodes
+        self.ccp_alpha = ccp_alpha
+        self.flat_tree = None  # FlatTree built by fit, pruned if ccp_alpha > 0
+        self.full_tree = None  # Unpruned FlatTree built by fit
+        self.pruning_path = None  # Cached result of full_tree.pruning_path()
+        self.default_class = None  # Majority class of the training data, predicted for unseen feature values
+
+    @property
+    def tree(self):
+        """
+        The fitted tree as nested dicts (see FlatTree.to_dict), or None before fit. The dicts are built from the flat
+        arrays on every read, one Python object per node, so read it once rather than in a loop.
+        """
+        return None if self.flat_tree is None else self.flat_tree.to_dict(self.classes)
 
-    def fit(self, X, y, depth=0):
+    def fit(self, X, y):
         """
         Fit the Decision Tree classifier to the data.
-        Recursively builds the tree by choosing the feature with the highest information gain at each node.
+        Builds the tree by choosing the feature with the highest information gain at each node.
+        All nodes share one array of row indices that is partitioned in place, so every node works on a contiguous
+        slice of it instead of a copy of the data, and pending nodes are kept on an explicit work stack instead of
+        the Python call stack.
+
+        Args:
+        X (np.array): Feature matrix.
+        y (np.array): Target variable.
+
+        Returns:
+        DecisionTree: self (the nested-dict form of the tree is the tree property).
+        """
+        data, y_codes = self._prepare(X, y)
+        self._fit_prepared(data, y_codes, np.arange(len(y_codes)))
+        return self
+
+    def _prepare(self, X, y):
+        """
+        Encode the labels, and encode (multiway) or bin (threshold) the features, storing the lookup tables on self.
 
         Args:
         X (np.array): Feature matrix.
         y (np.array): Target variable.
-        depth (int): Current depth of the tree.
 
         Returns:
-        dict or int: The decision tree structure or the predicted class at a leaf node.
+        tuple: (encoded or binned feature matrix, class codes of all samples).
+        """
+        X = np.asarray(X)
+        self.flat_tree = None
+        self.classes, y_codes = np.unique(y, return_inverse=True)
+        self.default_class = self.classes[np.bincount(y_codes).argmax()]
+        self.n_features = X.shape[1]
+        if self.split == "threshold":
+            data, self.thresholds = bin_features(X, self.max_bins)
+            self.n_bins = max(len(t) for t in self.thresholds) + 1  # Histogram width actually needed
+        else:
+            # Encode features once, so every node only needs integer bincounts
+            data, self.feature_values, self.offsets = encode_features(X)
+        return data, y_codes
+
+    def _fit_prepared(self, data, y_codes, indices):
+        """
+        Build the tree from the output of _prepare.
+
+        Args:
+        data (np.array): Encoded (multiway) or binned (threshold) feature matrix.
+        y_codes (np.array): Class codes of all samples.
+        indices (np.array): Rows to train on, partitioned in place. A row may appear several times (bootstrap samples).
         """
-        # Base cases (stopping criteria)
-        if len(np.unique(y)) == 1:  # If all labels are the same
-            return np.unique(y)[0]
-        elif len(y) == 0:
-            return
+        self.rng = np.random.default_rng(self.random_state)
+        self.n_train_samples = len(indices)
+        if self.split == "threshold":
+            root_item = (0, len(indices), 0, bin_histogram(data, y_codes, len(self.classes), self.n_bins, indices))
+        else:
+            root_item = (0, len(indices), 0, None)
+
+        tree = FlatTree()
+        stack = [(tree.add_node(),) + root_item]
+        n_jobs = os.cpu_count() if self.n_jobs == -1 else self.n_jobs
+        if n_jobs is None or n_jobs <= 1:
+            self._grow(tree, data, y_codes, indices, stack)
+        else:
+            # Workers map the data, labels and shared index array instead of receiving copies
+            shared = SharedArrays(data=data, y_codes=y_codes, indices=indices)
+            try:
+                with ProcessPoolExecutor(n_jobs, initializer=_init_worker, initargs=(self, shared.specs)) as pool:
+                    # Best-first growth needs every node in one priority queue, so no subtrees are handed off
+                    subtree_size = 0 if self.max_leaf_nodes is not None else max(1, len(indices) // (2 * n_jobs))
+                    self._grow(tree, shared.arrays["data"], shared.arrays["y_codes"], shared.arrays["indices"], stack,
+                               pool, n_jobs, subtree_size)
+            finally:
+                shared.close()
+        self._set_tree(tree.finalize())
+
+    def _set_tree(self, tree):
+        """Store a newly built tree, and prune it if ccp_alpha is set."""
+        self.flat_tree = self.full_tree = tree
+        self.pruning_path = None
+        if self.ccp_alpha > 0:
+            self.prune(self.ccp_alpha)
+
+    def _grow(self, tree, data, y_codes, indices, stack, pool=None, n_jobs=1, subtree_size=0):
+        """
+        Process the work stack until the tree is complete. With max_leaf_nodes set, nodes are expanded best-first
+        instead (see _grow_best_first).
+
+        Args:
+        tree (FlatTree): Tree being built.
+        data (np.array): Encoded (multiway) or binned (threshold) feature matrix.
+        y_codes (np.array): Class codes of all samples.
+        indices (np.array): Shared row indices.
+        stack (list): Work stack of (node, start, end, depth, histogram or None) items.
+        pool (ProcessPoolExecutor): Worker pool, or None to build serially.
+        n_jobs (int): Number of workers in the pool.
+        subtree_size (int): Nodes with at most this many samples are handed to a worker as whole subtrees.
+        """
+        if self.max_leaf_nodes is not None:
+            return self._grow_best_first(tree, data, y_codes, indices, stack, pool, n_jobs)
+        pending = []
+        while stack:
+            item = stack.pop()
+            node, start, end, depth, hist = item
+            if pool is not None and end - start <= subtree_size:
+                seed = self.rng.integers(2**63)
+                pending.append((node, pool.submit(_worker_subtree, start, end, depth, hist, seed)))
+                continue
+            split = self._find_split(tree, data, y_codes, indices, item, pool, n_jobs)
+            if split is not None:
+                stack.extend(reversed(self._apply_split(tree, data, y_codes, indices, item, split[1], pool, n_jobs)))
+        for node, future in pending:
+            tree.graft(node, future.result())
+
+    def _grow_best_first(self, tree, data, y_codes, indices, stack, pool=None, n_jobs=1):
+        """
+        Grow the tree best-first: always expand the open node whose split decreases the weighted impurity the most,
+        until max_leaf_nodes leaves exist. A multiway split that would overshoot the limit is skipped.
+
+        Args:
+        tree (FlatTree): Tree being built.
+        data (np.array): Encoded (multiway) or binned (threshold) feature matrix.
+        y_codes (np.array): Class codes of all samples.
+        indices (np.array): Shared row indices.
+        stack (list): Initial (node, start, end, depth, histogram or None) items.
+        pool (ProcessPoolExecutor): Worker pool for feature-parallel scoring, or None.
+        n_jobs (int): Number of workers in the pool.
+        """
+        heap, order = [], itertools.count()  # The counter breaks ties in creation order
+
+        def push(item):
+            split = self._find_split(tree, data, y_codes, indices, item, pool, n_jobs)
+            if split is not None:
+                heapq.heappush(heap, (-split[0], next(order), item, split[1]))
+
+        for item in stack:
+            push(item)
+        n_leaves = len(stack)
+        while heap:
+            _, _, item, split = heapq.heappop(heap)
+            n_branches = split[1]
+            if n_leaves + n_branches - 1 > self.max_leaf_nodes:
+                continue  # This node stays a leaf
+            n_leaves += n_branches - 1
+            for child in self._apply_split(tree, data, y_codes, indices, item, split, pool, n_jobs):
+                push(child)
+
+    def _feature_chunks(self, pool, n_jobs, n_samples, features):
+        """Groups of features to score in parallel for a node, or None if the node should be scored in this process."""
+        if pool is None or n_samples < self.parallel_min_samples:
+            return None
+        return np.array_split(features, min(n_jobs, len(features)))
+
+    def _candidate_features(self):
+        """
+        Draw the features to score at a node.
+
+        Returns:
+        tuple: (features to score first, the remaining features to fall back on if none of the first can split).
+        """
+        n = self.n_features
+        if self.max_features is None:
+            return np.arange(n), np.arange(0)
+        elif self.max_features == "sqrt":
+            k = int(np.sqrt(n))
+        elif self.max_features == "log2":
+            k = int(np.log2(n))
+        elif isinstance(self.max_features, float):
+            k = int(self.max_features * n)
+        else:
+            k = self.max_features
+        k = min(max(k, 1), n)
+        # Sorted, so that neighbouring features stay contiguous column ranges
+        order = self.rng.permutation(n)
+        return np.sort(order[:k]), np.sort(order[k:])
+
+    def _can_split(self, tree, node, depth, class_counts):
+        """
+        Record the class counts of a node and check the stopping criteria that do not depend on the split.
+
+        Args:
+        tree (FlatTree): Tree being built.
+        node (int): Id of the node in the tree.
+        depth (int): Depth of the node.
+        class_counts (np.array): Number of samples of every class at the node.
+
+        Returns:
+        bool: False if the node must stay a leaf.
+        """
+        tree.set_class_counts(node, class_counts)
+        n_samples = class_counts.sum()
+        if np.count_nonzero(class_counts) == 1:  # If all labels are the same
+            return False
         elif self.max_depth is not None and depth >= self.max_depth:
-            return np.bincount(y).argmax()  # Return majority class
-
-        # Find the best feature to split on
-        info_gains = [information_gain(X, y, i) for i in range(X.shape[1])]
-        best_feature_idx = np.argmax(info_gains)
-        
-        # Split the data based on the best feature
-        tree = {best_feature_idx: {}}
-        feature_values = np.unique(X[:, best_feature_idx])
-        for value in feature_values:
-            X_subset = X[X[:, best_feature_idx] == value]
-            y_subset = y[X[:, best_feature_idx] == value]
-            tree[best_feature_idx][value] = self.fit(X_subset, y_subset, depth + 1)
-        
-        self.tree = tree
-        return tree
+            return False
+        return n_samples >= self.min_samples_split and n_samples >= 2 * self.min_samples_leaf
+
+    def _weighted_decrease(self, gain, n_samples):
+        """Impurity decrease of a split weighted by the node's share of the training samples, or None if too small."""
+        decrease = gain * n_samples / self.n_train_samples
+        return decrease if decrease >= self.min_impurity_decrease else None
 
-    def predict(self, X, y_train):
+    def _find_split(self, tree, data, y_codes, indices, item, pool=None, n_jobs=1):
+        """
+        Record the statistics of a node and find its best split.
+
+        Args:
+        tree (FlatTree): Tree being built.
+        data (np.array): Encoded (multiway) or binned (threshold) feature matrix.
+        y_codes (np.array): Class codes of all samples.
+        indices (np.array): Shared row indices.
+        item (tuple): (node, start, end, depth, histogram or None); indices[start:end] are the node's samples.
+        pool (ProcessPoolExecutor): Worker pool for feature-parallel scoring, or None.
+        n_jobs (int): Number of workers in the pool.
+
+        Returns:
+        tuple: (weighted impurity decrease, split) where split is (feature, number of branches[, bin]), or None if
+               the node stays a leaf.
+        """
+        node, start, end, depth, hist = item
+        if self.split == "threshold":
+            return self._choose_threshold_split(tree, node, depth, hist)
+
+        rows = indices[start:end]
+        if not self._can_split(tree, node, depth, np.bincount(y_codes[rows], minlength=len(self.classes))):
+            return None
+
+        # Find the best feature to split on, ignoring features with a single value at this node
+        for features in self._candidate_features():
+            if not len(features):
+                continue
+            chunks = self._feature_chunks(pool, n_jobs, len(rows), features)
+            if chunks is None:
+                gains, n_present, _ = split_gains(data, y_codes, self.offsets, len(self.classes), rows,
+                                                  features=features, min_samples_leaf=self.min_samples_leaf)
+            else:
+                results = list(pool.map(_worker_gains, *zip(*[(start, end, chunk) for chunk in chunks])))
+                gains = np.concatenate([gains for gains, _ in results])
+                n_present = np.concatenate([n_present for _, n_present in results])
+            gains[n_present < 2] = -np.inf
+            if gains.max() > -np.inf:
+                break
+        else:
+            return None  # All samples are identical, or every split leaves a branch too small
+        best = np.argmax(gains)
+        decrease = self._weighted_decrease(gains[best], len(rows))
+        return None if decrease is None else (decrease, (features[best], n_present[best]))
+
+    def _choose_threshold_split(self, tree, node, depth, hist):
+        """
+        Record the statistics of a threshold node and choose its split from the node's histogram.
+
+        Args:
+        tree (FlatTree): Tree being built.
+        node (int): Id of the node in the tree.
+        depth (int): Depth of the node.
+        hist (np.array): Histogram of the node's samples, from bin_histogram.
+
+        Returns:
+        tuple: (weighted impurity decrease, (feature, 2, bin)) for the best "bin <= b" split, or None if the node
+               stays a leaf.
+        """
+        class_counts = hist[0].sum(axis=0)
+        if not self._can_split(tree, node, depth, class_counts):
+            return None
+
+        # Find the best (feature, bin) split
+        for features in self._candidate_features():
+            if not len(features):
+                continue
+            gains = threshold_gains(hist[features], self.min_samples_leaf)
+            best, best_bin = np.unravel_index(np.argmax(gains), gains.shape)
+            if gains[best, best_bin] > -np.inf:
+                decrease = self._weighted_decrease(gains[best, best_bin], class_counts.sum())
+                return None if decrease is None else (decrease, (features[best], 2, best_bin))
+        return None  # All samples fall in the same bins, or every split leaves a side too small
+
+    def _apply_split(self, tree, data, y_codes, indices, item, split, pool=None, n_jobs=1):
+        """
+        Split a node: partition its slice of the shared indices in place and add its children to the tree.
+
+        Args:
+        tree (FlatTree): Tree being built.
+        data (np.array): Encoded (multiway) or binned (threshold) feature matrix.
+        y_codes (np.array): Class codes of all samples.
+        indices (np.array): Shared row indices.
+        item (tuple): (node, start, end, depth, histogram or None) of the node.
+        split (tuple): Split found by _find_split.
+        pool (ProcessPoolExecutor): Worker pool for feature-parallel histograms, or None.
+        n_jobs (int): Number of workers in the pool.
+
+        Returns:
+        list: (node, start, end, depth, histogram or None) items of the children, in branch order.
+        """
+        node, start, end, depth, hist = item
+        rows = indices[start:end]
+        if self.split == "multiway":
+            feature = split[0]
+            # Partition this node's slice so that the samples of every value are contiguous
+            column = data[rows, feature]
+            order = np.argsort(column, kind='stable')
+            indices[start:end] = rows[order]
+            value_codes, starts = np.unique(column[order], return_index=True)
+            ends = np.append(starts[1:], len(order))
+
+            values = self.feature_values[feature][value_codes - self.offsets[feature]]
+            children = tree.set_multiway_split(node, feature, values)
+            return [(child, start + child_start, start + child_end, depth + 1, None)
+                    for child, child_start, child_end in zip(children, starts, ends)]
+
+        # Threshold mode: stable in-place partition of this node's slice, left samples first, then right samples.
+        # The histogram of the larger child is derived by subtracting the smaller child's histogram from the
+        # parent's, so only one child per split is ever counted.
+        feature, _, bin_ = split
+        goes_left = data[rows, feature] <= bin_
+        n_left = np.count_nonzero(goes_left)
+        indices[start:end] = np.concatenate((rows[goes_left], rows[~goes_left]))
+        mid = start + n_left
+
+        small_start, small_end = (start, mid) if n_left <= end - mid else (mid, end)
+        # The histograms cover every feature, whichever were scored here, because the children are scored on
+        # their own feature samples
+        chunks = self._feature_chunks(pool, n_jobs, small_end - small_start, np.arange(data.shape[1]))
+        if chunks is None:
+            small_hist = bin_histogram(data, y_codes, len(self.classes), self.n_bins, indices[small_start:small_end])
+        else:
+            args = [(small_start, small_end, chunk) for chunk in chunks]
+            small_hist = np.concatenate(list(pool.map(_worker_histogram, *zip(*args))))
+        if small_start == start:
+            left_hist, right_hist = small_hist, hist - small_hist
+        else:
+            left_hist, right_hist = hist - small_hist, small_hist
+
+        left, right = tree.set_threshold_split(node, feature, self.thresholds[feature][bin_])
+        return [(left, start, mid, depth + 1, left_hist), (right, mid, end, depth + 1, right_hist)]
+
+    def fit_stream(self, data, y=None, chunk_size=65536, sample_size=1000000, histogram_budget=2**27):
+        """
+        Fit a threshold tree to data that does not fit in memory, reading it in chunks.
+        A first pass collects the class labels and a uniform random sample of rows (at most sample_size) from which
+        the bin thresholds are computed. The tree then grows one level per pass: every chunk is routed through the
+        tree built so far, and the rows reaching a node of the current level are added to that node's histogram.
+        Only one chunk, the row sample and the histograms of one level are ever held in memory. If a level's
+        histograms (and the per-chunk counts added to them) would exceed histogram_budget bytes, the level is split
+        into groups of nodes that take one pass each.
+        With sample_size at least the number of rows, the tree is the same as the one fit() builds.
+
+        Args:
+        data (np.array, callable or iterable): Feature matrix (e.g. an np.memmap) together with y, or a source of
+                                               (X chunk, y chunk) pairs that can be iterated over repeatedly: a
+                                               function returning a fresh iterator, or a re-iterable such as a list
+                                               of memory-mapped chunk pairs.
+        y (np.array): Target variable when data is a feature matrix.
+        chunk_size (int): Number of rows per chunk when data is a feature matrix.
+        sample_size (int): Number of rows sampled to compute the bin thresholds.
+        histogram_budget (int): Maximum memory in bytes used for counting histograms in one pass.
+
+        Returns:
+        DecisionTree: self.
+        """
+        if self.split != "threshold":
+            raise ValueError("fit_stream requires split='threshold'")
+        if self.max_leaf_nodes is not None:
+            raise ValueError("fit_stream grows level by level and does not support max_leaf_nodes")
+        if not 2 <= self.max_bins <= 256:
+            raise ValueError("max_bins must be between 2 and 256")
+        if y is not None:
+            chunks = lambda: iter_chunks(data, y, chunk_size)
+        elif callable(data):
+            chunks = data
+        elif iter(data) is data:
+            raise ValueError("data must be re-iterable, one pass is made per tree level: pass a list or a function "
+                             "returning a new iterator")
+        else:
+            chunks = lambda: iter(data)
+        self.flat_tree = None
+        self.rng = np.random.default_rng(self.random_state)
+
+        # Pass 1: class labels, and a uniform row sample kept as the rows with the smallest random keys
+        labels, sample, keys = [], None, np.empty(0)
+        for X_chunk, y_chunk in chunks():
+            X_chunk = np.asarray(X_chunk)
+            labels.append(np.unique(y_chunk))
+            chunk_keys = self.rng.random(len(X_chunk))
+            if sample is None:
+                sample = X_chunk[:0]
+            if len(keys) >= sample_size:
+                candidates = chunk_keys < keys.max()  # Only rows that can enter the sample
+                X_chunk, chunk_keys = X_chunk[candidates], chunk_keys[candidates]
+            sample, keys = np.concatenate((sample, X_chunk)), np.concatenate((keys, chunk_keys))
+            if len(keys) > sample_size:
+                keep = np.argpartition(keys, sample_size)[:sample_size]
+                sample, keys = sample[keep], keys[keep]
+        self.classes = np.unique(np.concatenate(labels))
+        self.n_features = sample.shape[1]
+        self.thresholds = [bin_edges(sample[:, f], self.max_bins) for f in range(self.n_features)]
+        self.n_bins = max(len(t) for t in self.thresholds) + 1
+        del sample, keys
+
+        # One pass per level (or per group of a level's nodes)
+        tree = FlatTree()
+        level = [(tree.add_node(), 0)]
+        # Every node needs its histogram plus the same again for the counts of the current chunk
+        group_size = max(1, histogram_budget // (2 * self.n_features * self.n_bins * len(self.classes) * 8))
+        while level:
+            next_level = []
+            for g in range(0, len(level), group_size):
+                group = level[g:g + group_size]
+                hists = self._stream_histograms(chunks, tree.frozen(), [node for node, _ in group])
+                for (node, depth), hist in zip(group, hists):
+                    if node == 0:
+                        class_counts = hist[0].sum(axis=0)
+                        self.default_class = self.classes[class_counts.argmax()]
+                        self.n_train_samples = class_counts.sum()
+                    split = self._choose_threshold_split(tree, node, depth, hist)
+                    if split is not None:
+                        feature, _, bin_ = split[1]
+                        left, right = tree.set_threshold_split(node, feature, self.thresholds[feature][bin_])
+                        next_level += [(left, depth + 1), (right, depth + 1)]
+                del hists, hist  # Free this group's histograms before counting the next group
+            level = next_level
+
+        self._set_tree(tree.finalize())
+        return self
+
+    def _stream_histograms(self, chunks, tree, nodes):
+        """
+        Count the histograms of some nodes in one pass over the data.
+
+        Args:
+        chunks (callable): Function returning an iterator of (X chunk, y chunk) pairs.
+        tree (FlatTree): Finalized snapshot of the tree being built.
+        nodes (list): Ids of the nodes to count.
+
+        Returns:
+        np.array: Histograms of shape (len(nodes), n_features, n_bins, n_classes).
+        """
+        n_features, n_bins, n_classes = self.n_features, self.n_bins, len(self.classes)
+        slots = np.full(tree.n_nodes, -1, dtype=np.int64)
+        slots[nodes] = np.arange(len(nodes))
+        features = np.arange(n_features, dtype=np.int64)
+        hist = np.zeros(len(nodes) * n_features * n_bins * n_classes, dtype=np.int64)
+        for X_chunk, y_chunk in chunks():
+            X_chunk = np.asarray(X_chunk)
+            slot = slots[tree.apply(X_chunk)[0]]
+            keep = slot >= 0
+            if not keep.any():
+                continue
+            binned = apply_bins(X_chunk[keep], self.thresholds)
+            y_codes = np.searchsorted(self.classes, np.asarray(y_chunk)[keep])
+            flat = ((slot[keep, None] * n_features + features) * n_bins + binned) * n_classes + y_codes[:, None]
+            hist += np.bincount(flat.ravel(), minlength=len(hist))
+        return hist.reshape(len(nodes), n_features, n_bins, n_classes)
+
+    def cost_complexity_pruning_path(self):
+        """
+        Compute the minimal cost-complexity pruning path of the unpruned tree (see FlatTree.pruning_path).
+        The path is cached, so trying many values of ccp_alpha with prune() only walks the tree once.
+
+        Returns:
+        tuple: (ccp_alphas, impurities): the effective alphas at which the tree shrinks, and the total leaf
+               impurity of the pruned tree at each of them.
+        """
+        if self.pruning_path is None:
+            self.pruning_path = self.full_tree.pruning_path()
+        alphas, impurities, _ = self.pruning_path
+        return alphas, impurities
+
+    def prune(self, ccp_alpha):
+        """
+        Replace the tree with the smallest subtree of the unpruned tree that minimizes
+        R(T) + ccp_alpha * (number of leaves), collapsing every node whose effective alpha is at most ccp_alpha.
+        Pruning always starts again from the unpruned tree, so ccp_alpha can be raised or lowered freely.
+
+        Args:
+        ccp_alpha (float): Complexity parameter (0 keeps the whole tree).
+
+        Returns:
+        DecisionTree: self.
+        """
+        self.cost_complexity_pruning_path()
+        alphas, _, pruned = self.pruning_path
+        self.ccp_alpha = ccp_alpha
+        self.flat_tree = self.full_tree.collapse(pruned[1:][alphas[1:] <= ccp_alpha])
+        return self
+
+    def predict(self, X, y_train=None):
         """
         Predict class labels for input data.
-        Traverses the tree to make predictions based on input data.
+        Routes all rows through the flat tree arrays level by level. Rows reaching a multiway node without a branch
+        for their value get the majority class of the training data.
 
         Args:
         X (np.array): Feature matrix for which to predict the labels.
+        y_train (np.array): Deprecated and ignored, the default class is stored at fit time.
 
         Returns:
         np.array: Predicted class labels.
         """
-        # Helper function to traverse the tree
-        def traverse_tree(x, tree, default_class):
-            for key, branches in tree.items():
-                feature_val = x[key]
-                if feature_val in branches:
-                    result = branches[feature_val]
-                    if isinstance(result, dict):
-                        return traverse_tree(x, result, default_class)
-                    else:
-                        return result
-                else:
-                    return default_class  # Handle unseen feature values by returning majority class
-
-        # Determine the default class as the majority class from the training data
-        default_class = Counter(y_train).most_common(1)[0][0]
-        
-        # Predict for each instance
-        predictions = [traverse_tree(sample, self.tree, default_class) for sample in X]
-        return np.array(predictions)
-
-    def evaluate(self, X_test, y_test):
+        if y_train is not None:
+            warnings.warn("predict's y_train is ignored and will be removed", DeprecationWarning, stacklevel=2)
+        nodes, missed = self.flat_tree.apply(np.asarray(X))
+        predictions = self.classes[self.flat_tree.value[nodes]]
+        predictions[missed] = self.default_class
+        return predictions
+
+    def predict_stream(self, X, out=None, chunk_size=65536):
+        """
+        Predict class labels chunk by chunk, for inputs and outputs that do not fit in memory.
+
+        Args:
+        X (np.array): Feature matrix, e.g. an np.memmap.
+        out (np.array or str): Array to write the labels to (e.g. an np.memmap), the path of a .npy file to create
+                               as a memory map, or None for a new in-memory array.
+        chunk_size (int): Number of rows per chunk.
+
+        Returns:
+        np.array: out, holding the predicted class labels.
+        """
+        if isinstance(out, (str, os.PathLike)):
+            out = np.lib.format.open_memmap(out, mode="w+", dtype=self.classes.dtype, shape=(len(X),))
+        elif out is None:
+            out = np.empty(len(X), dtype=self.classes.dtype)
+        for start in range(0, len(X), chunk_size):
+            out[start:start + chunk_size] = self.predict(np.asarray(X[start:start + chunk_size]))
+        if isinstance(out, np.memmap):
+            out.flush()
+        return out
+
+    def save(self, path):
+        """
+        Save the fitted tree in the binary model format (see save_model).
+
+        Args:
+        path (str): File to write.
+        """
+        if self.flat_tree is None:
+            raise ValueError("the tree is not fitted")
+        params = {"max_depth": self.max_depth, "split": self.split, "max_bins": self.max_bins,
+                  "max_features": self.max_features, "min_samples_split": self.min_samples_split,
+                  "min_samples_leaf": self.min_samples_leaf, "min_impurity_decrease": self.min_impurity_decrease,
+                  "max_leaf_nodes": self.max_leaf_nodes, "ccp_alpha": self.ccp_alpha,
+                  "default_class": int(np.flatnonzero(self.classes == self.default_class)[0])}
+        save_model(path, "DecisionTree", params, dict(self.flat_tree.arrays(), classes=self.classes))
+
+    @classmethod
+    def load(cls, path, mmap=True, verify=True):
+        """
+        Load a tree saved by save, together with its constructor parameters.
+
+        Args:
+        path (str): File to read.
+        mmap (bool): Memory-map the tree arrays instead of reading them into memory.
+        verify (bool): Check the file's checksum.
+
+        Returns:
+        DecisionTree: The fitted tree.
+        """
+        params, arrays = load_model(path, "DecisionTree", mmap, verify)
+        default_class = params.pop("default_class")
+        model = cls(**params)
+        model.classes = arrays["classes"]
+        model.default_class = model.classes[default_class]
+        model.flat_tree = model.full_tree = FlatTree.from_arrays(arrays)
+        return model
+
+    def evaluate(self, X_test, y_test, backend="numpy"):
         """
         Evaluate the performance of the Decision Tree on the test set.
 
         Args:
         X_test (np.array): Feature matrix for the test set.
         y_test (np.array): True labels for the test set.
+        backend (str): "numpy" computes the metrics from one confusion matrix (see metrics.py); "sklearn" imports
+            sklearn.metrics to compute them.
 
         Returns:
-        dict: Dictionary containing accuracy, precision, recall, and F1-score.
+        dict: Accuracy and the macro-averaged ("precision", "recall", "f1_score") and micro-averaged
+        ("micro_precision", "micro_recall", "micro_f1_score") metrics, as floats.
         """
-        y_pred = self.predict(X_test, y_test)
-        results = {
-            "accuracy": accuracy_score(y_test, y_pred),
-            "precision": f"{precision_score(y_test, y_pred, average='macro')}",
-            "recall": f"{recall_score(y_test, y_pred, average='macro')}",
-            "f1_score": f"{f1_score(y_test, y_pred, average='macro')}"
-        }
-        return results
+        if backend not in ("numpy", "sklearn"):
+            raise ValueError(f"backend must be 'numpy' or 'sklearn', got {backend!r}")
+        y_pred = self.predict(X_test)
+        if backend == "sklearn":
+            return sklearn_metrics(y_test, y_pred)
+        return classification_metrics(y_test, y_pred)
@@ -0,0 +1,287 @@
+import numpy as np
+
+from DecisionTree import (DecisionTree, FlatTree, apply_bins, bin_edges, contingency_gains, entropy_from_counts,
+                          threshold_gains)
+
+# Hoeffding Tree class
+class HoeffdingTree(DecisionTree):
+    def __init__(self, max_depth=None, split="multiway", max_bins=256, grace_period=200, delta=1e-7,
+                 tie_threshold=0.05):
+        """
+        Initialize an online Hoeffding tree classifier (Very Fast Decision Tree, Domingos and Hulten, 2000).
+        The tree learns from a stream of mini-batches (see partial_fit) without keeping any sample. Every leaf keeps
+        the class counts of every feature value (multiway) or bin (threshold) among the samples that reached it since
+        it was created. Every grace_period samples, the information gain of the best split of each feature is
+        computed from these counts, and the leaf is split when the best feature beats the second best by more than
+        the Hoeffding bound
+            epsilon = sqrt(R^2 * ln(1 / delta) / (2 * n)),  R = log2(n_classes),
+        so that with probability 1 - delta it is the feature a batch tree would choose on infinite data. The work
+        per sample is one pass down the tree plus one count per feature. In threshold mode the memory is a fixed-size
+        count table per leaf, however long the stream.
+
+        Args:
+        max_depth (int): Maximum depth of the tree. If None, leaves split whenever the bound allows.
+        split (str): "multiway" branches on every value of a feature seen at the leaf, for discrete features. Its
+                     memory is not constant: every new distinct value of any feature widens the count table of
+                     every leaf slot, so continuous features should use "threshold", which bins every feature into
+                     quantile bins computed from the first batch and makes binary "x <= threshold" splits.
+        max_bins (int): Maximum number of bins per feature in threshold mode (at most 256).
+        grace_period (int): Number of samples a leaf receives between two split attempts.
+        delta (float): Probability of choosing a different split than on infinite data.
+        tie_threshold (float): Split anyway once the bound is below this, when the two best features are too close
+                               to tell apart.
+        """
+        super().__init__(max_depth=max_depth, split=split, max_bins=max_bins)
+        self.grace_period = grace_period
+        self.delta = delta
+        self.tie_threshold = tie_threshold
+        self.growing_tree = None  # FlatTree still open for new nodes; flat_tree is its finalized snapshot
+
+    def fit(self, X, y):
+        """
+        Learn a new tree from the data in one pass, as a stream of chunks (see partial_fit).
+
+        Args:
+        X (np.array): Feature matrix.
+        y (np.array): Target variable.
+
+        Returns:
+        HoeffdingTree: self.
+        """
+        self.growing_tree = None
+        return self.partial_fit(X, y)
+
+    def partial_fit(self, X, y, classes=None, chunk_size=1024):
+        """
+        Update the tree with a mini-batch of samples.
+        Rows are learned in chunks: every chunk is routed through the tree as it stands after the previous one, the
+        class counts of the leaves it reaches are updated, and leaves that received grace_period samples since their
+        last split attempt try to split. Rows stopping at a multiway node without a branch for their value (a value
+        first seen after the split) are not learned from.
+
+        Args:
+        X (np.array): Feature matrix of the batch.
+        y (np.array): Target variable of the batch.
+        classes (np.array): All class labels of the stream, required on the first call if the first batch does not
+                            contain every class. Ignored afterwards.
+        chunk_size (int): Number of rows per chunk.
+
+        Returns:
+        HoeffdingTree: self.
+        """
+        X, y = np.asarray(X), np.asarray(y)
+        if self.growing_tree is None:
+            # The first batch sets up the labels and the feature encoding (or bins), so it cannot be empty
+            if not len(y):
+                raise ValueError("the first batch must contain samples")
+            if classes is not None and not len(classes):
+                raise ValueError("classes must not be empty")
+            self._start(X, y, classes)
+        y_codes = np.searchsorted(self.classes, y)
+        if len(y) and not (self.classes[np.minimum(y_codes, len(self.classes) - 1)] == y).all():
+            raise ValueError("y contains labels that are not in classes (pass every label with classes= on the first "
+                             "call)")
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"X must have {self.n_features} features")
+
+        self.label_counts += np.bincount(y_codes, minlength=len(self.classes))
+        self.default_class = self.classes[self.label_counts.argmax()]
+        self.n_train_samples = int(self.label_counts.sum())
+        for start in range(0, len(y), chunk_size):
+            self._learn(X[start:start + chunk_size], y_codes[start:start + chunk_size])
+        return self
+
+    def _start(self, X, y, classes):
+        """Set up the labels, feature encoding and root leaf from the first batch."""
+        if X.ndim != 2:
+            raise ValueError("X must be a 2D feature matrix")
+        self.classes = np.unique(y if classes is None else classes)
+        self.n_features = X.shape[1]
+        self.label_counts = np.zeros(len(self.classes), dtype=np.int64)
+        if self.split == "threshold":
+            if not 2 <= self.max_bins <= 256:
+                raise ValueError("max_bins must be between 2 and 256")
+            self.thresholds = [bin_edges(X[:, f], self.max_bins) for f in range(self.n_features)]
+            self.n_bins = max(len(t) for t in self.thresholds) + 1
+        else:
+            # Value codes are given in order of first appearance, so they stay valid as new values arrive
+            self.feature_values = [np.empty(0, dtype=np.float64) for _ in range(self.n_features)]
+            self.sorted_values = [np.empty(0, dtype=np.float64) for _ in range(self.n_features)]
+            self.sorted_codes = [np.empty(0, dtype=np.int64) for _ in range(self.n_features)]
+            self.n_bins = 1
+
+        # Count tables of the leaves that can still split, one slot per leaf: (slot, feature, value, class)
+        self.leaf_stats = np.zeros((4, self.n_features, self.n_bins, len(self.classes)), dtype=np.int64)
+        self.pending = np.zeros(4, dtype=np.int64)  # Samples of every slot since its last split attempt
+        self.free_slots = [3, 2, 1, 0]
+        self.slot_of_node = np.full(1, -1, dtype=np.int64)
+        self.node_depth = []
+
+        self.growing_tree = FlatTree()
+        self._add_leaf(self.growing_tree.add_node(), 0, np.zeros(len(self.classes), dtype=np.int64))
+        self._set_tree(self.growing_tree.frozen())
+
+    def _add_leaf(self, node, depth, class_counts):
+        """Record a new leaf, with a count table slot if it is allowed to split later."""
+        self.growing_tree.set_class_counts(node, class_counts)
+        self.node_depth.append(depth)
+        if len(self.slot_of_node) <= node:
+            grow = max(node + 1, 2 * len(self.slot_of_node)) - len(self.slot_of_node)
+            self.slot_of_node = np.concatenate((self.slot_of_node, np.full(grow, -1)))
+        if self.max_depth is not None and depth >= self.max_depth:
+            return
+        if not self.free_slots:
+            # Double the capacity; the new slots are already zero
+            capacity = len(self.pending)
+            self.leaf_stats = np.concatenate((self.leaf_stats, np.zeros_like(self.leaf_stats)))
+            self.pending = np.concatenate((self.pending, np.zeros_like(self.pending)))
+            self.free_slots = list(range(2 * capacity - 1, capacity - 1, -1))
+        self.slot_of_node[node] = self.free_slots.pop()
+
+    def _encode(self, X):
+        """Bin (threshold) or encode (multiway) a chunk, adding new values to the vocabularies in multiway mode."""
+        if self.split == "threshold":
+            return apply_bins(X, self.thresholds)
+        codes = np.empty(X.shape, dtype=np.int64)
+        for f in range(self.n_features):
+            column = X[:, f]
+            values, sorted_values = self.feature_values[f], self.sorted_values[f]
+            positions = np.searchsorted(sorted_values, column)
+            known = np.zeros(len(column), dtype=bool) if not len(values) else \
+                sorted_values[np.minimum(positions, len(values) - 1)] == column
+            if not known.all():
+                values = self.feature_values[f] = np.concatenate((values, np.unique(column[~known])))
+                order = np.argsort(values, kind="stable")
+                sorted_values = self.sorted_values[f] = values[order]
+                self.sorted_codes[f] = order
+                positions = np.searchsorted(sorted_values, column)
+            codes[:, f] = self.sorted_codes[f][positions]
+        n_values = max(len(values) for values in self.feature_values)
+        if n_values > self.n_bins:
+            # Widen every count table, with room to spare so that this stays rare
+            self.n_bins = max(n_values, self.n_bins + self.n_bins // 2)
+            padding = self.n_bins - self.leaf_stats.shape[2]
+            self.leaf_stats = np.pad(self.leaf_stats, ((0, 0), (0, 0), (0, padding), (0, 0)))
+        return codes
+
+    def _learn(self, X, y_codes):
+        """Learn from one chunk (see partial_fit)."""
+        n_classes = len(self.classes)
+        codes = self._encode(X)
+        nodes, missed = self.flat_tree.apply(X)
+        reached = ~missed
+        nodes, codes, y_codes = nodes[reached], codes[reached], y_codes[reached]
+
+        # Class counts of the leaves reached
+        leaves, leaf_of_row = np.unique(nodes, return_inverse=True)
+        leaf_counts = np.bincount(leaf_of_row * n_classes + y_codes, minlength=len(leaves) * n_classes)
+        leaf_counts = leaf_counts.reshape(len(leaves), n_classes)
+        class_counts = self.growing_tree.class_counts
+        for leaf, counts in zip(leaves.tolist(), leaf_counts):
+            class_counts[leaf] += counts
+
+        # Count tables of the leaves that can split
+        slots = self.slot_of_node[nodes]
+        counted = slots >= 0
+        features = np.arange(self.n_features, dtype=np.int64)
+        flat = ((slots[counted, None] * self.n_features + features) * self.n_bins + codes[counted]) * n_classes + \
+            y_codes[counted, None]
+        np.add.at(self.leaf_stats.reshape(-1), flat.ravel(), 1)
+
+        split = False
+        leaf_slots = self.slot_of_node[leaves]
+        self.pending[leaf_slots[leaf_slots >= 0]] += leaf_counts.sum(axis=1)[leaf_slots >= 0]
+        for leaf, slot in zip(leaves.tolist(), leaf_slots.tolist()):
+            if slot >= 0 and self.pending[slot] >= self.grace_period:
+                self.pending[slot] = 0
+                split |= self._try_split(leaf, slot)
+
+        if split:
+            self._set_tree(self.growing_tree.frozen())
+        elif len(leaves):
+            # Only the statistics of the leaves reached changed: refresh them in the snapshot in place
+            counts = np.array([class_counts[leaf] for leaf in leaves.tolist()])
+            self.flat_tree.value[leaves] = counts.argmax(axis=1)
+            self.flat_tree.n_samples[leaves] = counts.sum(axis=1)
+            self.flat_tree.impurity[leaves] = entropy_from_counts(counts)
+
+    def hoeffding_bound(self, n_samples):
+        """
+        Return the Hoeffding bound on the difference between the observed and true information gains.
+
+        Args:
+        n_samples (int): Number of samples the gains were computed from.
+
+        Returns:
+        float: epsilon = sqrt(R^2 * ln(1 / delta) / (2 * n_samples)) with R = log2(n_classes).
+        """
+        value_range = np.log2(max(len(self.classes), 2))
+        return float(np.sqrt(value_range ** 2 * np.log(1 / self.delta) / (2 * n_samples)))
+
+    def _try_split(self, node, slot):
+        """
+        Split a leaf if the Hoeffding bound separates its best feature from the second best (or from not splitting).
+
+        Args:
+        node (int): Id of the leaf.
+        slot (int): Count table slot of the leaf.
+
+        Returns:
+        bool: True if the leaf was split.
+        """
+        stats = self.leaf_stats[slot]
+        totals = stats[0].sum(axis=0)
+        if np.count_nonzero(totals) < 2:
+            return False  # Pure so far
+        if self.split == "threshold":
+            gains = threshold_gains(stats)
+            best_bins = gains.argmax(axis=1)
+            feature_gains = gains[np.arange(self.n_features), best_bins]
+        else:
+            feature_gains = contingency_gains(stats)
+            feature_gains[np.count_nonzero(stats.sum(axis=2), axis=1) < 2] = -np.inf
+        order = np.argsort(feature_gains)[::-1]
+        best = feature_gains[order[0]]
+        second = max(feature_gains[order[1]], 0.0) if self.n_features > 1 else 0.0
+        epsilon = self.hoeffding_bound(totals.sum())
+        if not best > 0 or (best - second <= epsilon and epsilon >= self.tie_threshold):
+            return False
+
+        feature = int(order[0])
+        depth = self.node_depth[node] + 1
+        tree = self.growing_tree
+        if self.split == "threshold":
+            bin_ = best_bins[feature]
+            children = tree.set_threshold_split(node, feature, self.thresholds[feature][bin_])
+            child_counts = [stats[feature, :bin_ + 1].sum(axis=0), stats[feature, bin_ + 1:].sum(axis=0)]
+        else:
+            codes = np.flatnonzero(stats[feature].sum(axis=1))
+            values = self.feature_values[feature][codes]
+            order = np.argsort(values)
+            children = tree.set_multiway_split(node, feature, values[order].tolist())
+            child_counts = list(stats[feature, codes[order]])
+        # The children predict from the samples that would have reached them, but collect new count tables
+        for child, counts in zip(children, child_counts):
+            self._add_leaf(child, depth, counts.copy())
+
+        self.leaf_stats[slot] = 0  # Not stats[:], the table may have been reallocated for the children
+        self.pending[slot] = 0
+        self.slot_of_node[node] = -1
+        self.free_slots.append(slot)
+        return True
+
+    @classmethod
+    def load(cls, path, mmap=True, verify=True):
+        """
+        Load a tree saved by save. The leaf count tables are not saved, so the tree loads as a DecisionTree that
+        predicts like the saved tree but cannot learn further.
+
+        Args:
+        path (str): File to read.
+        mmap (bool): Memory-map the tree arrays instead of reading them into memory.
+        verify (bool): Check the file's checksum.
+
+        Returns:
+        DecisionTree: The fitted tree.
+        """
+        return DecisionTree.load(path, mmap, verify)
@@ -0,0 +1,230 @@
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from DecisionTree import DecisionTree, FlatTree, SharedArrays, load_model, save_model
+
+# Function to draw a bootstrap sample
+def bootstrap_indices(seed, n_samples):
+    """
+    Draw n_samples row indices with replacement.
+    The sample is a function of the seed alone, so the out-of-bag rows of a tree can be recomputed from its seed.
+
+    Args:
+    seed (int): Seed of the tree.
+    n_samples (int): Number of training rows.
+
+    Returns:
+    np.array: Row indices of the bootstrap sample.
+    """
+    return np.random.default_rng([seed, 0]).integers(0, n_samples, n_samples)
+
+# State of a forest worker process, set by _init_forest_worker
+_forest_worker = {}
+
+def _init_forest_worker(template, specs):
+    """Initializer of forest worker processes: keep the prepared template tree and map the shared arrays."""
+    arrays, blocks = SharedArrays.attach(specs)
+    _forest_worker.update(arrays, template=template, blocks=blocks)
+
+def _fit_tree(template, data, y_codes, seed, bootstrap):
+    """
+    Fit one tree of the forest.
+
+    Args:
+    template (DecisionTree): Tree whose _prepare has been run on the training data.
+    data (np.array): Encoded or binned feature matrix from _prepare.
+    y_codes (np.array): Class codes of all samples.
+    seed (int): Seed of the bootstrap sample and of the feature sampling.
+    bootstrap (bool): Train on a bootstrap sample instead of all rows.
+
+    Returns:
+    FlatTree: The fitted tree.
+    """
+    tree = copy.copy(template)  # Shares the encoding tables of the template
+    tree.random_state = [seed, 1]
+    indices = bootstrap_indices(seed, len(y_codes)) if bootstrap else np.arange(len(y_codes))
+    tree._fit_prepared(data, y_codes, indices)
+    return tree.flat_tree
+
+def _worker_fit_tree(seed, bootstrap):
+    """Fit one tree of the forest in a worker process."""
+    return _fit_tree(_forest_worker["template"], _forest_worker["data"], _forest_worker["y_codes"], seed, bootstrap)
+
+# Random Forest class
+class RandomForest:
+    def __init__(self, n_estimators=100, max_depth=None, split="multiway", max_bins=256, max_features="sqrt",
+                 bootstrap=True, oob_score=False, n_jobs=1, random_state=None, batch_size=2**20):
+        """
+        Initialize the Random Forest classifier: bagged DecisionTrees that each score a random subset of the features
+        at every node, predicting by majority vote.
+
+        Args:
+        n_estimators (int): Number of trees.
+        max_depth (int): Maximum depth of every tree. If None, trees grow until all leaves are pure.
+        split (str): Split mode of the trees, "multiway" or "threshold" (see DecisionTree).
+        max_bins (int): Maximum number of bins per feature in threshold mode.
+        max_features (int, float or str): Features scored at each node (see DecisionTree).
+        bootstrap (bool): Train every tree on a bootstrap sample of the rows instead of all of them.
+        oob_score (bool): Score every training row with the trees whose bootstrap sample left it out.
+        n_jobs (int): Number of processes fitting trees (-1 for all cores).
+        random_state (int): Seed of the forest; every tree gets its own seed derived from it.
+        batch_size (int): Maximum number of (row, tree) pairs routed at once when predicting.
+        """
+        if oob_score and not bootstrap:
+            raise ValueError("oob_score requires bootstrap=True")
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.split = split
+        self.max_bins = max_bins
+        self.max_features = max_features
+        self.bootstrap = bootstrap
+        self.oob_score = oob_score
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.batch_size = batch_size
+        self.trees = []  # FlatTree of every tree, set by fit
+        self.stacked = None  # All trees stacked into one FlatTree, set by fit or load
+        self.roots = None  # Root node of every tree in the stacked tree
+        self.oob_accuracy = None  # Out-of-bag accuracy, set by fit when oob_score is True
+
+    def fit(self, X, y):
+        """
+        Fit the Random Forest classifier to the data.
+        The features are encoded (or binned) once and shared by all trees. Every tree trains on a bootstrap sample
+        given as row indices, so no copy of the data is made per tree. With n_jobs > 1 the trees are fitted by
+        worker processes that map the encoded data from shared memory.
+
+        Args:
+        X (np.array): Feature matrix.
+        y (np.array): Target variable.
+
+        Returns:
+        RandomForest: The fitted forest.
+        """
+        X = np.asarray(X)
+        template = DecisionTree(max_depth=self.max_depth, split=self.split, max_bins=self.max_bins,
+                                max_features=self.max_features)
+        data, y_codes = template._prepare(X, y)
+        self.classes = template.classes
+        self.tree_seeds = np.random.SeedSequence(self.random_state).generate_state(self.n_estimators)
+
+        n_jobs = os.cpu_count() if self.n_jobs == -1 else self.n_jobs
+        if n_jobs is None or n_jobs <= 1:
+            self.trees = [_fit_tree(template, data, y_codes, seed, self.bootstrap) for seed in self.tree_seeds]
+        else:
+            shared = SharedArrays(data=data, y_codes=y_codes)
+            try:
+                with ProcessPoolExecutor(n_jobs, initializer=_init_forest_worker,
+                                         initargs=(template, shared.specs)) as pool:
+                    self.trees = list(pool.map(_worker_fit_tree, self.tree_seeds,
+                                               [self.bootstrap] * self.n_estimators))
+            finally:
+                shared.close()
+        self.stacked, self.roots = FlatTree.stack(self.trees)
+
+        if self.oob_score:
+            # Every (row, tree) pair where the row is out of the tree's bootstrap sample
+            oob = [np.flatnonzero(np.bincount(bootstrap_indices(seed, len(y_codes)), minlength=len(y_codes)) == 0)
+                   for seed in self.tree_seeds]
+            rows = np.concatenate(oob)
+            roots = np.repeat(self.roots, [len(o) for o in oob])
+            votes = self._votes(X, rows, roots, len(y_codes))
+            scored = votes.sum(axis=1) > 0  # Rows that were in every bootstrap sample have no vote
+            self.oob_proba = np.divide(votes, votes.sum(axis=1, keepdims=True), where=scored[:, None],
+                                       out=np.full(votes.shape, np.nan))
+            self.oob_accuracy = np.mean(votes[scored].argmax(axis=1) == y_codes[scored])
+        return self
+
+    def _votes(self, X, rows, roots, n_rows):
+        """
+        Count the class votes of (row, tree) pairs, routing them through the stacked trees in batches.
+
+        Args:
+        X (np.array): Feature matrix.
+        rows (np.array): Row of X of every pair.
+        roots (np.array): Root node of the tree of every pair in the stacked tree.
+        n_rows (int): Number of rows of the vote table.
+
+        Returns:
+        np.array: Votes of shape (n_rows, n_classes).
+        """
+        n_classes = len(self.classes)
+        votes = np.zeros(n_rows * n_classes, dtype=np.int64)
+        for start in range(0, len(rows), self.batch_size):
+            batch_rows, batch_roots = rows[start:start + self.batch_size], roots[start:start + self.batch_size]
+            # A row whose value has no branch at a multiway node votes for the majority class of that node
+            nodes, _ = self.stacked.apply(X, batch_roots, batch_rows)
+            codes = self.stacked.value[nodes]
+            votes += np.bincount(batch_rows * n_classes + codes, minlength=len(votes))
+        return votes.reshape(n_rows, n_classes)
+
+    def predict_proba(self, X):
+        """
+        Predict the share of trees voting for every class.
+        All trees are routed together through one stacked FlatTree, one level at a time.
+
+        Args:
+        X (np.array): Feature matrix.
+
+        Returns:
+        np.array: Vote shares of shape (n_samples, n_classes), columns ordered as self.classes.
+        """
+        X = np.asarray(X)
+        n_trees = len(self.roots)
+        proba = np.empty((len(X), len(self.classes)))
+        step = max(1, self.batch_size // n_trees)  # Rows per batch
+        for start in range(0, len(X), step):
+            batch = X[start:start + step]
+            rows = np.tile(np.arange(len(batch)), n_trees)
+            roots = np.repeat(self.roots, len(batch))
+            proba[start:start + len(batch)] = self._votes(batch, rows, roots, len(batch)) / n_trees
+        return proba
+
+    def predict(self, X):
+        """
+        Predict class labels for input data by majority vote of the trees.
+
+        Args:
+        X (np.array): Feature matrix for which to predict the labels.
+
+        Returns:
+        np.array: Predicted class labels.
+        """
+        return self.classes[self.predict_proba(X).argmax(axis=1)]
+
+    def save(self, path):
+        """
+        Save the fitted forest, as its stacked tree arrays, in the binary model format (see save_model).
+
+        Args:
+        path (str): File to write.
+        """
+        if self.stacked is None:
+            raise ValueError("the forest is not fitted")
+        params = {"n_estimators": self.n_estimators, "max_depth": self.max_depth, "split": self.split,
+                  "max_bins": self.max_bins, "max_features": self.max_features, "bootstrap": self.bootstrap,
+                  "random_state": self.random_state}
+        save_model(path, "RandomForest", params, dict(self.stacked.arrays(), roots=self.roots, classes=self.classes))
+
+    @classmethod
+    def load(cls, path, mmap=True, verify=True):
+        """
+        Load a forest saved by save. Only the stacked tree is restored, which is all that prediction needs.
+
+        Args:
+        path (str): File to read.
+        mmap (bool): Memory-map the tree arrays instead of reading them into memory.
+        verify (bool): Check the file's checksum.
+
+        Returns:
+        RandomForest: The fitted forest.
+        """
+        params, arrays = load_model(path, "RandomForest", mmap, verify)
+        model = cls(**params)
+        model.classes = arrays["classes"]
+        model.roots = arrays["roots"]
+        model.stacked = FlatTree.from_arrays(arrays)
+        return model
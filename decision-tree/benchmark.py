@@ -0,0 +1,362 @@
+import argparse
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.datasets import load_digits, make_classification
+
+from DecisionTree import DecisionTree
+from HoeffdingTree import HoeffdingTree
+from metrics import classification_metrics, sklearn_metrics
+from RandomForest import RandomForest
+
+# Benchmarks for the DecisionTree implementation.
+# Run all of them with `python benchmark.py`, or pick some with `python benchmark.py fit`.
+
+
+def load_datasets(n_large=200000):
+    """
+    Load the benchmark datasets.
+
+    Args:
+    n_large (int): Number of rows of the synthetic dataset.
+
+    Returns:
+    dict: Dataset name -> (X, y).
+    """
+    digits = load_digits()
+    X, y = make_classification(n_samples=n_large, n_features=20, n_informative=10, n_classes=5, random_state=0)
+    # Round to a few distinct values per feature for multiway splits, which branch on every distinct value
+    return {"digits": (digits.data, digits.target), f"synthetic_{n_large}": (np.round(X), y),
+            f"continuous_{n_large}": (X, y)}
+
+
+def timed(fn, repeat=3):
+    """Return the best wall time of fn() over `repeat` runs, and its last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_fit(datasets):
+    """Training time for a few depth limits."""
+    print("== fit ==")
+    for name, (X, y) in datasets.items():
+        if name.startswith("continuous"):
+            continue  # Every value is distinct, see bench_threshold
+        for max_depth in (3, 8, None):
+            seconds, _ = timed(lambda: DecisionTree(max_depth=max_depth).fit(X, y))
+            print(f"{name:20s} max_depth={str(max_depth):5s} fit: {seconds * 1000:10.1f} ms")
+
+
+def bench_threshold(datasets):
+    """Training time and hold-out accuracy of multiway versus histogram-binned threshold splits."""
+    print("== threshold ==")
+    for name, (X, y) in datasets.items():
+        split_at = int(len(y) * 0.7)
+        for split in ("multiway", "threshold"):
+            if split == "multiway" and name.startswith("continuous"):
+                continue  # One branch per distinct value: the tree would memorise the training set
+            tree = DecisionTree(max_depth=10, split=split)
+            seconds, _ = timed(lambda: tree.fit(X[:split_at], y[:split_at]), repeat=1)
+            accuracy = np.mean(tree.predict(X[split_at:]) == y[split_at:])
+            print(f"{name:20s} {split:9s} fit: {seconds * 1000:10.1f} ms  accuracy: {accuracy:.3f}")
+
+
+def bench_memory(datasets):
+    """Peak memory allocated during fit, relative to the size of the training data."""
+    print("== memory ==")
+    for name, (X, y) in datasets.items():
+        for split in ("multiway", "threshold"):
+            if split == "multiway" and name.startswith("continuous"):
+                continue
+            tracemalloc.start()
+            DecisionTree(max_depth=None, split=split).fit(X, y)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{name:20s} {split:9s} peak: {peak / 2**20:8.1f} MiB  ({peak / X.nbytes:5.2f}x the size of X)")
+
+
+def bench_predict(datasets):
+    """Batch prediction throughput in rows per second."""
+    print("== predict ==")
+    for name, (X, y) in datasets.items():
+        split = "threshold" if name.startswith("continuous") else "multiway"
+        tree = DecisionTree(max_depth=12, split=split)
+        tree.fit(X, y)
+        rows = np.tile(X, (max(1, 1000000 // len(X)), 1))  # At least a million rows
+        seconds, _ = timed(lambda: tree.predict(rows))
+        print(f"{name:20s} {split:9s} nodes: {tree.flat_tree.n_nodes:7d}  predict: {len(rows) / seconds / 1e6:6.2f} M rows/s")
+
+
+def bench_parallel(datasets):
+    """Training time and speed-up of n_jobs worker processes over serial fit."""
+    print(f"== parallel ({os.cpu_count()} cores) ==")
+    job_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for name, (X, y) in datasets.items():
+        split = "threshold" if name.startswith("continuous") else "multiway"
+        serial = None
+        for n_jobs in job_counts:
+            seconds, _ = timed(lambda: DecisionTree(max_depth=12, split=split, n_jobs=n_jobs).fit(X, y), repeat=1)
+            serial = serial or seconds
+            print(f"{name:20s} {split:9s} n_jobs={n_jobs:<3d} fit: {seconds * 1000:10.1f} ms  speed-up: {serial / seconds:5.2f}x")
+
+
+def bench_forest(datasets):
+    """RandomForest training time, prediction throughput and accuracy versus the number of trees."""
+    print("== forest ==")
+    for name, (X, y) in datasets.items():
+        if name.startswith("synthetic"):
+            continue  # Rounded copy of the continuous dataset
+        split_at = int(len(y) * 0.7)
+        small = len(y) < 10000
+        max_depth = None if small else 10
+        for n_estimators in (1, 10, 50, 100) if small else (1, 10, 25):
+            forest = RandomForest(n_estimators, max_depth=max_depth, split="threshold", oob_score=True, random_state=0)
+            fit_seconds, _ = timed(lambda: forest.fit(X[:split_at], y[:split_at]), repeat=1)
+            predict_seconds, y_pred = timed(lambda: forest.predict(X[split_at:]), repeat=1)
+            print(f"{name:20s} trees={n_estimators:<4d} fit: {fit_seconds * 1000:10.1f} ms  "
+                  f"predict: {(len(y) - split_at) / predict_seconds / 1e3:8.1f} k rows/s  "
+                  f"accuracy: {np.mean(y_pred == y[split_at:]):.3f}  oob: {forest.oob_accuracy:.3f}")
+
+
+def peak_memory(fn):
+    """Return the wall time of fn(), the peak memory it allocated in bytes, and its result."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def bench_stream(datasets):
+    """In-memory versus streaming (memory-mapped) training and prediction: time and peak allocated memory."""
+    print("== stream ==")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (X, y) in datasets.items():
+            if not name.startswith("continuous"):
+                continue
+            np.save(os.path.join(tmp, "X.npy"), X)
+            np.save(os.path.join(tmp, "y.npy"), y)
+            X_map = np.load(os.path.join(tmp, "X.npy"), mmap_mode="r")
+            y_map = np.load(os.path.join(tmp, "y.npy"), mmap_mode="r")
+            print(f"{name}: X is {X.nbytes / 2**20:.1f} MiB")
+
+            tree = DecisionTree(max_depth=10, split="threshold")
+            seconds, peak, _ = peak_memory(lambda: tree.fit(X, y))
+            print(f"  fit in memory                          {seconds * 1000:10.1f} ms  peak: {peak / 2**20:8.1f} MiB")
+            for chunk_size, budget in ((10000, 2**27), (50000, 2**27), (50000, 2**25)):
+                tree = DecisionTree(max_depth=10, split="threshold")
+                seconds, peak, _ = peak_memory(lambda: tree.fit_stream(X_map, y_map, chunk_size, sample_size=50000,
+                                                                       histogram_budget=budget))
+                print(f"  fit_stream chunk={chunk_size:<6d} budget={budget / 2**20:3.0f} MiB  {seconds * 1000:10.1f} ms  "
+                      f"peak: {peak / 2**20:8.1f} MiB")
+
+            seconds, peak, _ = peak_memory(lambda: tree.predict(X))
+            print(f"  predict in memory                      {seconds * 1000:10.1f} ms  peak: {peak / 2**20:8.1f} MiB")
+            out = os.path.join(tmp, "predictions.npy")
+            seconds, peak, _ = peak_memory(lambda: tree.predict_stream(X_map, out, chunk_size=50000))
+            print(f"  predict_stream                         {seconds * 1000:10.1f} ms  peak: {peak / 2**20:8.1f} MiB")
+            del X_map, y_map
+
+
+def bench_pruning(datasets):
+    """Fit time, size, accuracy and predict latency under the early-stopping controls and cost-complexity pruning."""
+    print("== pruning ==")
+    settings = [{}, {"min_samples_leaf": 5}, {"min_samples_leaf": 20}, {"min_impurity_decrease": 1e-3},
+                {"min_impurity_decrease": 1e-2}, {"max_leaf_nodes": 16}, {"max_leaf_nodes": 64},
+                {"max_leaf_nodes": 256}]
+    for name, (X, y) in datasets.items():
+        split = "threshold" if name.startswith("continuous") else "multiway"
+        split_at = int(len(y) * 0.7)
+        X_train, y_train, X_test, y_test = X[:split_at], y[:split_at], X[split_at:], y[split_at:]
+
+        def report(label, tree, fit_seconds):
+            predict_seconds, y_pred = timed(lambda: tree.predict(X_test))
+            leaves = np.count_nonzero(tree.flat_tree.feature < 0)
+            print(f"{name:20s} {label:28s} fit: {fit_seconds * 1000:9.1f} ms  nodes: {tree.flat_tree.n_nodes:7d}  "
+                  f"leaves: {leaves:7d}  accuracy: {np.mean(y_pred == y_test):.3f}  "
+                  f"predict: {predict_seconds / len(X_test) * 1e9:6.1f} ns/row")
+
+        for params in settings:
+            tree = DecisionTree(split=split, **params)
+            seconds, _ = timed(lambda: tree.fit(X_train, y_train), repeat=1)
+            report(", ".join(f"{k}={v}" for k, v in params.items()) or "unconstrained", tree, seconds)
+            if not params:
+                unconstrained = tree
+
+        # Pruning path of the unconstrained tree, computed once and reused for every alpha
+        tree = unconstrained
+        seconds, (alphas, _) = timed(tree.cost_complexity_pruning_path, repeat=1)
+        print(f"{name:20s} pruning path: {len(alphas)} steps in {seconds * 1000:.1f} ms")
+        for alpha in np.quantile(alphas, [0.5, 0.9, 0.99]):
+            seconds, _ = timed(lambda: tree.prune(alpha), repeat=1)
+            report(f"ccp_alpha={alpha:.2e}", tree, seconds)
+
+
+def pickle_load(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+LOADERS = {
+    "pickle model": pickle_load,
+    "pickle dict": pickle_load,  # The nested dict of DecisionTree.tree
+    "load": lambda path: DecisionTree.load(path, mmap=False),
+    "load mmap": DecisionTree.load,
+}
+
+
+def anonymous_memory():
+    """Anonymous (private, not shareable) memory of this process in bytes, or None outside Linux."""
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Anonymous:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+
+
+def load_in_process(loader, path):
+    """Load a model in a fresh worker process, read all of its arrays, and return the anonymous memory it added."""
+    before = anonymous_memory()
+    model = LOADERS[loader](path)
+    if isinstance(model, DecisionTree):
+        sum(int(array.sum()) for array in model.flat_tree.arrays().values() if array.dtype.kind == "i")
+    after = anonymous_memory()
+    return None if before is None else after - before
+
+
+def bench_serialize(datasets):
+    """File size, load time and per-process memory of the model format versus pickle."""
+    print("== serialize ==")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (X, y) in datasets.items():
+            split = "threshold" if name.startswith("continuous") else "multiway"
+            tree = DecisionTree(split=split)
+            tree.fit(X, y)
+            paths = {loader: os.path.join(tmp, loader.replace(" ", "_")) for loader in LOADERS}
+            with open(paths["pickle model"], "wb") as f:
+                pickle.dump(tree, f)
+            with open(paths["pickle dict"], "wb") as f:
+                pickle.dump(tree.tree, f)
+            tree.save(paths["load"])
+            paths["load mmap"] = paths["load"]
+
+            print(f"{name} ({split}, {tree.flat_tree.n_nodes} nodes)")
+            for loader, path in paths.items():
+                seconds, _ = timed(lambda: LOADERS[loader](path))
+                # A freshly spawned interpreter per measurement: forked workers reuse heap pages from this process
+                with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                    memory = pool.submit(load_in_process, loader, path).result()
+                memory = "n/a" if memory is None else f"{memory / 2**20:6.2f} MiB"
+                print(f"  {loader:13s} file: {os.path.getsize(path) / 2**20:7.2f} MiB  load: {seconds * 1000:8.2f} ms  "
+                      f"process memory: {memory}")
+
+
+def import_time(module, repeat=5):
+    """Return the best wall time of importing a module in a fresh interpreter, minus the bare interpreter startup."""
+    def run(statement):
+        return timed(lambda: subprocess.run([sys.executable, "-c", statement], check=True), repeat)[0]
+    return run(f"import {module}") - run("pass")
+
+
+def bench_metrics(datasets):
+    """Import time of the modules, and evaluation time of the NumPy metrics versus sklearn.metrics."""
+    print("== metrics ==")
+    for module in ("numpy", "metrics", "DecisionTree", "sklearn.metrics"):
+        print(f"import {module:16s} {import_time(module) * 1000:8.1f} ms")
+    for name, (X, y) in datasets.items():
+        if name.startswith("continuous"):
+            continue
+        tree = DecisionTree(max_depth=8)
+        tree.fit(X, y)
+        y_pred = tree.predict(X)
+        numpy_seconds, results = timed(lambda: classification_metrics(y, y_pred))
+        sklearn_seconds, expected = timed(lambda: sklearn_metrics(y, y_pred))
+        difference = max(abs(results[key] - expected[key]) for key in results)
+        print(f"{name:20s} rows: {len(y):7d}  numpy: {numpy_seconds * 1000:8.2f} ms  sklearn: "
+              f"{sklearn_seconds * 1000:8.2f} ms  ({sklearn_seconds / numpy_seconds:5.1f}x)  max difference: {difference:.1e}")
+
+
+def bench_online(datasets, batch_size=1000, checkpoints=4):
+    """
+    Online learning: HoeffdingTree.partial_fit on a stream of batches versus refitting a DecisionTree on all the
+    data seen so far. At every checkpoint, reports the per-sample update time of the batches since the previous one,
+    the size of the online tree and its count tables, the time of the batch refit, and the test accuracy of both.
+    """
+    print("== online ==")
+    for name, (X, y) in datasets.items():
+        if name == "digits":
+            continue  # Too few rows for the Hoeffding bound to allow splits
+        split = "threshold" if name.startswith("continuous") else "multiway"
+        n_train = len(y) * 4 // 5
+        X_test, y_test = X[n_train:], y[n_train:]
+        online = HoeffdingTree(split=split)
+        classes = np.unique(y)
+        batch_starts = range(0, n_train, batch_size)
+        every = max(1, len(batch_starts) // checkpoints)
+        update_seconds, updated = 0.0, 0
+        for i, start in enumerate(batch_starts):
+            end = min(start + batch_size, n_train)
+            t0 = time.perf_counter()
+            online.partial_fit(X[start:end], y[start:end], classes=classes)
+            update_seconds += time.perf_counter() - t0
+            updated += end - start
+            if (i + 1) % every and end < n_train:
+                continue
+            def refit():
+                tree = DecisionTree(split=split, max_depth=10)
+                tree.fit(X[:end], y[:end])
+                return tree
+
+            refit_seconds, batch = timed(refit, repeat=1)
+            stats_mb = online.leaf_stats.nbytes / 2**20
+            print(f"{name:20s} seen: {end:7d}  update: {update_seconds / updated * 1e6:6.2f} us/sample  nodes: "
+                  f"{online.flat_tree.n_nodes:5d}  count tables: {stats_mb:6.1f} MB  accuracy: "
+                  f"{online.evaluate(X_test, y_test)['accuracy']:.4f}  | refit max_depth=10: "
+                  f"{refit_seconds * 1000:8.1f} ms  accuracy: {batch.evaluate(X_test, y_test)['accuracy']:.4f}")
+            update_seconds, updated = 0.0, 0
+
+
+BENCHMARKS = {
+    "fit": bench_fit,
+    "threshold": bench_threshold,
+    "memory": bench_memory,
+    "predict": bench_predict,
+    "parallel": bench_parallel,
+    "forest": bench_forest,
+    "stream": bench_stream,
+    "serialize": bench_serialize,
+    "pruning": bench_pruning,
+    "metrics": bench_metrics,
+    "online": bench_online,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the DecisionTree implementation.")
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--rows", type=int, default=200000, help="Rows of the synthetic dataset")
+    args = parser.parse_args()
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    datasets = load_datasets(args.rows)
+    for name in args.benchmarks or BENCHMARKS:
+        BENCHMARKS[name](datasets)
@@ -23,7 +23,7 @@ dt = DecisionTree(max_depth=3)
 dt.fit(X_train, y_train)
 
 # Make predictions on the test set
-y_pred = dt.predict(X_test, y_train)
+y_pred = dt.predict(X_test)
 
 # Evaluate the model
 evaluation_results = dt.evaluate(X_test, y_test)
@@ -31,5 +31,5 @@ print("Evaluation Results:", evaluation_results)
 
 # Predict for a specific instance
 sample = X_test[0].reshape(1, -1)
-predicted_class = dt.predict(sample, y_train)
+predicted_class = dt.predict(sample)
 print("Predicted class for sample:", predicted_class)
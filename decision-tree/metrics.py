@@ -0,0 +1,118 @@
+import numpy as np
+
+# Function to build a confusion matrix
+def confusion_matrix(y_true, y_pred, labels=None):
+    """
+    Build the confusion matrix of a set of predictions.
+    Both label arrays are encoded to class indices and every (true, predicted) pair is counted by a single bincount
+    over the flattened index true * n_classes + predicted.
+
+    Args:
+    y_true (np.array): True labels.
+    y_pred (np.array): Predicted labels.
+    labels (np.array): Sorted class labels that index the matrix. If None, the union of y_true and y_pred is used.
+
+    Returns:
+    tuple: (confusion matrix of shape (n_classes, n_classes) with true classes as rows, labels).
+    """
+    y_true, y_pred = np.asarray(y_true).ravel(), np.asarray(y_pred).ravel()
+    if len(y_true) != len(y_pred):
+        raise ValueError(f"y_true and y_pred have different lengths: {len(y_true)} and {len(y_pred)}")
+    if labels is None:
+        labels, codes = np.unique(np.concatenate([y_true, y_pred]), return_inverse=True)
+        true_codes, pred_codes = codes[:len(y_true)], codes[len(y_true):]
+    else:
+        labels = np.asarray(labels)
+        true_codes, pred_codes = _encode(y_true, labels), _encode(y_pred, labels)
+    n_classes = len(labels)
+    counts = np.bincount(true_codes * n_classes + pred_codes, minlength=n_classes * n_classes)
+    return counts.reshape(n_classes, n_classes), labels
+
+def _encode(y, labels):
+    """Return the index of every label of y in the sorted labels, raising ValueError for unknown labels."""
+    codes = np.searchsorted(labels, y)
+    if len(labels) == 0 or not (labels[np.minimum(codes, len(labels) - 1)] == y).all():
+        raise ValueError("y contains labels that are not in labels")
+    return codes
+
+# Function to divide count arrays, treating 0/0 as 0
+def _ratio(numerator, denominator):
+    numerator = np.asarray(numerator, dtype=np.float64)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+# Function to average per-class scores, 0 when there are no classes
+def _mean(scores):
+    return float(scores.mean()) if len(scores) else 0.0
+
+# Function to derive the classification metrics from a confusion matrix
+def metrics_from_confusion(matrix):
+    """
+    Calculate accuracy and the macro- and micro-averaged precision, recall and F1-score from a confusion matrix.
+    Classes without predicted (or true) samples get a precision (or recall) of 0, like sklearn's zero_division=0.
+
+    Args:
+    matrix (np.array): Confusion matrix with true classes as rows.
+
+    Returns:
+    dict: Float metrics "accuracy", "precision", "recall", "f1_score" (macro-averaged) and "micro_precision",
+    "micro_recall", "micro_f1_score".
+    """
+    true_positives = np.diag(matrix)
+    predicted = matrix.sum(axis=0)
+    actual = matrix.sum(axis=1)
+    precision = _ratio(true_positives, predicted)
+    recall = _ratio(true_positives, actual)
+    f1 = _ratio(2 * precision * recall, precision + recall)
+
+    # Micro averages pool the counts of all classes before dividing
+    total_tp, total_predicted, total_actual = true_positives.sum(), predicted.sum(), actual.sum()
+    micro_precision = float(_ratio(total_tp, total_predicted))
+    micro_recall = float(_ratio(total_tp, total_actual))
+    micro_f1 = float(_ratio(2 * micro_precision * micro_recall, micro_precision + micro_recall))
+    return {
+        "accuracy": float(_ratio(total_tp, matrix.sum())),
+        "precision": _mean(precision),
+        "recall": _mean(recall),
+        "f1_score": _mean(f1),
+        "micro_precision": micro_precision,
+        "micro_recall": micro_recall,
+        "micro_f1_score": micro_f1,
+    }
+
+# Function to calculate the classification metrics of a set of predictions
+def classification_metrics(y_true, y_pred, labels=None):
+    """
+    Calculate accuracy and the macro- and micro-averaged precision, recall and F1-score of a set of predictions.
+    Only NumPy is used; the results match sklearn.metrics with average="macro" / "micro" and zero_division=0.
+
+    Args:
+    y_true (np.array): True labels.
+    y_pred (np.array): Predicted labels.
+    labels (np.array): Sorted class labels to average over. If None, the union of y_true and y_pred is used.
+
+    Returns:
+    dict: Float metrics, see metrics_from_confusion.
+    """
+    matrix, _ = confusion_matrix(y_true, y_pred, labels)
+    return metrics_from_confusion(matrix)
+
+# Function to calculate the same metrics with sklearn, for cross-checking
+def sklearn_metrics(y_true, y_pred):
+    """
+    Calculate the metrics of classification_metrics with sklearn.metrics, which is only imported here.
+
+    Args:
+    y_true (np.array): True labels.
+    y_pred (np.array): Predicted labels.
+
+    Returns:
+    dict: Float metrics with the same keys as classification_metrics.
+    """
+    from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+
+    results = {"accuracy": float(accuracy_score(y_true, y_pred))}
+    for average, prefix in (("macro", ""), ("micro", "micro_")):
+        results[prefix + "precision"] = float(precision_score(y_true, y_pred, average=average, zero_division=0))
+        results[prefix + "recall"] = float(recall_score(y_true, y_pred, average=average, zero_division=0))
+        results[prefix + "f1_score"] = float(f1_score(y_true, y_pred, average=average, zero_division=0))
+    return results
@@ -1,9 +1,113 @@
-import heapq
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'search-core'))
+from instrumentation import SearchStats
+from search import Problem, ara_star, beam_search, search
+
+class SlidingPuzzle(Problem):
+    def __init__(self, initial_state, goal_state):
+        """
+        The n x n sliding-tile puzzle as a search problem (see search-core/search.py).
+        States are flat tuples of the tiles in row-major order, with 0 for the blank. Keys pack them into an int with
+        4 bits per tile up to the 15-puzzle (so they fit in 64 bits, see search-core/external.py) and 8 bits above.
+
+        :param initial_state: n x n list of lists.
+        :param goal_state: n x n list of lists.
+        """
+        self.size = len(goal_state)
+        self.start = tuple(tile for row in initial_state for tile in row)
+        self.goal = tuple(tile for row in goal_state for tile in row)
+        n = self.size
+        # Cells the blank can move to from every cell
+        self.moves = [[r * n + c for r, c in ((cell // n - 1, cell % n), (cell // n + 1, cell % n),
+                                               (cell // n, cell % n - 1), (cell // n, cell % n + 1))
+                       if 0 <= r < n and 0 <= c < n] for cell in range(n * n)]
+        # Manhattan distance of every tile from every cell to its goal cell (0 for the blank)
+        goal_cell = {tile: cell for cell, tile in enumerate(self.goal)}
+        self.distance = [[0 if tile == 0 else abs(cell // n - goal_cell[tile] // n) + abs(cell % n - goal_cell[tile] % n)
+                          for cell in range(n * n)] for tile in range(n * n)]
+
+    def initial(self):
+        return self.start
+
+    def is_goal(self, state):
+        return state == self.goal
+
+    def successors(self, state):
+        """Returns the states after sliding each neighbouring tile into the blank, each costing one move."""
+        blank = state.index(0)
+        result = []
+        for cell in self.moves[blank]:
+            tiles = list(state)
+            tiles[blank], tiles[cell] = tiles[cell], 0
+            result.append((tuple(tiles), 1))
+        return result
+
+    def heuristic(self, state):
+        """Sum of the Manhattan distances of the tiles to their goal cells."""
+        distance = self.distance
+        return sum(distance[tile][cell] for cell, tile in enumerate(state))
+
+    def key(self, state):
+        if len(state) <= 16:
+            return int(bytes(state).hex()[1::2], 16)  # The low hex digit of every byte is the tile
+        return int.from_bytes(bytes(state), 'big')
+
+    def state(self, key):
+        cells = len(self.goal)
+        if cells <= 16:
+            return tuple(bytes.fromhex('0' + '0'.join(f'{key:0{cells}x}')))
+        return tuple(key.to_bytes(cells, 'big'))
+
+    def to_grid(self, state):
+        """Converts a flat state back to an n x n list of lists."""
+        n = self.size
+        return [list(state[r * n:(r + 1) * n]) for r in range(n)]
+
+
+class PatternPuzzle(SlidingPuzzle):
+    def __init__(self, goal_state, pattern, initial_state=None):
+        """
+        Abstraction of the sliding puzzle that only tells apart the blank and the tiles of a pattern; the other tiles
+        are interchangeable (shown as -1). Breadth-first search of the whole abstract space from the goal gives the
+        distances of a pattern database. Keys pack the cells of the blank and the pattern tiles, 4 bits each, so the
+        key of a 15-puzzle pattern of up to 15 tiles fits in 64 bits.
+
+        :param goal_state: n x n list of lists.
+        :param pattern: Tiles to keep.
+        :param initial_state: n x n list of lists; the goal if None.
+        """
+        super().__init__(initial_state or goal_state, goal_state)
+        self.pattern = (0,) + tuple(tile for tile in pattern if tile != 0)
+        self.start = self.abstract(self.start)
+        self.goal = self.abstract(self.goal)
+        self.distance.append([0] * len(self.goal))  # distance[-1]: the interchangeable tiles count for nothing
+
+    def abstract(self, state):
+        """Replaces the tiles outside the pattern by -1."""
+        kept = set(self.pattern)
+        return tuple(tile if tile in kept else -1 for tile in state)
+
+    def key(self, state):
+        key = 0
+        for tile in reversed(self.pattern):
+            key = key << 4 | state.index(tile)
+        return key
+
+    def state(self, key):
+        tiles = [-1] * len(self.goal)
+        for tile in self.pattern:
+            tiles[key & 15] = tile
+            key >>= 4
+        return tuple(tiles)
+
 
 class EightPuzzleAStar:
     def __init__(self, initial_state, goal_state):
         self.initial_state = initial_state
         self.goal_state = goal_state  # Goal state
+        self.problem = SlidingPuzzle(initial_state, goal_state)
 
     def display_state(self, state):
         """Displays the puzzle state."""
@@ -13,56 +117,66 @@ class EightPuzzleAStar:
 
     def get_possible_moves(self, state):
         """Returns the possible states after moving the blank tile."""
-        possible_moves = []
-        blank_position = [(r, c) for r, row in enumerate(state) for c, val in enumerate(row) if val == 0][0]
-
-        r, c = blank_position
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Up, Down, Left, Right
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < 3 and 0 <= nc < 3:
-                new_state = [list(row) for row in state]  # Copy the current state
-                new_state[r][c], new_state[nr][nc] = new_state[nr][nc], new_state[r][c]  # Swap blank with target tile
-                possible_moves.append(new_state)
-
-        return possible_moves
+        flat = tuple(tile for row in state for tile in row)
+        return [self.problem.to_grid(next_state) for next_state, _ in self.problem.successors(flat)]
 
     def heuristic(self, state):
         """Calculates the Manhattan distance."""
-        distance = 0
-        for i in range(3):
-            for j in range(3):
-                value = state[i][j]
-                if value != 0:
-                    target_x = (value - 1) // 3
-                    target_y = (value - 1) % 3
-                    distance += abs(i - target_x) + abs(j - target_y)
-        return distance
-
-    def a_star(self):
-        """A* search algorithm for solving the 8-puzzle problem."""
-        heap = []
-        heapq.heappush(heap, (0, self.initial_state))
-        visited = set()
-
-        while heap:
-            _, current_state = heapq.heappop(heap)
-
-            if current_state == self.goal_state:
-                self.display_state(current_state)
-                print("Reached the goal!")
-                return
-
-            visited.add(tuple(map(tuple, current_state)))  # Convert list to tuple for hashing
-            self.display_state(current_state)
-
-            for next_state in self.get_possible_moves(current_state):
-                if tuple(map(tuple, next_state)) not in visited:
-                    cost = self.heuristic(next_state)
-                    heapq.heappush(heap, (cost, next_state))
+        return self.problem.heuristic(tuple(tile for row in state for tile in row))
 
-        print("No solution found.")
+    def a_star(self, stats=None):
+        """
+        A* search algorithm for solving the 8-puzzle problem. The solution has the fewest possible moves.
+        :param stats: Optional SearchStats to report the search's work into.
+        :return: List of states from the initial state to the goal, or None if the goal is unreachable.
+        """
+        path, _ = search(self.problem, 'astar', frontier='bucket', stats=stats)
+        return self.to_grids(path)
+
+    def weighted_a_star(self, weight=2.0, time_limit=None, stats=None):
+        """
+        Weighted A* search with priority g + weight * h. Expands far fewer states than A* on hard instances, and
+        since the Manhattan distance is consistent the solution has at most `weight` times the fewest possible moves.
+        :param weight: Weight of the heuristic (at least 1; 1 is A*).
+        :param time_limit: Time budget in seconds (None for unlimited).
+        :param stats: Optional SearchStats to report the search's work into.
+        :return: List of states from the initial state to the goal, or None if the goal is unreachable or was not
+            reached in the time limit.
+        """
+        path, _ = search(self.problem, 'wastar', weight=weight, frontier='bucket', time_limit=time_limit, stats=stats)
+        return self.to_grids(path)
 
+    def anytime_a_star(self, time_limit, weight=3.0, weight_step=0.5, stats=None):
+        """
+        Anytime Repairing A* (ARA*): a fast weighted A* solution first, then better ones with lower weights, reusing
+        the earlier search effort, until the solution is optimal or the time runs out.
+        :param time_limit: Time budget in seconds (None to run until the solution is proven optimal).
+        :param weight: Weight of the heuristic in the first search.
+        :param weight_step: Decrease of the weight after every search.
+        :param stats: Optional SearchStats to report the search's work into.
+        :return: Tuple (list of states of the best solution found, bound on its cost relative to the optimum, 1.0 if
+            optimal), or (None, None) if no solution was found in the time limit.
+        """
+        path = bound = None
+        for path, _, bound in ara_star(self.problem, weight, weight_step, time_limit, stats):
+            pass
+        return self.to_grids(path), bound
+
+    def beam_search(self, width=1000, time_limit=None, stats=None):
+        """
+        Beam search: breadth-first with only the `width` states of lowest g + h kept at every depth. Time and memory
+        per depth are bounded, but there is no bound on the solution length and it can fail on solvable instances.
+        :param width: Number of states kept at every depth.
+        :param time_limit: Time budget in seconds (None for unlimited).
+        :param stats: Optional SearchStats to report the search's work into.
+        :return: List of states from the initial state to the goal, or None if no solution was found.
+        """
+        path, _ = beam_search(self.problem, width, time_limit=time_limit, stats=stats)
+        return self.to_grids(path)
+
+    def to_grids(self, path):
+        """Converts a path of flat states to a list of grids (None stays None)."""
+        return None if path is None else [self.problem.to_grid(state) for state in path]
 
 if __name__ == "__main__":
     initial_state = [
@@ -76,4 +190,12 @@ if __name__ == "__main__":
         [7, 8, 0]
     ]
     puzzle = EightPuzzleAStar(initial_state, goal_state)
-    puzzle.a_star()
+    stats = SearchStats('eight_puzzle_a_star')
+    path = puzzle.a_star(stats=stats)
+    if path is None:
+        print("No solution found.")
+    else:
+        for state in path:
+            puzzle.display_state(state)
+        print(f"Reached the goal in {len(path) - 1} moves!")
+    print(stats.to_json())
@@ -1,8 +1,25 @@
-class EightPuzzleHillClimbing:
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'search-core'))
+from instrumentation import SearchStats
+from search import Problem, hill_climbing
+
+class EightPuzzleHillClimbing(Problem):
     def __init__(self, initial_state, goal_state):
+        """The 8-puzzle as a search problem (see search-core/search.py) on 3x3 list-of-lists states."""
         self.initial_state = initial_state
         self.goal_state = goal_state
 
+    def initial(self):
+        return self.initial_state
+
+    def is_goal(self, state):
+        return state == self.goal_state
+
+    def successors(self, state):
+        return [(next_state, 1) for next_state in self.get_possible_moves(state)]
+
     def display_state(self, state):
         """Displays the current puzzle state in a 3x3 grid format."""
         for row in state:
@@ -34,27 +51,24 @@ class EightPuzzleHillClimbing:
                     misplaced_tiles += 1
         return misplaced_tiles
 
-    def hill_climbing(self):
-        """Solves the 8-puzzle problem using Hill Climbing."""
-        current_state = self.initial_state
-        self.display_state(current_state)
-
-        while True:
-            possible_moves = self.get_possible_moves(current_state)
-            next_state = min(possible_moves, key=self.heuristic)
-
-            if self.heuristic(next_state) >= self.heuristic(current_state):
-                print("Reached a local optimum!")
-                break
-
-            current_state = next_state
-            self.display_state(current_state)
-
-        if current_state == self.goal_state:
-            print("Reached the goal state!")
-        else:
-            print("Couldn't solve the puzzle with Hill Climbing.")
-
+    def hill_climbing(self, stats=None, verbose=True):
+        """
+        Solves the 8-puzzle problem using Hill Climbing.
+        :param stats: Optional SearchStats to report the search's work into.
+        :param verbose: Print every state on the way and the outcome.
+        :return: The state where the climb stopped.
+        """
+        path, _ = hill_climbing(self, stats=stats)
+        current_state = path[-1]
+        if verbose:
+            for state in path:
+                self.display_state(state)
+            print("Reached a local optimum!")
+            if self.is_goal(current_state):
+                print("Reached the goal state!")
+            else:
+                print("Couldn't solve the puzzle with Hill Climbing.")
+        return current_state
 
 if __name__ == "__main__":
     initial_state = [
@@ -68,4 +82,6 @@ if __name__ == "__main__":
         [7, 8, 0]
     ]
     puzzle = EightPuzzleHillClimbing(initial_state, goal_state)
-    puzzle.hill_climbing()
+    stats = SearchStats('eight_puzzle_hill_climbing')
+    puzzle.hill_climbing(stats=stats)
+    print(stats.to_json())
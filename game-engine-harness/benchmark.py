@@ -0,0 +1,115 @@
+"""
+Self-play throughput and move-latency regression benchmark.
+
+Times each engine's move selection (TicTacToe.best_move / TicTacToe.ai_move / MCTS.best_move, through the adapters in
+engines.py) on a fixed set of positions, then measures games per second for a short self-play batch. Results can be
+saved as a baseline and later runs compared against it; the script exits with status 1 if any timing got slower than
+the baseline by more than the tolerance. test_benchmark.py tracks the same move timings as a pytest-benchmark suite.
+
+Example:
+    python benchmark.py --save baseline.json
+    python benchmark.py --baseline baseline.json --tolerance 0.2
+"""
+import argparse
+import json
+import sys
+import time
+
+from engines import EMPTY, make_engine
+from runner import run_games
+
+# (name, board, player to move)
+POSITIONS = [
+    ('empty', ['___', '___', '___'], 'X'),
+    ('center_opening', ['___', '_X_', '___'], 'O'),
+    ('corner_fork', ['X__', '_O_', '__X'], 'O'),
+    ('must_block', ['OO_', '_X_', 'X__'], 'X'),
+    ('endgame', ['XOX', 'OX_', 'O__'], 'X'),
+]
+
+ENGINE_SPECS = ['alphabeta', 'table', 'mcts:iterations=500,seed=0']  # 'minimax' is unpruned and takes seconds per move
+
+
+def time_move(engine, board, player, min_time=0.2):
+    """
+    Times engine.choose on one position, repeating until at least min_time seconds have been spent.
+
+    :return: Dict with the best and mean time per call in microseconds, and the nodes searched.
+    """
+    timings = []
+    start = time.perf_counter()
+    while not timings or time.perf_counter() - start < min_time:
+        t = time.perf_counter_ns()
+        engine.choose([list(row) for row in board], player)
+        timings.append((time.perf_counter_ns() - t) / 1000)
+    return {'best_us': min(timings), 'mean_us': sum(timings) / len(timings), 'rounds': len(timings),
+            'nodes': engine.nodes}
+
+
+def run_benchmark(specs=ENGINE_SPECS, games=50, min_time=0.2):
+    """
+    Runs the move-latency and self-play benchmarks.
+
+    :param specs: Engine specs to benchmark.
+    :param games: Games per self-play throughput measurement.
+    :param min_time: Minimum time spent per position.
+    :return: Dict of results keyed by "<engine>/<position>" and "<engine>/selfplay".
+    """
+    results = {}
+    for spec in specs:
+        engine = make_engine(spec)
+        for name, rows, player in POSITIONS:
+            board = [[EMPTY if cell == '_' else cell for cell in row] for row in rows]
+            results[f"{spec}/{name}"] = time_move(engine, board, player, min_time)
+        if hasattr(engine, 'close'):
+            engine.close()
+
+        start = time.perf_counter()
+        summary, _, _ = run_games(spec, 'random', games, random_openings=1, swap_sides=True, seed=0)
+        elapsed = time.perf_counter() - start
+        results[f"{spec}/selfplay"] = {'best_us': elapsed / games * 1e6, 'games_per_s': games / elapsed,
+                                       'p99_move_us': summary['sides']['a']['latency_us']['p99']}
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares best times against a baseline.
+
+    :return: List of (key, baseline time, current time) for every regression beyond the tolerance.
+    """
+    regressions = []
+    for key, current in results.items():
+        if key in baseline and current['best_us'] > baseline[key]['best_us'] * (1 + tolerance):
+            regressions.append((key, baseline[key]['best_us'], current['best_us']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Tic-Tac-Toe engine move latency and self-play throughput.")
+    parser.add_argument('--engines', nargs='+', default=ENGINE_SPECS)
+    parser.add_argument('--games', type=int, default=50)
+    parser.add_argument('--min-time', type=float, default=0.2, help="Seconds spent timing each position")
+    parser.add_argument('--save', help="Write the results to this JSON file")
+    parser.add_argument('--baseline', help="Compare against results saved with --save")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown, as a fraction")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.engines, args.games, args.min_time)
+    for key, value in results.items():
+        print(f"{key:45s} {value['best_us']:14.1f} us")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for key, before, after in regressions:
+            print(f"REGRESSION {key}: {before:.1f} us -> {after:.1f} us")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Engine adapters for the headless harness.
+
+Every game engine in the repository lives in its own folder and exposes a slightly different move API:
+    * min-max-algo-game-theory/tic_tac_toe.py: TicTacToe.ai_move() plays 'O' on a board with ' ' for empty cells.
+    * minmax-with-alpha-beta-pruning/tic_tac_toe.py: TicTacToe.best_move() returns a move for 'X' on a '_' board.
+    * monte-carlo-tree-search/MCTS.py: MCTS.best_move(board, player, empty) works for either player.
+The adapters below wrap them behind a single interface, `choose(board, player)`, on a board that uses 'X', 'O' and
+EMPTY, and report how much work the last move took (the search engines through the SearchStats of
+search-core/instrumentation.py).
+"""
+import importlib.util
+import os
+import random
+import sys
+
+EMPTY = '_'
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_module(folder, filename, name):
+    """
+    Imports a module from one of the repository's algorithm folders.
+    The folders are not packages and two of them contain a tic_tac_toe.py, so each module is loaded under a unique name
+    with its own folder on sys.path (for its sibling imports such as `from MinMax import MinMax`).
+
+    :param folder: Folder name relative to the repository root.
+    :param filename: File name of the module inside the folder.
+    :param name: Unique name to register the module under.
+    :return: The imported module.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    path = os.path.join(REPO_ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(path, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def swap_symbols(board, player, ai_symbol, empty):
+    """
+    Copies the board so that `player` appears as `ai_symbol` and the opponent as the other symbol.
+
+    :param board: List-of-lists board using 'X', 'O' and EMPTY.
+    :param player: Symbol the engine is asked to play.
+    :param ai_symbol: Symbol the wrapped engine always plays.
+    :param empty: Empty-cell symbol expected by the wrapped engine.
+    :return: New board in the wrapped engine's symbols.
+    """
+    other = 'O' if ai_symbol == 'X' else 'X'
+    return [[empty if cell == EMPTY else (ai_symbol if cell == player else other) for cell in row] for row in board]
+
+
+class Engine:
+    name = 'engine'
+
+    def __init__(self):
+        self.nodes = 0     # Positions searched for the last move
+        self.cutoffs = 0   # Alpha-beta cutoffs for the last move
+        self.stats = None  # SearchStats of the last move, for engines that report them
+
+    def choose(self, board, player):
+        """
+        Chooses a move for `player`.
+
+        :param board: List-of-lists board using 'X', 'O' and EMPTY.
+        :param player: Symbol to move ('X' or 'O').
+        :return: (row, col) of the move.
+        """
+        raise NotImplementedError
+
+    def set_time_budget(self, seconds):
+        """Limits the time spent on the next moves; ignored by engines that always search to the end."""
+
+
+class RandomEngine(Engine):
+    name = 'random'
+
+    def __init__(self, seed=None):
+        super().__init__()
+        self.rng = random.Random(seed)
+
+    def choose(self, board, player):
+        self.nodes = self.cutoffs = 0
+        moves = [(i, j) for i, row in enumerate(board) for j, cell in enumerate(row) if cell == EMPTY]
+        return self.rng.choice(moves)
+
+
+def new_stats(name):
+    """Returns an empty SearchStats from search-core/instrumentation.py."""
+    return load_module('search-core', 'instrumentation.py', 'instrumentation').SearchStats(name)
+
+
+class MinMaxEngine(Engine):
+    name = 'minimax'
+
+    def __init__(self, use_table=False):
+        super().__init__()
+        module = load_module('min-max-algo-game-theory', 'tic_tac_toe.py', 'minmax_tic_tac_toe')
+        self.game = module.TicTacToe(use_table=use_table)
+        if use_table:
+            self.name = 'table'
+
+    def choose(self, board, player):
+        self.game.board = swap_symbols(board, player, 'O', ' ')
+        before = [row[:] for row in self.game.board]
+        self.stats = None if self.game.use_table else new_stats(self.name)  # A table lookup searches nothing
+        self.game.ai_move(stats=self.stats)
+        self.nodes, self.cutoffs = (self.stats.nodes_generated if self.stats else 0), 0
+        for i in range(3):
+            for j in range(3):
+                if before[i][j] != self.game.board[i][j]:
+                    return i, j
+        return None
+
+
+class AlphaBetaEngine(Engine):
+    name = 'alphabeta'
+
+    def __init__(self):
+        super().__init__()
+        self.module = load_module('minmax-with-alpha-beta-pruning', 'tic_tac_toe.py', 'alphabeta_tic_tac_toe')
+        self.game = self.module.TicTacToe(use_table=False)  # Time the search; the 'table' engine covers lookups
+
+    def choose(self, board, player):
+        self.game.board = swap_symbols(board, player, self.module.PLAYER_X, self.module.EMPTY)
+        self.stats = new_stats(self.name)
+        move = self.game.best_move(stats=self.stats)
+        self.nodes, self.cutoffs = self.stats.nodes_generated, self.stats.cutoffs
+        return move
+
+
+class MCTSEngine(Engine):
+    name = 'mcts'
+
+    def __init__(self, size=3, iterations=1000, time_limit=None, workers=1, seed=None):
+        super().__init__()
+        module = load_module('monte-carlo-tree-search', 'MCTS.py', 'MCTS')
+        self.engine = module.MCTS(size, iterations=iterations, time_limit=time_limit, workers=workers, seed=seed)
+
+    def choose(self, board, player):
+        move = self.engine.best_move(board, player, EMPTY)
+        self.nodes, self.cutoffs = self.engine.last_iterations, 0
+        return move
+
+    def set_time_budget(self, seconds):
+        self.engine.time_limit = seconds
+
+    def close(self):
+        self.engine.close()
+
+
+ENGINES = {
+    'random': RandomEngine,
+    'minimax': MinMaxEngine,
+    'table': lambda: MinMaxEngine(use_table=True),
+    'alphabeta': AlphaBetaEngine,
+    'mcts': MCTSEngine,
+}
+
+
+def make_engine(spec, seed=None):
+    """
+    Builds an engine from a spec string such as 'alphabeta' or 'mcts:iterations=500,time_limit=0.05'.
+
+    :param spec: Engine name optionally followed by ':' and comma-separated key=value options.
+    :param seed: Seed passed to engines that accept one (random, mcts) unless the spec sets it.
+    :return: Engine instance.
+    :raises ValueError: If the engine name is unknown.
+    """
+    name, _, options = spec.partition(':')
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}', expected one of {', '.join(ENGINES)}")
+    kwargs = {}
+    for option in filter(None, options.split(',')):
+        key, _, value = option.partition('=')
+        if value == 'None':
+            kwargs[key] = None
+            continue
+        for cast in (int, float):
+            try:
+                value = cast(value)
+                break
+            except ValueError:
+                pass
+        kwargs[key] = value
+    if name in ('random', 'mcts'):
+        kwargs.setdefault('seed', seed)
+    return ENGINES[name](**kwargs)
@@ -0,0 +1,96 @@
+"""
+Load generator for server.py.
+
+Opens many concurrent connections, sends move requests for random reachable positions and reports throughput and
+latency percentiles.
+
+Example:
+    python server.py --workers 4 &
+    python load_test.py --clients 50 --requests 200 --engine alphabeta
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from runner import check_winner, percentile
+
+
+def random_position(rng):
+    """Returns (board rows, player to move) for a random non-terminal position reached by random play."""
+    while True:
+        board = [['_'] * 3 for _ in range(3)]
+        player = 'X'
+        for _ in range(rng.randrange(0, 8)):
+            i, j = rng.choice([(i, j) for i in range(3) for j in range(3) if board[i][j] == '_'])
+            board[i][j] = player
+            player = 'O' if player == 'X' else 'X'
+        if check_winner(board) is None:
+            return [''.join(row) for row in board], player
+
+
+async def client(host, port, requests, engine, time_budget, rng, latencies, errors):
+    """Sends `requests` requests one after another over one connection."""
+    reader, writer = await asyncio.open_connection(host, port)
+    for request_id in range(requests):
+        board, player = random_position(rng)
+        message = {'id': request_id, 'board': board, 'player': player, 'engine': engine, 'time_budget': time_budget}
+        start = time.perf_counter()
+        writer.write(json.dumps(message).encode() + b'\n')
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append((time.perf_counter() - start) * 1000)
+        if 'error' in response:
+            errors.append(response['error'])
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load(host, port, clients, requests, engine, time_budget, seed):
+    """
+    Runs the load test.
+
+    :return: Dict with request count, errors, throughput and latency percentiles in milliseconds.
+    """
+    latencies, errors = [], []
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, requests, engine, time_budget, random.Random(rng.random()),
+                                  latencies, errors) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"op": "stats"}\n')
+    server_stats = json.loads(await reader.readline())
+    writer.close()
+
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput_rps': len(latencies) / elapsed,
+        'latency_ms': {'p50': percentile(latencies, 50), 'p90': percentile(latencies, 90),
+                       'p99': percentile(latencies, 99), 'max': latencies[-1] if latencies else None},
+        'server': server_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate load against the move server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=100, help="Requests per client")
+    parser.add_argument('--engine', default='alphabeta')
+    parser.add_argument('--time-budget', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args.host, args.port, args.clients, args.requests, args.engine,
+                                  args.time_budget, args.seed))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Headless batch game runner.
+
+Plays engine-versus-engine (or engine-versus-random) Tic-Tac-Toe games without input() or printing, optionally
+spread across processes, and records per-move latency, nodes searched and alpha-beta cutoffs.
+
+Example:
+    python runner.py alphabeta random --games 1000 --workers 4 --json results.json
+    python runner.py mcts:iterations=500 table --games 200 --swap-sides --csv moves.csv
+"""
+import argparse
+import csv
+import json
+import math
+import random
+import time
+from multiprocessing import Pool
+
+from engines import EMPTY, make_engine
+
+LINES = [
+    [(0, 0), (0, 1), (0, 2)], [(1, 0), (1, 1), (1, 2)], [(2, 0), (2, 1), (2, 2)],  # Rows
+    [(0, 0), (1, 0), (2, 0)], [(0, 1), (1, 1), (2, 1)], [(0, 2), (1, 2), (2, 2)],  # Columns
+    [(0, 0), (1, 1), (2, 2)], [(0, 2), (1, 1), (2, 0)]                              # Diagonals
+]
+
+
+def check_winner(board):
+    """Returns 'X' or 'O' if that player has three in a row, otherwise None."""
+    for line in LINES:
+        a, b, c = (board[r][col] for r, col in line)
+        if a == b == c != EMPTY:
+            return a
+    return None
+
+
+def play_game(engines, random_openings=0, rng=None):
+    """
+    Plays a single game between two engines. 'X' always moves first.
+
+    :param engines: Dict mapping 'X' and 'O' to Engine instances.
+    :param random_openings: Number of initial plies played at random, to diversify deterministic engines.
+    :param rng: random.Random used for the opening plies.
+    :return: Tuple (winner symbol or None for a draw, list of move records).
+    """
+    rng = rng or random.Random()
+    board = [[EMPTY] * 3 for _ in range(3)]
+    player = 'X'
+    records = []
+    for ply in range(9):
+        if ply < random_openings:
+            move = rng.choice([(i, j) for i in range(3) for j in range(3) if board[i][j] == EMPTY])
+        else:
+            engine = engines[player]
+            start = time.perf_counter_ns()
+            move = engine.choose([row[:] for row in board], player)
+            latency = time.perf_counter_ns() - start
+            records.append({'engine': engine.name, 'player': player, 'ply': ply, 'latency_ns': latency,
+                            'nodes': engine.nodes, 'cutoffs': engine.cutoffs})
+        board[move[0]][move[1]] = player
+        winner = check_winner(board)
+        if winner:
+            return winner, records
+        player = 'O' if player == 'X' else 'X'
+    return None, records
+
+
+def _play_batch(args):
+    """Plays a batch of games in one process and returns (results, move records)."""
+    spec_a, spec_b, game_ids, random_openings, swap_sides, seed = args
+    engine_a = make_engine(spec_a, seed)
+    engine_b = make_engine(spec_b, None if seed is None else seed + 1)
+    results, moves = [], []
+    for game_id in game_ids:
+        rng = random.Random(None if seed is None else seed * 1000003 + game_id)
+        a_plays_x = not (swap_sides and game_id % 2)
+        engines = {'X': engine_a, 'O': engine_b} if a_plays_x else {'X': engine_b, 'O': engine_a}
+        winner, records = play_game(engines, random_openings, rng)
+        for record in records:
+            record['game'] = game_id
+            record['side'] = 'a' if (record['player'] == 'X') == a_plays_x else 'b'
+        moves.extend(records)
+        results.append({'game': game_id, 'a_plays': 'X' if a_plays_x else 'O',
+                        'winner': None if winner is None else ('a' if (winner == 'X') == a_plays_x else 'b')})
+    for engine in (engine_a, engine_b):
+        if hasattr(engine, 'close'):
+            engine.close()
+    return results, moves
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def summarize(results, moves):
+    """
+    Aggregates game results and move records.
+
+    :param results: List of per-game result dicts.
+    :param moves: List of per-move record dicts.
+    :return: Dict with win/draw counts and, per side, latency percentiles (microseconds), nodes and cutoff rate.
+    """
+    summary = {
+        'games': len(results),
+        'wins_a': sum(r['winner'] == 'a' for r in results),
+        'wins_b': sum(r['winner'] == 'b' for r in results),
+        'draws': sum(r['winner'] is None for r in results),
+        'sides': {},
+    }
+    for side in ('a', 'b'):
+        side_moves = [m for m in moves if m['side'] == side]
+        if not side_moves:
+            continue
+        latencies = sorted(m['latency_ns'] / 1000 for m in side_moves)
+        nodes = sum(m['nodes'] for m in side_moves)
+        cutoffs = sum(m['cutoffs'] for m in side_moves)
+        summary['sides'][side] = {
+            'engine': side_moves[0]['engine'],
+            'moves': len(side_moves),
+            'latency_us': {'p50': percentile(latencies, 50), 'p90': percentile(latencies, 90),
+                           'p99': percentile(latencies, 99), 'max': latencies[-1],
+                           'mean': sum(latencies) / len(latencies)},
+            'nodes_per_move': nodes / len(side_moves),
+            'cutoff_rate': cutoffs / nodes if nodes else 0.0,
+        }
+    return summary
+
+
+def run_games(spec_a, spec_b, games=100, workers=1, random_openings=0, swap_sides=False, seed=None):
+    """
+    Plays a batch of games between two engines.
+
+    :param spec_a: Engine spec for side 'a' (see engines.make_engine).
+    :param spec_b: Engine spec for side 'b'.
+    :param games: Number of games to play.
+    :param workers: Number of processes to spread the games over.
+    :param random_openings: Number of random plies at the start of each game.
+    :param swap_sides: Alternate which side plays 'X' (moves first).
+    :param seed: Base seed for reproducible runs.
+    :return: Tuple (summary dict, list of per-game results, list of per-move records).
+    """
+    batches = [list(range(games))[w::workers] for w in range(workers)]
+    jobs = [(spec_a, spec_b, batch, random_openings, swap_sides, None if seed is None else seed + 7919 * w)
+            for w, batch in enumerate(batches) if batch]
+    if workers > 1:
+        with Pool(workers) as pool:
+            outputs = pool.map(_play_batch, jobs)
+    else:
+        outputs = [_play_batch(job) for job in jobs]
+
+    results = sorted((r for batch_results, _ in outputs for r in batch_results), key=lambda r: r['game'])
+    moves = [m for _, batch_moves in outputs for m in batch_moves]
+    return summarize(results, moves), results, moves
+
+
+def write_csv(path, moves):
+    """Writes the per-move records as CSV."""
+    fields = ['game', 'ply', 'side', 'engine', 'player', 'latency_ns', 'nodes', 'cutoffs']
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(moves)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play headless Tic-Tac-Toe games between two engines.")
+    parser.add_argument('engine_a', help="Engine spec for side a, e.g. alphabeta, minimax, table, mcts:iterations=500")
+    parser.add_argument('engine_b', help="Engine spec for side b, e.g. random")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--random-openings', type=int, default=0, help="Random plies at the start of each game")
+    parser.add_argument('--swap-sides', action='store_true', help="Alternate which engine moves first")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--json', help="Write the summary and per-game results to this JSON file")
+    parser.add_argument('--csv', help="Write the per-move records to this CSV file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary, results, moves = run_games(args.engine_a, args.engine_b, args.games, args.workers,
+                                        args.random_openings, args.swap_sides, args.seed)
+    summary['wall_time_s'] = time.perf_counter() - start
+    summary['games_per_s'] = args.games / summary['wall_time_s']
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'summary': summary, 'games': results}, f, indent=2)
+    if args.csv:
+        write_csv(args.csv, moves)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
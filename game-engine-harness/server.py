@@ -0,0 +1,261 @@
+"""
+Asynchronous move server.
+
+Serves AI moves to many concurrent clients over TCP using JSON lines: every request and every response is one JSON
+object followed by a newline. Searches run in a process pool so the event loop never blocks.
+
+Request:
+    {"id": 1, "board": ["X_O", "_X_", "___"], "player": "O", "engine": "alphabeta", "time_budget": 0.5}
+    * board: three strings (or lists) using 'X', 'O' and '_' for empty cells.
+    * engine: an engine of CLIENT_ENGINES with its allowed options, e.g. "mcts:iterations=500" (default "alphabeta").
+    * time_budget: seconds allowed for the search (default and maximum set on the command line).
+Response:
+    {"id": 1, "move": [2, 2], "cached": false, "elapsed_ms": 3.1}
+    {"id": 1, "error": "..."}
+A request of {"op": "stats"} returns the server counters instead.
+
+Identical positions requested concurrently are searched once (coalesced), and finished results are kept in a shared
+LRU cache in front of the pool. Results of budget-sensitive engines (MCTS) are only shared between requests with the
+same time budget.
+
+Example:
+    python server.py --port 8765 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from engines import EMPTY, make_engine
+
+_worker_engines = OrderedDict()  # Engines cached per worker process, keyed by spec, least recently used first
+WORKER_ENGINES = 8  # Engines kept per worker process; the least recently used one is closed beyond this
+SEARCH_SHARE = 0.8  # Share of the time budget given to the search, the rest covers queueing and IPC
+BUDGET_SENSITIVE = {'mcts'}  # Engines whose move depends on the time budget, cached per budget
+# Engines a client may ask for, with the options it may set as option -> (type, minimum, maximum). Options that change
+# the server's resources or the game (workers, size, time_limit, ...) are left to the server.
+CLIENT_ENGINES = {
+    'random': {'seed': (int, 0, 2 ** 32 - 1)},
+    'minimax': {},
+    'table': {},
+    'alphabeta': {},
+    'mcts': {'iterations': (int, 1, 100000), 'exploration': (float, 0.0, 10.0), 'seed': (int, 0, 2 ** 32 - 1)},
+}
+
+
+def _search(spec, board, player, deadline):
+    """
+    Runs one search inside a worker process.
+
+    :param deadline: time.time() by which the caller needs the move; the engine gets a share of the time left.
+    :raises TimeoutError: If the deadline passed while the search was queued, so that the slot is not spent on it.
+    """
+    time_left = deadline - time.time()
+    if time_left <= 0:
+        raise TimeoutError("time budget exceeded before the search started")
+    engine = _worker_engines.pop(spec, None)
+    if engine is None:
+        engine = make_engine(spec)
+    _worker_engines[spec] = engine
+    if len(_worker_engines) > WORKER_ENGINES:
+        _, evicted = _worker_engines.popitem(last=False)
+        if hasattr(evicted, 'close'):
+            evicted.close()
+    engine.set_time_budget(time_left * SEARCH_SHARE)
+    return engine.choose(board, player)
+
+
+def parse_engine(raw):
+    """
+    Validates an engine spec from a request against CLIENT_ENGINES.
+
+    :param raw: Engine name optionally followed by ':' and comma-separated key=value options (see make_engine).
+    :return: Canonical spec, with the options sorted, so that equal specs share worker engines and cache entries.
+    :raises ValueError: If the engine or one of its options is not allowed.
+    """
+    if not isinstance(raw, str):
+        raise ValueError("engine must be a string")
+    name, _, options = raw.partition(':')
+    allowed = CLIENT_ENGINES.get(name)
+    if allowed is None:
+        raise ValueError(f"engine must be one of {', '.join(CLIENT_ENGINES)}")
+    values = {}
+    for option in filter(None, options.split(',')):
+        key, _, value = option.partition('=')
+        if key not in allowed:
+            raise ValueError(f"engine '{name}' has no option '{key}'" +
+                             (f", expected one of {', '.join(allowed)}" if allowed else ""))
+        cast, low, high = allowed[key]
+        try:
+            value = cast(value)
+        except ValueError:
+            raise ValueError(f"engine option '{key}' must be a{'n' if cast is int else ''} {cast.__name__}") from None
+        if not low <= value <= high:  # Also rejects NaN
+            raise ValueError(f"engine option '{key}' must be between {low} and {high}")
+        values[key] = value
+    if not values:
+        return name
+    return f"{name}:{','.join(f'{key}={value}' for key, value in sorted(values.items()))}"
+
+
+def parse_board(raw):
+    """
+    Validates a board from a request.
+
+    :param raw: List of three strings or three lists of cell symbols.
+    :return: Tuple (3x3 list-of-lists board, canonical string key).
+    :raises ValueError: If the board is malformed.
+    """
+    if not isinstance(raw, list) or len(raw) != 3:
+        raise ValueError("board must have 3 rows")
+    board = [list(row) for row in raw]
+    if any(len(row) != 3 or any(cell not in ('X', 'O', EMPTY) for cell in row) for row in board):
+        raise ValueError(f"board rows must have 3 cells of 'X', 'O' or '{EMPTY}'")
+    if all(cell != EMPTY for row in board for cell in row):
+        raise ValueError("board is full")
+    return board, ''.join(''.join(row) for row in board)
+
+
+class MoveServer:
+    def __init__(self, workers=4, cache_size=100000, default_budget=1.0, max_budget=5.0):
+        """
+        Initialize the server state.
+
+        :param workers: Number of search processes.
+        :param cache_size: Maximum number of cached results.
+        :param default_budget: Time budget in seconds for requests that do not set one.
+        :param max_budget: Upper bound on the time budget a client may request.
+        """
+        self.pool = ProcessPoolExecutor(workers)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.in_flight = {}  # Cache key -> future shared by coalesced requests
+        self.default_budget = default_budget
+        self.max_budget = max_budget
+        self.stats = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'searches': 0, 'timeouts': 0, 'errors': 0}
+
+    async def best_move(self, spec, board, key, player, time_budget):
+        """
+        Returns (move, cached) for a position, going through the cache and coalescing concurrent duplicates.
+
+        :raises asyncio.TimeoutError: If the search did not finish within the time budget.
+        """
+        # A deterministic engine gives the same move for any budget, an anytime engine only for the same budget
+        cache_key = (spec, key, player, time_budget if spec.partition(':')[0] in BUDGET_SENSITIVE else None)
+        if cache_key in self.cache:
+            self.cache.move_to_end(cache_key)
+            self.stats['cache_hits'] += 1
+            return self.cache[cache_key], True
+
+        future = self.in_flight.get(cache_key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            # The search gets the deadline but may run slightly past it; wait_for below enforces it for the caller.
+            future = asyncio.ensure_future(loop.run_in_executor(self.pool, _search, spec, board, player,
+                                                                time.time() + time_budget))
+            self.in_flight[cache_key] = future
+            self.stats['searches'] += 1
+
+            def done(f, cache_key=cache_key):
+                self.in_flight.pop(cache_key, None)
+                if not f.cancelled() and f.exception() is None:
+                    self.cache[cache_key] = f.result()
+                    if len(self.cache) > self.cache_size:
+                        self.cache.popitem(last=False)
+            future.add_done_callback(done)
+        else:
+            self.stats['coalesced'] += 1
+
+        # shield() keeps the shared search alive for the other waiters if this request times out.
+        move = await asyncio.wait_for(asyncio.shield(future), time_budget)
+        return move, False
+
+    async def handle_request(self, request):
+        """Builds the response dict for one decoded request."""
+        if request.get('op') == 'stats':
+            return dict(self.stats, cache_size=len(self.cache), in_flight=len(self.in_flight))
+
+        self.stats['requests'] += 1
+        start = time.perf_counter()
+        try:
+            board, key = parse_board(request.get('board'))
+            player = request.get('player', 'X')
+            if player not in ('X', 'O'):
+                raise ValueError("player must be 'X' or 'O'")
+            time_budget = float(request.get('time_budget', self.default_budget))
+            if not time_budget > 0:  # Also rejects NaN
+                raise ValueError("time_budget must be a positive number of seconds")
+            time_budget = min(time_budget, self.max_budget)
+            spec = parse_engine(request.get('engine', 'alphabeta'))
+            move, cached = await self.best_move(spec, board, key, player, time_budget)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            return {'id': request.get('id'), 'error': 'time budget exceeded'}
+        except Exception as e:  # Report bad requests and engine failures to the client instead of dropping them
+            self.stats['errors'] += 1
+            return {'id': request.get('id'), 'error': str(e)}
+        return {'id': request.get('id'), 'move': list(move) if move else None, 'cached': cached,
+                'elapsed_ms': (time.perf_counter() - start) * 1000}
+
+    async def handle_client(self, reader, writer):
+        """Serves one connection; requests on a connection are answered concurrently, possibly out of order."""
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(line):
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+            except ValueError as e:
+                response = {'error': f"invalid request: {e}"}
+            else:
+                response = await self.handle_request(request)
+            async with lock:
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                task = asyncio.ensure_future(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        """Accepts connections until cancelled."""
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"Serving moves on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Tic-Tac-Toe engine moves over TCP/JSON lines.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--cache-size', type=int, default=100000)
+    parser.add_argument('--default-budget', type=float, default=1.0)
+    parser.add_argument('--max-budget', type=float, default=5.0)
+    args = parser.parse_args()
+
+    server = MoveServer(args.workers, args.cache_size, args.default_budget, args.max_budget)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+pytest-benchmark regression suite for the engines' move selection: alpha-beta TicTacToe.best_move and MinMax
+TicTacToe.ai_move (through the adapters in engines.py) on the fixed positions of benchmark.py.
+
+Save a baseline, then fail later runs whose mean time per move got more than 20% slower:
+    python -m pytest test_benchmark.py --benchmark-autosave
+    python -m pytest test_benchmark.py --benchmark-compare --benchmark-compare-fail=mean:20%
+"""
+import pytest
+
+from benchmark import POSITIONS
+from engines import make_engine
+
+pytest.importorskip('pytest_benchmark')
+
+# The unpruned MinMax takes seconds per move on the opening positions, so it is only timed on the later ones
+MINMAX_POSITIONS = ('must_block', 'endgame')
+
+
+def board_of(rows):
+    return [list(row) for row in rows]
+
+
+def is_legal(board, move):
+    return move is not None and board[move[0]][move[1]] == '_'
+
+
+@pytest.mark.parametrize('name, rows, player', POSITIONS, ids=[name for name, _, _ in POSITIONS])
+def test_alphabeta_best_move(benchmark, name, rows, player):
+    engine = make_engine('alphabeta')
+    board = board_of(rows)
+    benchmark.group = 'alphabeta best_move'
+    move = benchmark(engine.choose, board, player)
+    benchmark.extra_info['nodes'] = engine.nodes
+    assert is_legal(board, move)
+    if name == 'must_block':
+        assert move == (0, 2)
+
+
+@pytest.mark.parametrize('name, rows, player', [position for position in POSITIONS if position[0] in MINMAX_POSITIONS],
+                         ids=MINMAX_POSITIONS)
+def test_minmax_ai_move(benchmark, name, rows, player):
+    engine = make_engine('minimax')
+    board = board_of(rows)
+    benchmark.group = 'minimax ai_move'
+    move = benchmark(engine.choose, board, player)
+    benchmark.extra_info['nodes'] = engine.nodes
+    assert is_legal(board, move)
+    if name == 'must_block':
+        assert move == (0, 2)
@@ -6,6 +6,9 @@
         The minimax algorithm assumes that both players play optimally and selects moves based on the idea that the maximizer tries to maximize the score and the minimizer tries to minimize it.
 """
 class MinMax:
+    def __init__(self):
+        self.stats = None  # Optional SearchStats that minimax reports into (see search-core/instrumentation.py)
+
     def minimax(self, board, depth, is_maximizing):
         """
         Min-Max algorithm to determine the optimal move for the maximizing player.
@@ -16,6 +19,8 @@ class MinMax:
         :return: Optimal value for the maximizing player based on the board's evaluation.
         """
 
+        stats = self.stats
+
         # Check if the game has ended (win/loss/draw) and return score.
         if self.check_winner(board, 'X'):
             return 10 - depth  # 'X' is maximizing player (returns higher score for 'X' wins)
@@ -24,12 +29,16 @@ class MinMax:
         elif self.is_full(board):
             return 0  # Draw
 
+        if stats is not None:
+            stats.nodes_expanded += 1
         if is_maximizing:
             best_value = float('-inf')  # Start with the lowest possible value
             for i in range(3):
                 for j in range(3):
                     if board[i][j] == ' ':
                         board[i][j] = 'X'  # Simulate 'X' move
+                        if stats is not None:
+                            stats.nodes_generated += 1
                         value = self.minimax(board, depth + 1, False)  # Minimize for 'O'
                         board[i][j] = ' '  # Undo move
                         best_value = max(best_value, value)  # Get the maximum score
@@ -40,6 +49,8 @@ class MinMax:
                 for j in range(3):
                     if board[i][j] == ' ':
                         board[i][j] = 'O'  # Simulate 'O' move
+                        if stats is not None:
+                            stats.nodes_generated += 1
                         value = self.minimax(board, depth + 1, True)  # Maximize for 'X'
                         board[i][j] = ' '  # Undo move
                         best_value = min(best_value, value)  # Get the minimum score
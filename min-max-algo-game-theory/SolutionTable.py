@@ -0,0 +1,250 @@
+"""
+    Retrograde Solution Table:
+        Tic-Tac-Toe has only 5,478 legal positions, so instead of searching the game tree on every turn we can solve the
+        whole game once. Retrograde analysis enumerates every reachable position layer by layer (by number of marks on
+        the board) and then assigns game-theoretic values backwards, starting from the full boards and finishing at the
+        empty board. Each position is stored from the point of view of the player to move:
+            * 0 = empty cell, 1 = mark of the player to move, 2 = mark of the opponent.
+        The board is packed into a base-3 index (cell r * 3 + c is digit r * 3 + c), so a lookup is a single array access.
+        Values follow the same convention as MinMax.minimax: a win in n plies scores 10 - n, a loss scores n - 10 and a
+        draw scores 0, always from the mover's perspective.
+"""
+import os
+from array import array
+
+BOARD_CELLS = 9
+NUM_INDICES = 3 ** BOARD_CELLS
+NO_MOVE = -1
+TABLE_MAGIC = b'TTT1'
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tic_tac_toe_table.bin')
+
+POWERS = [3 ** cell for cell in range(BOARD_CELLS)]
+LINES = [
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),  # Rows
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),  # Columns
+    (0, 4, 8), (2, 4, 6)              # Diagonals
+]
+
+
+def decode(index):
+    """
+    Unpacks a base-3 index into a list of nine cell codes.
+
+    :param index: Base-3 board index.
+    :return: List of cell codes (0 empty, 1 mover, 2 opponent).
+    """
+    cells = []
+    for _ in range(BOARD_CELLS):
+        index, code = divmod(index, 3)
+        cells.append(code)
+    return cells
+
+
+def encode(cells):
+    """
+    Packs a list of nine cell codes into a base-3 index.
+
+    :param cells: List of cell codes (0 empty, 1 mover, 2 opponent).
+    :return: Base-3 board index.
+    """
+    return sum(code * power for code, power in zip(cells, POWERS))
+
+
+def has_line(cells, code):
+    """
+    Checks if the given cell code occupies a full row, column or diagonal.
+
+    :param cells: List of cell codes.
+    :param code: Cell code to check for.
+    :return: True if the code has three in a row, False otherwise.
+    """
+    return any(cells[a] == code and cells[b] == code and cells[c] == code for a, b, c in LINES)
+
+
+class SolutionTable:
+    def __init__(self, values, moves):
+        """
+        Wrap precomputed value and move arrays.
+
+        :param values: array('b') of length 3^9 with the mover's score for every index.
+        :param moves: array('b') of length 3^9 with the best cell (0-8) for every index, or NO_MOVE.
+        """
+        self.values = values
+        self.moves = moves
+
+    @classmethod
+    def build(cls):
+        """
+        Solves every reachable position with retrograde analysis.
+
+        :return: A fully populated SolutionTable.
+        """
+        values = array('b', bytes(NUM_INDICES))
+        moves = array('b', [NO_MOVE]) * NUM_INDICES
+
+        # Forward pass: enumerate reachable positions layer by layer and remember their successors.
+        layers = [[0]]
+        successors = {}
+        for _ in range(BOARD_CELLS):
+            next_layer = set()
+            for index in layers[-1]:
+                cells = decode(index)
+                if has_line(cells, 2):  # The previous mover already won, nothing follows
+                    continue
+                children = []
+                for cell in range(BOARD_CELLS):
+                    if cells[cell] == 0:
+                        # Place the mover's mark and flip the perspective for the opponent, who moves next.
+                        child = [0 if code == 0 else 3 - code for code in cells]
+                        child[cell] = 2
+                        child_index = encode(child)
+                        children.append((cell, child_index))
+                        next_layer.add(child_index)
+                successors[index] = children
+            layers.append(sorted(next_layer))
+
+        # Backward pass: full boards first, the empty board last.
+        for layer in reversed(layers):
+            for index in layer:
+                children = successors.get(index)
+                if not children:
+                    # Terminal: either the opponent has just completed a line or the board is full.
+                    values[index] = -10 if has_line(decode(index), 2) else 0
+                    continue
+                best_value, best_cell = -128, NO_MOVE
+                for cell, child_index in children:
+                    value = -values[child_index]
+                    # Prefer quick wins and slow losses, exactly like the depth term in MinMax.minimax.
+                    value += -1 if value > 0 else (1 if value < 0 else 0)
+                    if value > best_value:
+                        best_value, best_cell = value, cell
+                values[index] = best_value
+                moves[index] = best_cell
+
+        return cls(values, moves)
+
+    @classmethod
+    def load(cls, path=TABLE_FILE):
+        """
+        Loads a table previously written by save().
+
+        :param path: Path of the table file.
+        :return: SolutionTable read from disk.
+        :raises ValueError: If the file is not a valid table.
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) != len(TABLE_MAGIC) + 2 * NUM_INDICES or not data.startswith(TABLE_MAGIC):
+            raise ValueError(f"{path} is not a Tic-Tac-Toe solution table")
+        values = array('b')
+        values.frombytes(data[len(TABLE_MAGIC):len(TABLE_MAGIC) + NUM_INDICES])
+        moves = array('b')
+        moves.frombytes(data[len(TABLE_MAGIC) + NUM_INDICES:])
+        return cls(values, moves)
+
+    @classmethod
+    def load_or_build(cls, path=TABLE_FILE):
+        """
+        Loads the table from disk, solving the game and caching the result if the file is missing or invalid.
+
+        :param path: Path of the table file.
+        :return: SolutionTable ready for lookups.
+        """
+        try:
+            return cls.load(path)
+        except (OSError, ValueError):
+            table = cls.build()
+            try:
+                table.save(path)
+            except OSError:
+                pass  # Read-only install: keep the in-memory table
+            return table
+
+    def save(self, path=TABLE_FILE):
+        """
+        Writes the table to disk as a magic header followed by the raw value and move arrays.
+
+        :param path: Path of the table file.
+        """
+        with open(path, 'wb') as f:
+            f.write(TABLE_MAGIC)
+            f.write(self.values.tobytes())
+            f.write(self.moves.tobytes())
+
+    def index(self, board, player, empty=' '):
+        """
+        Computes the mover-relative base-3 index of a board.
+
+        :param board: 3x3 list of cell symbols.
+        :param player: Symbol of the player to move.
+        :param empty: Symbol used for empty cells.
+        :return: Base-3 board index.
+        """
+        index = 0
+        power = 1
+        for row in board:
+            for cell in row:
+                if cell != empty:
+                    index += power if cell == player else 2 * power
+                power *= 3
+        return index
+
+    def value(self, board, player, empty=' '):
+        """
+        Returns the game-theoretic score of the board for the player to move.
+
+        :param board: 3x3 list of cell symbols.
+        :param player: Symbol of the player to move.
+        :param empty: Symbol used for empty cells.
+        :return: 10 - n for a forced win in n plies, n - 10 for a forced loss, 0 for a draw.
+        """
+        return self.values[self.index(board, player, empty)]
+
+    def best_move(self, board, player, empty=' '):
+        """
+        Returns the optimal move for the player to move.
+
+        :param board: 3x3 list of cell symbols.
+        :param player: Symbol of the player to move.
+        :param empty: Symbol used for empty cells.
+        :return: (row, col) of the best move, or None if the game is over.
+        """
+        cell = self.moves[self.index(board, player, empty)]
+        if cell == NO_MOVE:
+            return None
+        return divmod(cell, 3)
+
+
+class LazySolutionTable:
+    def __init__(self, path=TABLE_FILE):
+        """
+        Stands in for a table that is not on disk yet: the game is solved (and the file written) on the first lookup
+        instead of on import.
+
+        :param path: Path of the table file.
+        """
+        self.path = path
+        self.table = None
+
+    def __getattr__(self, name):
+        # Only reached for SolutionTable's attributes (value, best_move, ...), which the solved table provides
+        if self.table is None:
+            self.table = SolutionTable.load_or_build(self.path)
+        return getattr(self.table, name)
+
+
+def load_table(path=TABLE_FILE):
+    """
+    Loads the table file, or defers solving the game to the first lookup if the file is missing or invalid.
+
+    :param path: Path of the table file.
+    :return: SolutionTable, or LazySolutionTable that builds one when first used.
+    """
+    try:
+        return SolutionTable.load(path)
+    except (OSError, ValueError):
+        return LazySolutionTable(path)
+
+
+# Loaded on import and solved once per installation (on the first lookup), so every lookup afterwards is O(1).
+TABLE = load_table()
@@ -1,10 +1,12 @@
 from MinMax import MinMax
+from SolutionTable import TABLE
 
 class TicTacToe:
-    def __init__(self):
+    def __init__(self, use_table=True):
         # Initialize an empty board with spaces
         self.board = [[' ' for _ in range(3)] for _ in range(3)]
         self.minmax = MinMax()  # Create an instance of MinMax class
+        self.use_table = use_table  # Answer from the precomputed solution table instead of searching
 
     def print_board(self):
         """Prints the current state of the Tic-Tac-Toe board."""
@@ -45,22 +47,40 @@ class TicTacToe:
             except (ValueError, IndexError):
                 print("Invalid move. Please enter row and column as two numbers from 0 to 2.")
 
-    def ai_move(self):
-        """Determines the best move for AI using Min-Max algorithm."""
-        best_value = float('-inf')
+    def ai_move(self, stats=None):
+        """
+        Determines the best move for AI using the solution table, or the Min-Max algorithm if disabled.
+
+        :param stats: Optional SearchStats to report the Min-Max search's work into.
+        """
+        if self.use_table:
+            best_move = TABLE.best_move(self.board, 'O')  # O(1) lookup of the perfect-play move
+            if best_move:
+                self.board[best_move[0]][best_move[1]] = 'O'
+            return
+
+        best_value = float('inf')  # 'O' is the minimizing player
         best_move = None
+        self.minmax.stats = stats
+        if stats is not None:
+            stats.start()
+            stats.nodes_expanded += 1  # The current position
 
         # Iterate through the board to find the best move
         for i in range(3):
             for j in range(3):
                 if self.board[i][j] == ' ':
                     self.board[i][j] = 'O'  # Simulate AI move
-                    move_value = self.minmax.minimax(self.board, 0, False)  # Evaluate move
+                    if stats is not None:
+                        stats.nodes_generated += 1
+                    move_value = self.minmax.minimax(self.board, 1, True)  # Evaluate move, 'X' replies
                     self.board[i][j] = ' '  # Undo move
-                    if move_value > best_value:
+                    if move_value < best_value:
                         best_value = move_value
                         best_move = (i, j)  # Update best move
 
+        if stats is not None:
+            stats.stop()
         if best_move:
             self.board[best_move[0]][best_move[1]] = 'O'  # Make the best move
 
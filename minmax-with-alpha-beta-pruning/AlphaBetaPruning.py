@@ -64,7 +64,7 @@ def evaluate(node):
 """
     Implements the Minimax algorithm with Alpha-Beta Pruning. The algorithm searches the game tree, alternating between maximizing and minimizing player decisions, and prunes subtrees where further exploration is unnecessary.
 """
-def minimax_with_alpha_beta(node, depth, alpha, beta, maximizingPlayer):
+def minimax_with_alpha_beta(node, depth, alpha, beta, maximizingPlayer, stats=None):
     """
     Implements the Minimax algorithm with Alpha-Beta Pruning.
 
@@ -74,6 +74,28 @@ def minimax_with_alpha_beta(node, depth, alpha, beta, maximizingPlayer):
     alpha (float): The best value that the maximizer can guarantee so far.
     beta (float): The best value that the minimizer can guarantee so far.
     maximizingPlayer (bool): True if the current player is the maximizer, False if the minimizer.
+    stats (SearchStats): Optional statistics to report the search's work into, including every cutoff
+        (see search-core/instrumentation.py).
+
+    Returns:
+    int: The optimal value for the current node.
+    """
+    if stats is None:
+        return alpha_beta_search(node, depth, alpha, beta, maximizingPlayer, None, evaluate)
+    stats.start()
+    value = alpha_beta_search(node, depth, alpha, beta, maximizingPlayer, stats, stats.timed(evaluate))
+    stats.stop()
+    return value
+
+# Recursive search behind minimax_with_alpha_beta
+def alpha_beta_search(node, depth, alpha, beta, maximizingPlayer, stats, evaluate):
+    """
+    Searches the subtree of a node with Alpha-Beta Pruning.
+
+    Parameters:
+    node, depth, alpha, beta, maximizingPlayer: As in minimax_with_alpha_beta.
+    stats (SearchStats): Statistics to report into, or None.
+    evaluate (function): Evaluation of terminal and depth-limit nodes.
 
     Returns:
     int: The optimal value for the current node.
@@ -82,23 +104,34 @@ def minimax_with_alpha_beta(node, depth, alpha, beta, maximizingPlayer):
     if depth == 0 or is_terminal_node(node):
         return evaluate(node)  # Returns the heuristic value of the node
 
+    children = get_children(node)
+    if stats is not None:
+        stats.nodes_expanded += 1
     if maximizingPlayer:
         max_eval = float('-inf')  # Initialize the worst case for maximizer
-        for child in get_children(node):  # Explore each child of the current node
-            eval = minimax_with_alpha_beta(child, depth - 1, alpha, beta, False)
+        for index, child in enumerate(children):  # Explore each child of the current node
+            eval = alpha_beta_search(child, depth - 1, alpha, beta, False, stats, evaluate)
             max_eval = max(max_eval, eval)  # Maximizer chooses the maximum value
             alpha = max(alpha, eval)  # Update alpha (best guarantee for maximizer)
             if beta <= alpha:
-                print(f"Pruning at node {node} with alpha={alpha}, beta={beta}")
-                break  # Beta cutoff (prune the branch)
+                if stats is not None:
+                    stats.cutoffs += 1
+                    stats.nodes_generated += index + 1
+                return max_eval  # Beta cutoff (prune the branch)
+        if stats is not None:
+            stats.nodes_generated += len(children)
         return max_eval
     else:
         min_eval = float('inf')  # Initialize the worst case for minimizer
-        for child in get_children(node):  # Explore each child of the current node
-            eval = minimax_with_alpha_beta(child, depth - 1, alpha, beta, True)
+        for index, child in enumerate(children):  # Explore each child of the current node
+            eval = alpha_beta_search(child, depth - 1, alpha, beta, True, stats, evaluate)
             min_eval = min(min_eval, eval)  # Minimizer chooses the minimum value
             beta = min(beta, eval)  # Update beta (best guarantee for minimizer)
             if beta <= alpha:
-                print(f"Pruning at node {node} with alpha={alpha}, beta={beta}")
-                break  # Alpha cutoff (prune the branch)
+                if stats is not None:
+                    stats.cutoffs += 1
+                    stats.nodes_generated += index + 1
+                return min_eval  # Alpha cutoff (prune the branch)
+        if stats is not None:
+            stats.nodes_generated += len(children)
         return min_eval
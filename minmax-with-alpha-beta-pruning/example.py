@@ -1,5 +1,10 @@
 from AlphaBetaPruning import minimax_with_alpha_beta
 import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'search-core'))
+from instrumentation import SearchStats
 
 if __name__ == "__main__":
     # Define root node, depth of the tree, and initial alpha-beta values
@@ -9,7 +14,10 @@ if __name__ == "__main__":
     initial_beta = math.inf
 
     # Call the minimax algorithm with alpha-beta pruning starting at the root node
-    optimal_value = minimax_with_alpha_beta(root_node, max_depth, initial_alpha, initial_beta, False)
+    stats = SearchStats('minimax_with_alpha_beta')
+    optimal_value = minimax_with_alpha_beta(root_node, max_depth, initial_alpha, initial_beta, False, stats=stats)
 
     # Display the result
     print(f"The optimal value for the root node is: {optimal_value}")
+    print(f"Cutoffs: {stats.cutoffs}")
+    print(stats.to_json())
@@ -1,4 +1,10 @@
 import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'min-max-algo-game-theory'))
+from SolutionTable import TABLE
 
 # Constants
 PLAYER_X = 'X'  # AI Player
@@ -7,12 +13,15 @@ EMPTY = '_'
 
 
 class TicTacToe:
-    def __init__(self):
+    def __init__(self, use_table=True):
         self.board = [
             [EMPTY, EMPTY, EMPTY],
             [EMPTY, EMPTY, EMPTY],
             [EMPTY, EMPTY, EMPTY]
         ]
+        self.stats = None  # Optional SearchStats that minimax reports into (see search-core/instrumentation.py)
+        # Answer from the solution table (see min-max-algo-game-theory/SolutionTable.py) instead of searching
+        self.use_table = use_table
 
     def print_board(self):
         """Print the Tic-Tac-Toe board."""
@@ -71,6 +80,7 @@ class TicTacToe:
 
     def minimax(self, depth, is_maximizing, alpha, beta):
         """Minimax algorithm with alpha-beta pruning."""
+        stats = self.stats
         winner = self.check_winner()
         if winner == PLAYER_X:
             return 10 - depth  # AI wins
@@ -79,36 +89,59 @@ class TicTacToe:
         elif self.is_full():
             return 0  # Draw
 
+        if stats is not None:
+            stats.nodes_expanded += 1
         if is_maximizing:
             max_eval = -math.inf
             for move in self.get_available_moves():
                 self.make_move(move[0], move[1], PLAYER_X)
+                if stats is not None:
+                    stats.nodes_generated += 1
                 eval = self.minimax(depth + 1, False, alpha, beta)
                 self.undo_move(move[0], move[1])
                 max_eval = max(max_eval, eval)
                 alpha = max(alpha, eval)
                 if beta <= alpha:
+                    if stats is not None:
+                        stats.cutoffs += 1
                     break
             return max_eval
         else:
             min_eval = math.inf
             for move in self.get_available_moves():
                 self.make_move(move[0], move[1], PLAYER_O)
+                if stats is not None:
+                    stats.nodes_generated += 1
                 eval = self.minimax(depth + 1, True, alpha, beta)
                 self.undo_move(move[0], move[1])
                 min_eval = min(min_eval, eval)
                 beta = min(beta, eval)
                 if beta <= alpha:
+                    if stats is not None:
+                        stats.cutoffs += 1
                     break
             return min_eval
 
-    def best_move(self):
-        """Find the best move for AI using Minimax with alpha-beta pruning."""
+    def best_move(self, stats=None):
+        """
+        Find the best move for AI using the solution table, or Minimax with alpha-beta pruning if disabled.
+
+        :param stats: Optional SearchStats to report the search's work into.
+        """
+        if self.use_table:
+            return TABLE.best_move(self.board, PLAYER_X, EMPTY)  # O(1) lookup of the perfect-play move
+
         best_val = -math.inf
         best_move = None
+        self.stats = stats
+        if stats is not None:
+            stats.start()
+            stats.nodes_expanded += 1  # The current position
 
         for move in self.get_available_moves():
             self.make_move(move[0], move[1], PLAYER_X)
+            if stats is not None:
+                stats.nodes_generated += 1
             move_val = self.minimax(0, False, -math.inf, math.inf)
             self.undo_move(move[0], move[1])
 
@@ -116,6 +149,8 @@ class TicTacToe:
                 best_val = move_val
                 best_move = move
 
+        if stats is not None:
+            stats.stop()
         return best_move
 
     def play_game(self):
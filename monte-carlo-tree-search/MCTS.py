@@ -0,0 +1,301 @@
+"""
+Definations:
+    Monte Carlo Tree Search (MCTS):
+        MCTS is a best-first search that builds a game tree incrementally from random simulations instead of exploring
+        every move. It scales to boards where minimax and alpha-beta pruning cannot reach the end of the game. Each
+        iteration has four phases:
+            * Selection: Walk down the tree, picking the child with the highest UCT score until a node with untried moves is found.
+            * Expansion: Add one untried move as a new child node.
+            * Simulation (playout): Play random moves from the new node until the game ends.
+            * Backpropagation: Update the visit and win counts on the path back to the root.
+
+    UCT (Upper Confidence Bound applied to Trees):
+        UCT = wins / visits + c * sqrt(ln(parent visits) / visits)
+        The first term favours moves that have won often (exploitation), the second favours moves that have rarely been
+        tried (exploration). c is the exploration constant, sqrt(2) in theory.
+
+    Root parallelism:
+        Several processes build independent trees from the same root with different random seeds. Their root
+        statistics are summed and the most visited move is played.
+"""
+import math
+import random
+import time
+from multiprocessing import Pool
+
+
+class Node:
+    __slots__ = ('move', 'parent', 'children', 'untried', 'wins', 'visits')
+
+    def __init__(self, move, parent, untried):
+        self.move = move          # Cell index that led to this node (None for the root)
+        self.parent = parent
+        self.children = []
+        self.untried = untried    # Cell indices not expanded yet
+        self.wins = 0.0           # Wins for the player who made `move` (draws count half)
+        self.visits = 0
+
+
+class Bitboard:
+    def __init__(self, size=3, win_length=None):
+        """
+        Precomputes the winning lines of a size x size board for fast playouts.
+
+        :param size: Width and height of the board.
+        :param win_length: Number of marks in a row needed to win (defaults to size).
+        """
+        self.size = size
+        self.win_length = win_length or size
+        self.cells = size * size
+
+        # Every line of win_length cells, as a bitmask, grouped by the cells it passes through.
+        self.lines_through = [[] for _ in range(self.cells)]
+        k = self.win_length
+        for r in range(size):
+            for c in range(size):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):  # Right, down, diagonal, anti-diagonal
+                    end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                    if 0 <= end_r < size and 0 <= end_c < size:
+                        mask = 0
+                        for i in range(k):
+                            mask |= 1 << ((r + dr * i) * size + c + dc * i)
+                        for i in range(k):
+                            self.lines_through[(r + dr * i) * size + c + dc * i].append(mask)
+
+    def from_board(self, board, player, empty):
+        """
+        Converts a list-of-lists board into (player mask, opponent mask).
+
+        :param board: size x size list of cell symbols.
+        :param player: Symbol of the player to move.
+        :param empty: Symbol used for empty cells.
+        :return: Tuple of bitmasks (player, opponent).
+        """
+        mine = theirs = 0
+        for r, row in enumerate(board):
+            for c, cell in enumerate(row):
+                if cell == player:
+                    mine |= 1 << (r * self.size + c)
+                elif cell != empty:
+                    theirs |= 1 << (r * self.size + c)
+        return mine, theirs
+
+    def is_win(self, mask, cell):
+        """Checks if placing `cell` completed a line for the owner of `mask`."""
+        for line in self.lines_through[cell]:
+            if mask & line == line:
+                return True
+        return False
+
+    def empty_cells(self, occupied):
+        """Returns the list of empty cell indices."""
+        return [cell for cell in range(self.cells) if not occupied >> cell & 1]
+
+    def winner(self, masks):
+        """Returns the index (0 or 1) of the player owning a complete line, or None."""
+        for player in (0, 1):
+            for cell in range(self.cells):
+                if masks[player] >> cell & 1 and self.is_win(masks[player], cell):
+                    return player
+        return None
+
+    def playout(self, masks, to_move, rng):
+        """
+        Plays uniformly random moves until the game ends.
+
+        :param masks: List [mask of player 0, mask of player 1] (modified in place).
+        :param to_move: Index of the player to move.
+        :param rng: random.Random instance.
+        :return: Index of the winner, or None for a draw.
+        """
+        empties = self.empty_cells(masks[0] | masks[1])
+        rng.shuffle(empties)
+        for cell in empties:
+            masks[to_move] |= 1 << cell
+            if self.is_win(masks[to_move], cell):
+                return to_move
+            to_move ^= 1
+        return None
+
+
+def run_search(bitboard, root, masks, to_move, iterations, time_limit, exploration, rng):
+    """
+    Runs MCTS iterations on an existing tree.
+
+    :param bitboard: Bitboard describing the game.
+    :param root: Root Node of the tree (grown in place).
+    :param masks: Tuple (mask of player 0, mask of player 1) at the root.
+    :param to_move: Index of the player to move at the root.
+    :param iterations: Maximum number of iterations (None for unlimited).
+    :param time_limit: Time budget in seconds (None for unlimited).
+    :param exploration: UCT exploration constant.
+    :param rng: random.Random instance.
+    :return: Number of iterations performed.
+    """
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+    done = 0
+    while (iterations is None or done < iterations) and (deadline is None or done & 63 or time.perf_counter() < deadline):
+        node = root
+        state = [masks[0], masks[1]]
+        player = to_move
+        winner = None
+        finished = False
+
+        # Selection
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            node = max(node.children, key=lambda child: child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits))
+            state[player] |= 1 << node.move
+            if bitboard.is_win(state[player], node.move):
+                winner, finished = player, True
+            player ^= 1
+        if not node.untried and not node.children:
+            finished = True  # Terminal node reached during selection (win or full board)
+
+        # Expansion
+        if not finished and node.untried:
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            state[player] |= 1 << move
+            won = bitboard.is_win(state[player], move)
+            child = Node(move, node, [] if won else bitboard.empty_cells(state[0] | state[1]))
+            node.children.append(child)
+            node = child
+            if won:
+                winner, finished = player, True
+            player ^= 1
+
+        # Simulation
+        if not finished:
+            winner = bitboard.playout(state, player, rng)
+
+        # Backpropagation: each node is scored for the player who made its move, i.e. the player before `player`.
+        mover = player ^ 1
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif winner == mover:
+                node.wins += 1
+            node = node.parent
+            mover ^= 1
+        done += 1
+    return done
+
+
+def _root_worker(args):
+    """Builds an independent tree in a worker process and returns its root statistics."""
+    size, win_length, masks, to_move, iterations, time_limit, exploration, seed = args
+    bitboard = Bitboard(size, win_length)
+    root = Node(None, None, bitboard.empty_cells(masks[0] | masks[1]))
+    run_search(bitboard, root, masks, to_move, iterations, time_limit, exploration, random.Random(seed))
+    return {child.move: (child.visits, child.wins) for child in root.children}
+
+
+class MCTS:
+    def __init__(self, size=3, win_length=None, iterations=2000, time_limit=None, exploration=math.sqrt(2),
+                 workers=1, reuse_tree=True, seed=None):
+        """
+        Initialize the Monte Carlo Tree Search engine.
+
+        :param size: Width and height of the board.
+        :param win_length: Number of marks in a row needed to win (defaults to size).
+        :param iterations: Iterations per move (None to rely on time_limit only).
+        :param time_limit: Time budget per move in seconds (None to rely on iterations only).
+        :param exploration: UCT exploration constant.
+        :param workers: Number of processes for root parallelism (1 searches in-process).
+        :param reuse_tree: Keep the subtree of the played moves between calls (single-process only).
+        :param seed: Seed for reproducible searches.
+        """
+        if iterations is None and time_limit is None:
+            raise ValueError("Either iterations or time_limit must be set")
+        self.bitboard = Bitboard(size, win_length)
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.workers = workers
+        self.reuse_tree = reuse_tree
+        self.rng = random.Random(seed)
+        self.pool = None
+        self.root = None
+        self.root_masks = None  # (player to move, opponent) masks of the stored root
+        self.last_iterations = 0  # Iterations performed by the last search (summed over workers)
+
+    def close(self):
+        """Shuts down the worker pool, if any."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def reset(self):
+        """Forgets the stored tree, e.g. when a new game starts."""
+        self.root = None
+        self.root_masks = None
+
+    def _reuse(self, mine, theirs):
+        """Finds the stored node for (mine, theirs) among the root's children and grandchildren."""
+        if self.root is None:
+            return None
+        old_mine, old_theirs = self.root_masks
+        if (mine, theirs) == (old_mine, old_theirs):
+            return self.root
+        # One move by us from the stored root, then one reply by the opponent.
+        for child in self.root.children:
+            if old_mine | 1 << child.move != mine:
+                continue
+            for grandchild in child.children:
+                if old_theirs | 1 << grandchild.move == theirs:
+                    grandchild.parent = None
+                    return grandchild
+        return None
+
+    def search(self, board, player, empty='_'):
+        """
+        Searches the position and returns visit statistics for each root move.
+
+        :param board: size x size list of cell symbols.
+        :param player: Symbol of the player to move.
+        :param empty: Symbol used for empty cells.
+        :return: Dict mapping (row, col) to (visits, wins).
+        """
+        mine, theirs = self.bitboard.from_board(board, player, empty)
+        masks = (mine, theirs)  # Player 0 is always the player to move at the root
+
+        if self.workers > 1:
+            if self.pool is None:
+                self.pool = Pool(self.workers)
+            iterations = -(-self.iterations // self.workers) if self.iterations is not None else None
+            jobs = [(self.bitboard.size, self.bitboard.win_length, masks, 0, iterations, self.time_limit,
+                     self.exploration, self.rng.getrandbits(64)) for _ in range(self.workers)]
+            stats = {}
+            for result in self.pool.map(_root_worker, jobs):
+                for move, (visits, wins) in result.items():
+                    total = stats.get(move, (0, 0.0))
+                    stats[move] = (total[0] + visits, total[1] + wins)
+            self.last_iterations = sum(visits for visits, _ in stats.values())
+        else:
+            root = self._reuse(mine, theirs) if self.reuse_tree else None
+            if root is None:
+                root = Node(None, None, self.bitboard.empty_cells(mine | theirs))
+            self.last_iterations = run_search(self.bitboard, root, masks, 0, self.iterations, self.time_limit,
+                                              self.exploration, self.rng)
+            stats = {child.move: (child.visits, child.wins) for child in root.children}
+            self.root, self.root_masks = root, (mine, theirs)
+
+        return {divmod(move, self.bitboard.size): value for move, value in stats.items()}
+
+    def best_move(self, board, player, empty='_'):
+        """
+        Finds the best move for `player` (the most visited root child).
+
+        :param board: size x size list of cell symbols.
+        :param player: Symbol of the player to move.
+        :param empty: Symbol used for empty cells.
+        :return: (row, col) of the chosen move, or None if the game is over.
+        """
+        if self.bitboard.winner(self.bitboard.from_board(board, player, empty)) is not None:
+            return None
+        stats = self.search(board, player, empty)
+        if not stats:
+            return None
+        return max(stats, key=lambda m: stats[m][0])
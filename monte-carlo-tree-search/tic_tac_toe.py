@@ -0,0 +1,107 @@
+from MCTS import MCTS
+
+# Constants
+PLAYER_X = 'X'  # AI Player
+PLAYER_O = 'O'  # Human Player
+EMPTY = '_'
+
+
+class TicTacToe:
+    def __init__(self, size=3, win_length=None, engine=None):
+        """
+        Tic-Tac-Toe on a size x size board, won by win_length marks in a row.
+        Uses the same move API as the alpha-beta TicTacToe, with MCTS choosing the AI moves.
+
+        :param size: Width and height of the board.
+        :param win_length: Number of marks in a row needed to win (defaults to size).
+        :param engine: MCTS instance to use (a default one is created if omitted).
+        """
+        self.size = size
+        self.win_length = win_length or size
+        self.board = [[EMPTY for _ in range(size)] for _ in range(size)]
+        self.engine = engine or MCTS(size, self.win_length)
+
+    def print_board(self):
+        """Print the Tic-Tac-Toe board."""
+        for row in self.board:
+            print(' '.join(row))
+        print()
+
+    def is_full(self):
+        """Check if the board is full."""
+        for row in self.board:
+            if EMPTY in row:
+                return False
+        return True
+
+    def check_winner(self):
+        """Check if there is a winner."""
+        k = self.win_length
+        for r in range(self.size):
+            for c in range(self.size):
+                player = self.board[r][c]
+                if player == EMPTY:
+                    continue
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):  # Right, down, diagonal, anti-diagonal
+                    end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                    if 0 <= end_r < self.size and 0 <= end_c < self.size and \
+                            all(self.board[r + dr * i][c + dc * i] == player for i in range(k)):
+                        return player
+        return None
+
+    def is_terminal(self):
+        """Check if the game has ended (either win or draw)."""
+        return self.check_winner() is not None or self.is_full()
+
+    def get_available_moves(self):
+        """Get a list of available moves."""
+        return [(i, j) for i in range(self.size) for j in range(self.size) if self.board[i][j] == EMPTY]
+
+    def make_move(self, row, col, player):
+        """Make a move on the board."""
+        self.board[row][col] = player
+
+    def undo_move(self, row, col):
+        """Undo a move on the board."""
+        self.board[row][col] = EMPTY
+
+    def best_move(self):
+        """Find the best move for AI using Monte Carlo Tree Search."""
+        return self.engine.best_move(self.board, PLAYER_X, EMPTY)
+
+    def play_game(self):
+        """Main function to play the game."""
+        print("Welcome to Tic-Tac-Toe!")
+        self.print_board()
+
+        while not self.is_terminal():
+            # Human move
+            row, col = map(int, input("Enter your move (row and column): ").split())
+            if self.board[row][col] == EMPTY:
+                self.make_move(row, col, PLAYER_O)
+                self.print_board()
+
+                if self.is_terminal():
+                    break
+
+                # AI move
+                print("AI is making a move...")
+                move = self.best_move()
+                if move:
+                    self.make_move(move[0], move[1], PLAYER_X)
+                    self.print_board()
+            else:
+                print("Invalid move, try again.")
+
+        winner = self.check_winner()
+        if winner == PLAYER_X:
+            print("AI wins!")
+        elif winner == PLAYER_O:
+            print("You win!")
+        else:
+            print("It's a draw!")
+
+
+if __name__ == "__main__":
+    game = TicTacToe(size=7, win_length=4, engine=MCTS(7, 4, iterations=None, time_limit=1.0))
+    game.play_game()
@@ -0,0 +1,272 @@
+"""
+Benchmark of the search core on the repository's problems.
+
+Runs every strategy and frontier of search.py on sliding puzzles, water jugs and TSP tours, and reports the wall time,
+the solution cost and the work counted by SearchStats. The "external" set sweeps whole state spaces with the external
+BFS of external.py and compares its time and peak memory with an in-memory BFS. The "quality" set trades solution
+cost for time on random 15-puzzle instances: weighted A* at several weights, beam search at several widths and the
+anytime ARA*, all within a time budget, reported as solution cost versus time (and plotted with --plot, which needs
+matplotlib).
+
+Example:
+    python benchmark.py
+    python benchmark.py puzzle tsp --json results.json
+    python benchmark.py external
+    python benchmark.py quality --time-limit 5 --plot quality.png
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from external import external_bfs
+from instrumentation import SearchStats
+from search import ara_star, beam_search, search
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_module(folder, filename, name):
+    """Imports a module from one of the repository's algorithm folders (which are not packages)."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_ROOT, folder, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def scrambled_puzzle(size, moves, seed):
+    """
+    Returns (initial, goal) n x n grids, the initial one reached by random blank moves from the goal.
+
+    :param size: Side of the puzzle.
+    :param moves: Number of random moves (undoing the previous move is not allowed).
+    :param seed: Seed of the moves.
+    """
+    rng = random.Random(seed)
+    tiles = list(range(1, size * size)) + [0]
+    goal = [tiles[r * size:(r + 1) * size] for r in range(size)]
+    blank, previous = size * size - 1, None
+    for _ in range(moves):
+        r, c = divmod(blank, size)
+        options = [nr * size + nc for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+                   if 0 <= nr < size and 0 <= nc < size and nr * size + nc != previous]
+        cell = rng.choice(options)
+        tiles[blank], tiles[cell] = tiles[cell], 0
+        previous, blank = blank, cell
+    return [tiles[r * size:(r + 1) * size] for r in range(size)], goal
+
+
+def problems(names):
+    """Returns the benchmark problems, name -> (problem, list of (label, solver function))."""
+    puzzle = load_module('eight-puzzle-a-star', 'puzzle.py', 'puzzle')
+    water_jug = load_module('water-jug-problem', 'water-jug.py', 'water_jug')
+    tsp = load_module('tsp-with-state-space-search', 'tsp.py', 'tsp')
+
+    informed = [
+        ('astar/priority', lambda p, stats: search(p, 'astar', stats=stats)),
+        ('astar/bucket', lambda p, stats: search(p, 'astar', frontier='bucket', stats=stats)),
+        ('wastar w=2', lambda p, stats: search(p, 'wastar', weight=2, frontier='bucket', stats=stats)),
+        ('greedy', lambda p, stats: search(p, 'greedy', stats=stats)),
+        ('beam w=100', lambda p, stats: beam_search(p, 100, stats=stats)),
+    ]
+    result = {}
+    if 'puzzle' in names:
+        for moves, seed in ((40, 0), (60, 1)):
+            initial, goal = scrambled_puzzle(3, moves, seed)
+            result[f'8-puzzle/{moves} moves'] = (puzzle.SlidingPuzzle(initial, goal), [
+                ('bfs', lambda p, stats: search(p, 'bfs', stats=stats)),
+                ('ucs', lambda p, stats: search(p, 'ucs', stats=stats))] + informed)
+        initial, goal = scrambled_puzzle(4, 60, 2)
+        result['15-puzzle/60 moves'] = (puzzle.SlidingPuzzle(initial, goal), informed)
+    if 'jug' in names:
+        result['water jug 997/1001->500'] = (water_jug.WaterJugProblem(997, 1001, 500), [
+            ('bfs', lambda p, stats: search(p, 'bfs', stats=stats)),
+            ('dfs', lambda p, stats: search(p, 'dfs', stats=stats))])
+    if 'tsp' in names:
+        rng = random.Random(0)
+        n = 10
+        distances = [[0 if i == j else rng.randint(1, 99) for j in range(n)] for i in range(n)]
+        result[f'tsp/{n} cities'] = (tsp.TourProblem(distances), [
+            ('bfs exhaustive', lambda p, stats: search(p, 'bfs', exhaustive=True, stats=stats)),
+            ('dfs branch and bound', lambda p, stats: search(p, 'dfs', exhaustive=True, stats=stats)),
+            ('ucs', lambda p, stats: search(p, 'ucs', stats=stats)),
+            ('astar', lambda p, stats: search(p, 'astar', stats=stats))])
+    return result
+
+
+def memory_bfs(problem):
+    """Breadth-first sweep of the whole reachable space with an in-memory set of keys. Returns the layer sizes."""
+    key, successors = problem.key, problem.successors
+    initial = problem.initial()
+    seen = {key(initial)}
+    layer, layer_sizes = [initial], []
+    while layer:
+        layer_sizes.append(len(layer))
+        next_layer = []
+        for state in layer:
+            for child, _ in successors(state):
+                child_key = key(child)
+                if child_key not in seen:
+                    seen.add(child_key)
+                    next_layer.append(child)
+        layer = next_layer
+    return layer_sizes
+
+
+def external_problems():
+    """Returns the state spaces swept by the external benchmark, name -> (problem, reversible moves)."""
+    puzzle = load_module('eight-puzzle-a-star', 'puzzle.py', 'puzzle')
+    water_jug = load_module('water-jug-problem', 'water-jug.py', 'water_jug')
+    _, goal3 = scrambled_puzzle(3, 0, 0)
+    _, goal4 = scrambled_puzzle(4, 0, 0)
+    return {
+        '8-puzzle': (puzzle.SlidingPuzzle(goal3, goal3), True),
+        '15-puzzle pattern 1-4': (puzzle.PatternPuzzle(goal4, (1, 2, 3, 4)), True),
+        'jugs 13/17/22/29': (water_jug.MultiJugProblem((13, 17, 22, 29), -1), False),
+    }
+
+
+def measure(fn):
+    """
+    Runs fn twice: once timed, once under tracemalloc (which slows Python code down too much to time it).
+
+    :param fn: Function without arguments.
+    :return: Tuple (result of the timed run, seconds, peak traced memory in bytes).
+    """
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def bench_external(buffer_size):
+    """Sweeps every external_problems space with external_bfs and memory_bfs; returns a list of records."""
+    records = []
+    for name, (problem, reversible) in external_problems().items():
+        print(f"== {name} ==")
+        (layer_sizes, _, _), external_time, external_peak = measure(
+            lambda: external_bfs(problem, buffer_size=buffer_size, reversible=reversible, stop_at_goal=False))
+        memory_sizes, memory_time, memory_peak = measure(lambda: memory_bfs(problem))
+        assert memory_sizes == layer_sizes, "external and in-memory BFS disagree"
+        # Layer files on disk at once: three consecutive layers with reversible moves, all of them otherwise
+        window = 3 if reversible else len(layer_sizes)
+        disk = 8 * max(sum(layer_sizes[i:i + window]) for i in range(len(layer_sizes)))
+
+        print(f"{sum(layer_sizes)} states in {len(layer_sizes)} layers")
+        print(f"{'external bfs':16s} time: {external_time * 1000:9.2f} ms  peak memory: "
+              f"{external_peak / 2 ** 20:7.2f} MiB  peak disk: {disk / 2 ** 20:7.2f} MiB")
+        print(f"{'in-memory bfs':16s} time: {memory_time * 1000:9.2f} ms  peak memory: {memory_peak / 2 ** 20:7.2f} MiB")
+        records.append({'name': 'external bfs', 'problem': name, 'states': sum(layer_sizes),
+                        'wall_time': external_time, 'peak_memory': external_peak, 'peak_disk': disk})
+        records.append({'name': 'in-memory bfs', 'problem': name, 'states': sum(memory_sizes),
+                        'wall_time': memory_time, 'peak_memory': memory_peak})
+    return records
+
+
+def bench_quality(instances, time_limit):
+    """
+    Solution cost versus time on random 15-puzzle instances, for every quality-for-speed trade-off of search.py.
+
+    :param instances: Number of instances (random walks of 1000 moves from the goal, seeds 0, 1, ...).
+    :param time_limit: Time budget in seconds of every run.
+    :return: List of records with the instance, the method, the time of every solution found and its cost.
+    """
+    puzzle = load_module('eight-puzzle-a-star', 'puzzle.py', 'puzzle')
+    single = [('astar', lambda p: search(p, 'astar', frontier='bucket', time_limit=time_limit))]
+    single += [(f'wastar w={w}', lambda p, w=w: search(p, 'wastar', weight=w, frontier='bucket', time_limit=time_limit))
+               for w in (1.5, 2, 3, 5)]
+    single += [(f'beam w={width}', lambda p, width=width: beam_search(p, width, time_limit=time_limit))
+               for width in (10, 100, 1000, 10000)]
+    records = []
+    for seed in range(instances):
+        initial, goal = scrambled_puzzle(4, 1000, seed)
+        problem = puzzle.SlidingPuzzle(initial, goal)
+        name = f'15-puzzle #{seed}'
+        print(f"== {name} (h = {problem.heuristic(problem.initial())}, budget {time_limit} s) ==")
+        for label, solve in single:
+            start = time.perf_counter()
+            _, cost = solve(problem)
+            seconds = time.perf_counter() - start
+            print(f"{label:16s} time: {seconds * 1000:9.2f} ms  cost: {str(cost):>6s}")
+            records.append({'problem': name, 'name': label, 'times': [seconds], 'costs': [cost]})
+
+        # ARA*: every improved solution is one point of the cost-versus-time curve
+        times, costs = [], []
+        start = time.perf_counter()
+        for _, cost, bound in ara_star(problem, weight=3.0, weight_step=0.5, time_limit=time_limit):
+            if not costs or cost < costs[-1]:
+                times.append(time.perf_counter() - start)
+                costs.append(cost)
+                print(f"{'ara*':16s} time: {times[-1] * 1000:9.2f} ms  cost: {cost:6d}  bound: {bound:.3f}")
+        records.append({'problem': name, 'name': 'ara*', 'times': times, 'costs': costs})
+    return records
+
+
+def plot_quality(records, path):
+    """Plots solution cost versus time, one panel per instance, to an image file. Needs matplotlib."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    names = list(dict.fromkeys(record['problem'] for record in records))
+    figure, axes = plt.subplots(1, len(names), figsize=(5 * len(names), 4), squeeze=False)
+    for ax, name in zip(axes[0], names):
+        for record in records:
+            if record['problem'] != name or record['costs'][-1:] in ([], [None]):
+                continue
+            style = '-o' if len(record['times']) > 1 else 'o'
+            ax.step(record['times'], record['costs'], style, where='post', label=record['name'])
+        ax.set_xscale('log')
+        ax.set_xlabel('time (s)')
+        ax.set_ylabel('solution cost (moves)')
+        ax.set_title(name)
+    axes[0][0].legend(fontsize='small')
+    figure.tight_layout()
+    figure.savefig(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the search core.")
+    parser.add_argument('problems', nargs='*', default=['puzzle', 'jug', 'tsp'],
+                        help="puzzle, jug, tsp, external and/or quality")
+    parser.add_argument('--buffer-size', type=int, default=1 << 16, help="Key buffer of the external BFS")
+    parser.add_argument('--instances', type=int, default=3, help="15-puzzle instances of the quality benchmark")
+    parser.add_argument('--time-limit', type=float, default=5.0, help="Time budget of every quality benchmark run")
+    parser.add_argument('--plot', help="Plot the quality benchmark's solution cost versus time to this image file")
+    parser.add_argument('--json', help="Write all stats to this file")
+    args = parser.parse_args()
+
+    records = []
+    if 'external' in args.problems:
+        records += bench_external(args.buffer_size)
+    if 'quality' in args.problems:
+        quality = bench_quality(args.instances, args.time_limit)
+        records += quality
+        if args.plot:
+            plot_quality(quality, args.plot)
+    for name, (problem, solvers) in problems(args.problems).items():
+        print(f"== {name} ==")
+        for label, solve in solvers:
+            stats = SearchStats(label)
+            path, cost = solve(problem, stats)
+            print(f"{label:22s} time: {stats.wall_time * 1000:9.2f} ms  cost: {str(cost):>6s}  "
+                  f"expanded: {stats.nodes_expanded:8d}  max frontier: {stats.max_frontier:8d}")
+            records.append(dict(stats.to_dict(), problem=name, cost=cost))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(records, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
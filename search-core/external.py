@@ -0,0 +1,192 @@
+"""
+External-memory breadth-first search with delayed duplicate detection.
+
+The in-memory searches of search.py keep every reached state in a dict, so the state space must fit in RAM. external_bfs
+keeps the search on disk instead, one layer (all states at the same depth) per file of sorted, unique 64-bit state
+keys:
+    1. The current layer is read back in chunks and expanded. The keys of the successors go into a bounded in-memory
+       buffer; whenever it is full it is sorted, deduplicated and written out as a sorted run file.
+    2. Once the layer is expanded, the runs are merged chunk by chunk. Keys already present in the previous layers are
+       dropped by binary search in those (memory-mapped) layer files, and the rest is appended to the next layer file.
+Duplicates are thus detected late, in bulk, with sequential disk access instead of a hash lookup per state. Process
+memory is bounded by a small multiple of `buffer_size` keys, whatever the size of the state space.
+
+When every move can be undone (reversible=True, as for sliding puzzles), a duplicate of layer d + 1 can only be in
+layers d or d - 1, so only those two are checked and older layer files are deleted: disk use is bounded by the three
+largest consecutive layers. Otherwise every previous layer is checked.
+
+The problem follows the protocol of search.py, with keys that are non-negative integers below 2**64.
+
+Example:
+    layers, depth, goal = external_bfs(PatternPuzzle(goal_state, (1, 2, 3, 4)), reversible=True, stop_at_goal=False)
+"""
+import array
+import os
+import tempfile
+
+import numpy as np
+
+KEY_DTYPE = np.dtype('<u8')
+
+
+def read_keys(path):
+    """Returns the keys of a layer or run file as a read-only memory map (an empty array for an empty file)."""
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=KEY_DTYPE)
+    return np.memmap(path, dtype=KEY_DTYPE, mode='r')
+
+
+def iter_chunks(path, chunk_size):
+    """Yields the keys of a file as in-memory arrays of at most chunk_size keys."""
+    keys = read_keys(path)
+    for start in range(0, len(keys), chunk_size):
+        yield np.array(keys[start:start + chunk_size])
+
+
+def merge_runs(paths, chunk_size):
+    """
+    Merges sorted run files into one sorted, duplicate-free stream, holding at most chunk_size keys per run in memory.
+
+    :param paths: Run files of sorted, unique keys.
+    :param chunk_size: Keys read from a run at a time.
+    :return: Generator of sorted, unique key arrays, in increasing order across arrays.
+    """
+    readers = [iter_chunks(path, chunk_size) for path in paths]
+    pending = [next(reader, None) for reader in readers]
+    while True:
+        active = [i for i, chunk in enumerate(pending) if chunk is not None]
+        if not active:
+            return
+        # Every key up to the smallest last key of the loaded chunks is known to be complete
+        bound = min(pending[i][-1] for i in active)
+        parts = []
+        for i in active:
+            chunk = pending[i]
+            split = np.searchsorted(chunk, bound, side='right')
+            parts.append(chunk[:split])
+            pending[i] = chunk[split:] if split < len(chunk) else next(readers[i], None)
+        yield np.unique(np.concatenate(parts))
+
+
+def drop_known(keys, layers):
+    """
+    Removes the keys present in earlier layers.
+
+    :param keys: Sorted key array.
+    :param layers: Sorted key arrays (memory maps) of the layers to check.
+    :return: The keys found in none of the layers.
+    """
+    for layer in layers:
+        if len(layer) == 0 or len(keys) == 0:
+            continue
+        positions = np.minimum(np.searchsorted(layer, keys), len(layer) - 1)
+        keys = keys[layer[positions] != keys]
+    return keys
+
+
+def external_bfs(problem, workdir=None, buffer_size=1 << 20, reversible=False, stop_at_goal=True, max_depth=None,
+                 stats=None):
+    """
+    Breadth-first search with the layers on disk and delayed duplicate detection (see the module docstring).
+
+    :param problem: Problem to search (see search.Problem), with integer keys below 2**64.
+    :param workdir: Directory for the layer and run files; the last layers are left there as layer_<depth>.bin.
+        A temporary directory (removed afterwards) if None.
+    :param buffer_size: Maximum number of keys held in memory, by the successor buffer and by the merge.
+    :param reversible: Every move can be undone, so only the two previous layers can hold duplicates.
+    :param stop_at_goal: Stop at the first layer containing a goal; otherwise sweep the whole reachable space.
+    :param max_depth: Stop after this many layers.
+    :param stats: Optional SearchStats to report the search's work into; max_frontier is the largest layer.
+    :return: Tuple (number of states in every layer, depth of the first goal, first goal state found), the last two
+        None if no goal was reached.
+    """
+    if workdir is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            return external_bfs(problem, tmp, buffer_size, reversible, stop_at_goal, max_depth, stats)
+
+    if stats is not None:
+        stats.start()
+    key, state_of, successors, is_goal = problem.key, problem.state, problem.successors, problem.is_goal
+    expanded = generated = unmerged = max_frontier = 0  # unmerged: keys of a layer left unmerged at a goal
+
+    def layer_path(depth):
+        return os.path.join(workdir, f'layer_{depth}.bin')
+
+    np.array([key(problem.initial())], dtype=KEY_DTYPE).tofile(layer_path(0))
+    layer_sizes = [1]
+    goal_depth = goal_state = None
+    depth = 0
+
+    while layer_sizes[-1] and (max_depth is None or depth < max_depth):
+        # Expand the layer, spilling sorted runs of successor keys whenever the buffer is full
+        layer_generated = generated
+        runs = []
+        buffer = array.array('Q')
+
+        def spill():
+            path = os.path.join(workdir, f'run_{depth + 1}_{len(runs)}.bin')
+            np.unique(np.frombuffer(buffer, dtype=np.uint64)).astype(KEY_DTYPE).tofile(path)
+            runs.append(path)
+            del buffer[:]
+
+        for chunk in iter_chunks(layer_path(depth), buffer_size):
+            for state_key in chunk.tolist():
+                state = state_of(state_key)
+                if is_goal(state) and goal_depth is None:
+                    goal_depth, goal_state = depth, state
+                    if stop_at_goal:
+                        break
+                expanded += 1
+                for child, _ in successors(state):
+                    buffer.append(key(child))
+                    if len(buffer) >= buffer_size:
+                        generated += len(buffer)
+                        spill()
+            if goal_depth is not None and stop_at_goal:
+                break
+        if goal_depth is not None and stop_at_goal:
+            generated += len(buffer)
+            unmerged = generated - layer_generated  # Never checked for duplicates
+            for path in runs:
+                os.remove(path)
+            break
+        if buffer:
+            generated += len(buffer)
+            spill()
+
+        # Merge the runs into the next layer, dropping the keys of the previous layers
+        checked = range(max(0, depth - 1), depth + 1) if reversible else range(depth + 1)
+        previous = [read_keys(layer_path(d)) for d in checked]
+        size = 0
+        with open(layer_path(depth + 1), 'wb') as f:
+            for keys in merge_runs(runs, max(1, buffer_size // max(1, len(runs)))):
+                keys = drop_known(keys, previous)
+                keys.tofile(f)
+                size += len(keys)
+        del previous
+        for path in runs:
+            os.remove(path)
+        if reversible and depth >= 1:
+            os.remove(layer_path(depth - 1))  # Can no longer hold duplicates of later layers
+
+        layer_sizes.append(size)
+        max_frontier = max(max_frontier, size)
+        depth += 1
+
+    if goal_depth is None and layer_sizes[-1]:
+        # Stopped by max_depth: the last layer was written but not expanded, so only goal-test it
+        for chunk in iter_chunks(layer_path(depth), buffer_size):
+            for state_key in chunk.tolist():
+                state = state_of(state_key)
+                if is_goal(state):
+                    goal_depth, goal_state = depth, state
+                    break
+            if goal_depth is not None:
+                break
+    if not layer_sizes[-1]:
+        layer_sizes.pop()  # The empty layer past the end of the space
+    duplicates = generated - unmerged - (sum(layer_sizes) - 1)
+    if stats is not None:
+        stats.add(expanded, generated, duplicates, max_frontier)
+        stats.stop()
+    return layer_sizes, goal_depth, goal_state
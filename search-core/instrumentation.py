@@ -0,0 +1,146 @@
+"""
+Search instrumentation shared by the solvers of the repository.
+
+A solver accepts an optional `stats` argument. When it is a SearchStats, the solver reports into it how much work
+the search did; when it is None (the default) the solver skips all reporting, so uninstrumented runs pay only for a
+few local integer counters and `is None` checks.
+
+Tracked per search:
+    * nodes_expanded: states whose successors were generated.
+    * nodes_generated: successor states produced.
+    * duplicates_skipped: states dropped because they had been seen before.
+    * max_frontier: largest size the open list (queue, stack or heap) reached.
+    * cutoffs: branches pruned without being searched (alpha-beta cutoffs).
+    * heuristic_calls / heuristic_time: calls of the heuristic or evaluation function and the seconds spent in them.
+    * wall_time: seconds between start() and stop().
+Counters add up when one SearchStats is passed to several searches.
+
+The stats can be exported as JSON (to_json) or as a cProfile-compatible dump (dump_profile) that pstats, snakeviz
+and other profile viewers read. With profile=True the search also runs under cProfile, and the real profile is dumped.
+
+Example:
+    stats = SearchStats('water_jug_bfs')
+    bfs_water_jug(4, 3, 2, stats=stats)
+    print(stats.to_json())
+"""
+import cProfile
+import json
+import marshal
+import time
+
+COUNTERS = ('nodes_expanded', 'nodes_generated', 'duplicates_skipped', 'max_frontier', 'cutoffs',
+            'heuristic_calls', 'heuristic_time', 'wall_time')
+
+
+class SearchStats:
+    __slots__ = COUNTERS + ('name', 'profile', 'profiler', '_start')
+
+    def __init__(self, name='search', profile=False):
+        """
+        Create empty statistics.
+
+        :param name: Name of the solver, used in the JSON export and as the function name in profile dumps.
+        :param profile: Run the search under cProfile between start() and stop().
+        """
+        self.name = name
+        self.profile = profile
+        self.profiler = None  # cProfile.Profile, created by start() when profile is True
+        self._start = None
+        self.reset()
+
+    def reset(self):
+        """Zero all counters."""
+        self.nodes_expanded = self.nodes_generated = self.duplicates_skipped = self.max_frontier = self.cutoffs = 0
+        self.heuristic_calls = 0
+        self.heuristic_time = self.wall_time = 0.0
+
+    def start(self):
+        """Start the wall clock (and the profiler) of a search."""
+        if self.profile:
+            if self.profiler is None:
+                self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self._start = time.perf_counter()
+
+    def stop(self):
+        """Stop the wall clock (and the profiler) and add the elapsed time to wall_time."""
+        self.wall_time += time.perf_counter() - self._start
+        if self.profiler is not None:
+            self.profiler.disable()
+
+    def add(self, expanded=0, generated=0, duplicates=0, frontier=0, cutoffs=0):
+        """
+        Add the counters a solver kept in local variables during a search.
+
+        :param expanded: Nodes expanded.
+        :param generated: Nodes generated.
+        :param duplicates: Duplicates skipped.
+        :param frontier: Largest frontier size seen.
+        :param cutoffs: Branches pruned.
+        """
+        self.nodes_expanded += expanded
+        self.nodes_generated += generated
+        self.duplicates_skipped += duplicates
+        self.max_frontier = max(self.max_frontier, frontier)
+        self.cutoffs += cutoffs
+
+    def timed(self, fn):
+        """
+        Wrap a heuristic or evaluation function so that its calls and time are counted.
+
+        :param fn: Function to wrap.
+        :return: Function with the same arguments and result.
+        """
+        clock = time.perf_counter
+
+        def timed_fn(*args):
+            start = clock()
+            result = fn(*args)
+            self.heuristic_time += clock() - start
+            self.heuristic_calls += 1
+            return result
+        return timed_fn
+
+    def to_dict(self):
+        """Returns the name and all counters as a dict."""
+        return dict({'name': self.name}, **{counter: getattr(self, counter) for counter in COUNTERS})
+
+    def to_json(self, path=None, indent=2):
+        """
+        Export the stats as JSON.
+
+        :param path: File to write. If None, the JSON string is returned instead.
+        :param indent: Indentation of the JSON text.
+        :return: The JSON string when path is None.
+        """
+        text = json.dumps(self.to_dict(), indent=indent)
+        if path is None:
+            return text
+        with open(path, 'w') as f:
+            f.write(text + '\n')
+
+    def dump_profile(self, path):
+        """
+        Write a cProfile-compatible dump, readable with pstats.Stats(path).
+        If the search ran with profile=True the real cProfile profile is written. Otherwise a profile is built from
+        the counters: one entry for the search with its wall time, called by nothing, and one for the heuristic with
+        its calls and time, called by the search.
+
+        :param path: File to write.
+        """
+        if self.profiler is not None:
+            self.profiler.dump_stats(path)
+            return
+        search = ('<search>', 0, self.name)
+        heuristic = ('<search>', 0, f'{self.name}.heuristic')
+        calls, seconds = self.heuristic_calls, self.heuristic_time
+        # pstats entries: (primitive calls, total calls, own time, cumulative time, callers)
+        entries = {search: (1, 1, max(self.wall_time - seconds, 0.0), self.wall_time, {})}
+        if calls:
+            entries[heuristic] = (calls, calls, seconds, seconds, {search: (calls, calls, seconds, seconds)})
+        with open(path, 'wb') as f:
+            marshal.dump(entries, f)
+
+    def __repr__(self):
+        counters = ', '.join(f'{counter}={getattr(self, counter)!r}' for counter in COUNTERS)
+        return f'SearchStats({self.name!r}, {counters})'
@@ -0,0 +1,559 @@
+"""
+State-space search core shared by the solvers of the repository.
+
+A problem is any object with these methods (Problem provides the defaults):
+    * initial(): the start state.
+    * successors(state): iterable of (next state, step cost) pairs.
+    * is_goal(state): True for goal states.
+    * heuristic(state): estimate of the remaining cost to a goal (0 for uninformed search).
+    * key(state): hashable, compact identity of a state, used for duplicate detection and the parent store.
+    * state(key): the state of a key, used to rebuild the solution path.
+
+search() runs breadth-first, depth-first, uniform-cost, greedy best-first, A* and weighted A* search with one loop:
+    * The parent store maps the key of every reached state to (parent key, cost from the start). Frontier entries hold
+      a single state and the path is rebuilt from the parent pointers at the end, instead of copying it into every
+      entry.
+    * Duplicates are detected when a state is generated. A state reached again on a cheaper path gets its parent
+      pointer updated and is pushed again; the older frontier entry is skipped when popped.
+    * The frontier is a choice of FIFO, LIFO, binary heap or integer buckets (see FRONTIERS).
+ara_star() is anytime: it yields better and better solutions of weighted A* with a decreasing weight, reusing the
+search effort of the previous weights. beam_search() keeps only the best `width` states of every layer, and
+hill_climbing() follows the best successor while it improves the heuristic. All of them report into an optional
+SearchStats (see instrumentation.py), and search(), ara_star() and beam_search() stop at an optional time limit.
+
+The solver folders are plain script folders, not packages. Each solver imports this module and instrumentation.py
+by name after putting search-core on the module path with the one bootstrap line below, so it runs from its own
+folder (python puzzle.py) with no setup:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'search-core'))
+Scripts outside the solvers (benchmark.py here, game-engine-harness) load modules from their files (load_module).
+
+Example:
+    path, cost = search(problem, 'astar')
+    path, cost = search(problem, 'wastar', weight=2.0, frontier='bucket', time_limit=0.5)
+    for path, cost, bound in ara_star(problem, weight=3.0, time_limit=1.0):
+        print(f"{cost} moves, at most {bound:.2f} times the optimum")
+"""
+import heapq
+import itertools
+import time
+from collections import deque
+
+INFINITY = float('inf')
+
+
+class Problem:
+    def initial(self):
+        """Returns the start state."""
+        raise NotImplementedError
+
+    def successors(self, state):
+        """Returns an iterable of (next state, step cost) pairs."""
+        raise NotImplementedError
+
+    def is_goal(self, state):
+        """Returns True if the state is a goal."""
+        raise NotImplementedError
+
+    def heuristic(self, state):
+        """Returns an estimate of the cost from the state to the nearest goal."""
+        return 0
+
+    def key(self, state):
+        """Returns a hashable, compact identity of the state."""
+        return state
+
+    def state(self, key):
+        """Returns the state of a key (the inverse of key)."""
+        return key
+
+
+class FIFOFrontier:
+    """First in, first out: breadth-first order. Priorities are ignored."""
+
+    def __init__(self):
+        self.items = deque()
+
+    def push(self, item, priority):
+        self.items.append(item)
+
+    def pop(self):
+        return self.items.popleft()
+
+    def __len__(self):
+        return len(self.items)
+
+
+class LIFOFrontier:
+    """Last in, first out: depth-first order. Priorities are ignored."""
+
+    def __init__(self):
+        self.items = []
+
+    def push(self, item, priority):
+        self.items.append(item)
+
+    def pop(self):
+        return self.items.pop()
+
+    def __len__(self):
+        return len(self.items)
+
+
+class PriorityFrontier:
+    """Binary heap: lowest priority first, and among equal priorities the most recently pushed item (the deepest)."""
+
+    def __init__(self):
+        self.heap = []
+        self.counter = itertools.count(0, -1)  # Decreasing, so that newer entries win ties
+
+    def push(self, item, priority):
+        heapq.heappush(self.heap, (priority, next(self.counter), item))
+
+    def pop(self):
+        return heapq.heappop(self.heap)[2]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class BucketFrontier:
+    """
+    One LIFO bucket per priority value: O(1) pushes and pops when priorities are integers with few distinct values,
+    such as the f-costs of unit-cost problems.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.priorities = []  # Heap of the priorities that have a non-empty bucket
+        self.size = 0
+
+    def push(self, item, priority):
+        bucket = self.buckets.get(priority)
+        if bucket is None:
+            bucket = self.buckets[priority] = []
+            heapq.heappush(self.priorities, priority)
+        bucket.append(item)
+        self.size += 1
+
+    def pop(self):
+        priority = self.priorities[0]
+        bucket = self.buckets[priority]
+        item = bucket.pop()
+        if not bucket:
+            del self.buckets[priority]
+            heapq.heappop(self.priorities)
+        self.size -= 1
+        return item
+
+    def __len__(self):
+        return self.size
+
+
+FRONTIERS = {'fifo': FIFOFrontier, 'lifo': LIFOFrontier, 'priority': PriorityFrontier, 'bucket': BucketFrontier}
+
+# strategy -> (default frontier, weight of g in the priority, weight of h in the priority, reopen expanded states)
+# The weight of h for 'wastar' is the `weight` argument of search().
+STRATEGIES = {
+    'bfs': ('fifo', 0, 0, False),
+    'dfs': ('lifo', 0, 0, False),
+    'ucs': ('priority', 1, 0, True),
+    'greedy': ('priority', 0, 1, False),
+    'astar': ('priority', 1, 1, True),
+    'wastar': ('priority', 1, None, False),
+}
+
+
+def rebuild_path(problem, parents, key):
+    """
+    Follows the parent pointers from a key back to the start.
+
+    :param problem: Problem whose state() decodes the keys.
+    :param parents: Parent store, key -> (parent key, cost from the start).
+    :param key: Key of the last state of the path.
+    :return: List of states from the start to the state of `key`.
+    """
+    keys = []
+    while key is not None:
+        keys.append(key)
+        key = parents[key][0]
+    return [problem.state(key) for key in reversed(keys)]
+
+
+def path_cost(problem, path):
+    """Returns the cost of a path: the sum of the step costs of its moves (see Problem.successors)."""
+    total = 0
+    for state, next_state in zip(path, path[1:]):
+        total += next(cost for child, cost in problem.successors(state) if child == next_state)
+    return total
+
+
+def search(problem, strategy='astar', weight=1.0, frontier=None, exhaustive=False, time_limit=None, stats=None):
+    """
+    Searches a problem for a path from its initial state to a goal.
+
+    The goal test is done when a state is expanded, so uniform-cost and A* (with an admissible heuristic) return an
+    optimal path, and weighted A* one that costs at most `weight` times the optimum (with a consistent heuristic).
+    Uniform-cost and A* reopen expanded states reached again on a cheaper path; the other strategies only update
+    states that are still on the frontier.
+
+    :param problem: Problem to solve (see Problem).
+    :param strategy: One of 'bfs', 'dfs', 'ucs', 'greedy', 'astar' and 'wastar'.
+    :param weight: Weight of the heuristic for 'wastar'.
+    :param frontier: Frontier name from FRONTIERS or a frontier instance. Defaults to the strategy's own.
+    :param exhaustive: Keep searching after the first goal and return the cheapest one found. States whose cost plus
+        heuristic cannot beat the best goal so far are pruned (counted as cutoffs), which turns 'dfs' into depth-first
+        branch and bound. Expanded states are reopened when reached on a cheaper path.
+    :param time_limit: Time budget in seconds (None for unlimited). When it runs out the search stops and returns the
+        best goal found so far, which only exhaustive search can have.
+    :param stats: Optional SearchStats to report the search's work into.
+    :return: Tuple (list of states from the initial state to the goal, path cost), or (None, None) without a solution
+        (or without one found in the time limit).
+    :raises ValueError: If the strategy or the frontier is unknown.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}', expected one of {', '.join(STRATEGIES)} (or beam_search)")
+    default_frontier, g_weight, h_weight, reopen = STRATEGIES[strategy]
+    if h_weight is None:
+        h_weight = weight
+    reopen = reopen or exhaustive
+    if frontier is None:
+        frontier = default_frontier
+    if isinstance(frontier, str):
+        if frontier not in FRONTIERS:
+            raise ValueError(f"Unknown frontier '{frontier}', expected one of {', '.join(FRONTIERS)}")
+        frontier = FRONTIERS[frontier]()
+
+    heuristic = problem.heuristic
+    if stats is not None:
+        stats.start()
+        heuristic = stats.timed(heuristic)
+    clock = time.perf_counter
+    deadline = clock() + time_limit if time_limit is not None else None
+    use_heuristic = h_weight != 0 or exhaustive
+    key, successors, is_goal = problem.key, problem.successors, problem.is_goal
+    expanded = generated = duplicates = cutoffs = max_frontier = 0
+
+    start = problem.initial()
+    start_key = key(start)
+    parents = {start_key: (None, 0)}  # Parent store: key -> (parent key, cost from the start)
+    closed = set()  # Expanded keys, only kept when expanded states are not reopened
+    h = heuristic(start) if use_heuristic else 0
+    frontier.push((0, start_key, start), h_weight * h)
+    best_key, best_cost = None, INFINITY
+
+    while frontier:
+        if deadline is not None and not expanded & 63 and clock() > deadline:
+            break
+        g, state_key, state = frontier.pop()
+        if g > parents[state_key][1]:
+            duplicates += 1  # Superseded by an entry with a cheaper path
+            continue
+        if is_goal(state):
+            if g < best_cost:
+                best_key, best_cost = state_key, g
+            if not exhaustive:
+                break
+            continue
+        if not reopen:
+            closed.add(state_key)
+        expanded += 1
+
+        for child, cost in successors(state):
+            generated += 1
+            child_key = key(child)
+            child_g = g + cost
+            previous = parents.get(child_key)
+            if previous is not None and (child_g >= previous[1] or child_key in closed):
+                duplicates += 1
+                continue
+            if use_heuristic:
+                h = heuristic(child)
+                if child_g + h >= best_cost:
+                    cutoffs += 1  # Cannot lead to a cheaper goal (only reachable in exhaustive mode)
+                    continue
+            else:
+                h = 0
+            parents[child_key] = (state_key, child_g)
+            frontier.push((child_g, child_key, child), g_weight * child_g + h_weight * h)
+        if len(frontier) > max_frontier:
+            max_frontier = len(frontier)
+
+    if stats is not None:
+        stats.add(expanded, generated, duplicates, max_frontier, cutoffs)
+        stats.stop()
+    if best_key is None:
+        return None, None
+    return rebuild_path(problem, parents, best_key), best_cost
+
+
+def bfs(problem, **kwargs):
+    """Breadth-first search, see search()."""
+    return search(problem, 'bfs', **kwargs)
+
+
+def dfs(problem, **kwargs):
+    """Depth-first search, see search()."""
+    return search(problem, 'dfs', **kwargs)
+
+
+def uniform_cost(problem, **kwargs):
+    """Uniform-cost search, see search()."""
+    return search(problem, 'ucs', **kwargs)
+
+
+def astar(problem, **kwargs):
+    """A* search, see search()."""
+    return search(problem, 'astar', **kwargs)
+
+
+def weighted_astar(problem, weight, **kwargs):
+    """Weighted A* search with priority g + weight * h, see search()."""
+    return search(problem, 'wastar', weight=weight, **kwargs)
+
+
+def ara_star(problem, weight=3.0, weight_step=0.5, time_limit=None, stats=None):
+    """
+    Anytime Repairing A* (Likhachev, Gordon and Thrun, 2003): runs weighted A* with priority g + weight * h, then
+    lowers the weight by weight_step and runs it again until the solution is proven optimal or the time runs out.
+    Each run starts from the frontier and the costs of the previous one instead of from scratch: only the states
+    whose cost improved since they were expanded (kept in an "inconsistent" list) are expanded again. States that
+    cannot lead to a goal cheaper than the best one found (cost plus admissible heuristic) are pruned.
+
+    Yields after every run that found a solution, so the caller can stop at any time with the best solution so far.
+    The bound is the proven suboptimality: the cost is at most `bound` times the optimum (with a consistent
+    heuristic), and 1.0 means optimal.
+
+    :param problem: Problem to solve (see Problem), with an admissible heuristic.
+    :param weight: Weight of the heuristic in the first run (at least 1).
+    :param weight_step: Decrease of the weight after every run (the last run uses weight 1, i.e. A*).
+    :param time_limit: Time budget in seconds for the whole generator (None for unlimited).
+    :param stats: Optional SearchStats to report the search's work into; the time spent by the caller between two
+        solutions is not counted.
+    :return: Generator of tuples (list of states from the initial state to the goal, path cost, suboptimality bound),
+        with decreasing costs or bounds. Yields nothing if there is no solution or none was found in the time limit.
+    """
+    heuristic = problem.heuristic
+    if stats is not None:
+        stats.start()
+        heuristic = stats.timed(heuristic)
+    clock = time.perf_counter
+    deadline = clock() + time_limit if time_limit is not None else None
+    key, successors, is_goal = problem.key, problem.successors, problem.is_goal
+    expanded = generated = duplicates = cutoffs = max_frontier = 0
+
+    start = problem.initial()
+    start_key = key(start)
+    parents = {start_key: (None, 0)}  # Parent store, shared by all runs
+    counter = itertools.count(0, -1)  # Decreasing, so that newer (deeper) entries win ties, as in PriorityFrontier
+    # Frontier entries: (g + weight * h, tie breaker, (g, h, key, state))
+    start_h = heuristic(start)
+    frontier = [(weight * start_h, next(counter), (0, start_h, start_key, start))]
+    closed = set()  # Keys expanded in the current run
+    inconsistent = {}  # key -> (g, h, key, state) of closed states reached again on a cheaper path
+    best_key, best_cost = None, INFINITY
+    yielded_cost = None
+    timed_out = False
+
+    try:
+        while True:
+            # Weighted A* run, until no frontier entry has a lower priority than the cost of the best goal
+            while frontier and frontier[0][0] < best_cost:
+                if deadline is not None and not expanded & 63 and clock() > deadline:
+                    timed_out = True
+                    break
+                g, h, state_key, state = heapq.heappop(frontier)[2]
+                if g > parents[state_key][1] or state_key in closed:
+                    duplicates += 1
+                    continue
+                if is_goal(state):
+                    if g < best_cost:
+                        best_key, best_cost = state_key, g
+                    continue
+                closed.add(state_key)
+                expanded += 1
+
+                for child, cost in successors(state):
+                    generated += 1
+                    child_key = key(child)
+                    child_g = g + cost
+                    previous = parents.get(child_key)
+                    if previous is not None and child_g >= previous[1]:
+                        duplicates += 1
+                        continue
+                    child_h = heuristic(child)
+                    if child_g + child_h >= best_cost:
+                        cutoffs += 1
+                        continue
+                    parents[child_key] = (state_key, child_g)
+                    entry = (child_g, child_h, child_key, child)
+                    if child_key in closed:
+                        inconsistent[child_key] = entry  # Expanded again in the next run
+                    else:
+                        heapq.heappush(frontier, (child_g + weight * child_h, next(counter), entry))
+                if len(frontier) > max_frontier:
+                    max_frontier = len(frontier)
+
+            if best_key is None:
+                break
+            # Ancestors of the goal may have been reached on cheaper paths since it was, so the path rebuilt from the
+            # parent pointers can be cheaper than the goal's recorded cost
+            best_path = rebuild_path(problem, parents, best_key)
+            best_cost = path_cost(problem, best_path)
+            parents[best_key] = (parents[best_key][0], best_cost)
+            if timed_out and best_cost == yielded_cost:
+                break
+            # Entries still waiting for expansion, with the lowest g + h among them bounding the optimal cost
+            waiting = [entry for _, _, entry in frontier if entry[0] == parents[entry[2]][1] and entry[2] not in closed]
+            waiting.extend(entry for entry in inconsistent.values() if entry[0] == parents[entry[2]][1])
+            lower_bound = min((g + h for g, h, _, _ in waiting), default=INFINITY)
+            bound = best_cost / lower_bound if lower_bound > 0 else INFINITY
+            if not timed_out:
+                bound = min(bound, weight)  # Only a completed run guarantees the weight
+            bound = max(bound, 1.0)
+
+            if stats is not None:
+                stats.stop()
+            yielded_cost = best_cost
+            yield best_path, best_cost, bound
+            if stats is not None:
+                stats.start()
+            if timed_out or bound <= 1.0:
+                break
+
+            # Next run: lower weight, frontier rebuilt from the waiting entries that can still beat the best goal
+            weight = max(1.0, weight - weight_step)
+            frontier = []
+            for entry in waiting:
+                g, h = entry[0], entry[1]
+                if g + h < best_cost:
+                    frontier.append((g + weight * h, next(counter), entry))
+                else:
+                    cutoffs += 1
+            heapq.heapify(frontier)
+            closed.clear()
+            inconsistent.clear()
+
+        if stats is not None:
+            stats.stop()
+    finally:
+        if stats is not None:
+            stats.add(expanded, generated, duplicates, max_frontier, cutoffs)
+
+
+def beam_search(problem, width, weight=1.0, time_limit=None, stats=None):
+    """
+    Breadth-first beam search: expands the states of one layer at a time and keeps only the `width` successors with
+    the lowest g + weight * h for the next layer. Memory and time per layer are bounded by the width, but the search
+    is neither complete nor optimal.
+
+    :param problem: Problem to solve (see Problem).
+    :param width: Maximum number of states per layer.
+    :param weight: Weight of the heuristic in the ranking (0 ranks by path cost alone).
+    :param time_limit: Time budget in seconds (None for unlimited).
+    :param stats: Optional SearchStats to report the search's work into; states dropped from a layer count as cutoffs.
+    :return: Tuple (list of states from the initial state to the goal, path cost), or (None, None) without a solution
+        (or without one found in the time limit).
+    """
+    heuristic = problem.heuristic
+    if stats is not None:
+        stats.start()
+        heuristic = stats.timed(heuristic)
+    clock = time.perf_counter
+    deadline = clock() + time_limit if time_limit is not None else None
+    key, successors, is_goal = problem.key, problem.successors, problem.is_goal
+    expanded = generated = duplicates = cutoffs = max_frontier = 0
+
+    start = problem.initial()
+    parents = {key(start): (None, 0)}
+    layer = [(0, key(start), start)]
+    best_key = best_cost = None
+    timed_out = False
+
+    while layer and best_key is None and not timed_out:
+        candidates = {}
+        for g, state_key, state in layer:
+            if deadline is not None and not expanded & 63 and clock() > deadline:
+                timed_out = True
+                break
+            if g > parents[state_key][1]:
+                duplicates += 1
+                continue
+            if is_goal(state):
+                best_key, best_cost = state_key, g
+                break
+            expanded += 1
+            for child, cost in successors(state):
+                generated += 1
+                child_key = key(child)
+                child_g = g + cost
+                previous = parents.get(child_key)
+                if previous is not None and child_g >= previous[1]:
+                    duplicates += 1
+                    continue
+                parents[child_key] = (state_key, child_g)
+                if child_key in candidates:
+                    # A cheaper copy of a state already in this layer replaces it, but keeps the parent pointer from
+                    # before the layer, so that undoing it below restores the state as it was
+                    duplicates += 1
+                    previous = candidates[child_key][4]
+                candidates[child_key] = (child_g + weight * heuristic(child), child_g, child_key, child, previous)
+
+        if timed_out:
+            break
+        candidates = list(candidates.values())
+        if len(candidates) > width:
+            cutoffs += len(candidates) - width
+            candidates.sort(key=lambda candidate: candidate[0])
+            # Undo the parent pointers of the dropped states, so that they can be reached again through a later layer
+            for _, child_g, child_key, _, previous in reversed(candidates[width:]):
+                if previous is None:
+                    del parents[child_key]
+                else:
+                    parents[child_key] = previous
+            candidates = candidates[:width]
+        max_frontier = max(max_frontier, len(candidates))
+        layer = [(child_g, child_key, child) for _, child_g, child_key, child, _ in candidates]
+
+    if stats is not None:
+        stats.add(expanded, generated, duplicates, max_frontier, cutoffs)
+        stats.stop()
+    if best_key is None:
+        return None, None
+    return rebuild_path(problem, parents, best_key), best_cost
+
+
+def hill_climbing(problem, stats=None):
+    """
+    Steepest-descent hill climbing on the heuristic: moves to the successor with the lowest heuristic value as long as
+    it is lower than the current one. Step costs are ignored.
+
+    :param problem: Problem to solve (see Problem); only initial, successors and heuristic are used.
+    :param stats: Optional SearchStats to report the search's work into.
+    :return: Tuple (list of states visited, heuristic value of the last one).
+    """
+    heuristic = problem.heuristic
+    if stats is not None:
+        stats.start()
+        heuristic = stats.timed(heuristic)
+    expanded = generated = max_frontier = 0
+
+    state = problem.initial()
+    value = heuristic(state)
+    path = [state]
+    while True:
+        expanded += 1
+        best, best_value = None, value
+        for child, _ in problem.successors(state):
+            generated += 1
+            child_value = heuristic(child)
+            if child_value < best_value:
+                best, best_value = child, child_value
+        if best is None:
+            break  # Local optimum
+        state, value = best, best_value
+        path.append(state)
+
+    if stats is not None:
+        stats.add(expanded, generated, frontier=1)
+        stats.stop()
+    return path, value
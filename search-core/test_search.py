@@ -0,0 +1,88 @@
+"""
+Regression tests of the search core.
+
+Example:
+    python -m pytest test_search.py
+"""
+import pytest
+
+from benchmark import load_module, scrambled_puzzle
+from external import external_bfs
+from search import Problem, ara_star, beam_search, path_cost, search
+
+# Random 8-puzzles, as (initial, goal) grids reached by 24 random moves from the goal
+PUZZLES = [scrambled_puzzle(3, 24, seed) for seed in range(20)]
+
+
+class GraphProblem(Problem):
+    """Explicit weighted graph, given as {state: [(next state, step cost), ...]}."""
+
+    def __init__(self, edges, start, goal):
+        self.edges, self.start, self.goal = edges, start, goal
+
+    def initial(self):
+        return self.start
+
+    def successors(self, state):
+        return self.edges.get(state, ())
+
+    def is_goal(self, state):
+        return state == self.goal
+
+
+def test_beam_search_keeps_cheapest_copy_of_a_state():
+    # X is reached twice in the same layer (g=5 through A, g=4 through B); with a width of 2 the dearer copy is
+    # dropped, and undoing it must not remove the parent pointer of the kept one
+    edges = {
+        'S': [('A', 1), ('B', 1)],
+        'A': [('X', 5), ('Z', 1)],
+        'B': [('X', 4)],
+        'X': [('T', 1)],
+    }
+    problem = GraphProblem(edges, 'S', 'T')
+    path, cost = beam_search(problem, 2)
+    assert path == ['S', 'B', 'X', 'T']
+    assert cost == 6
+    assert search(problem, 'ucs') == (path, cost)
+
+
+@pytest.fixture(scope='module')
+def puzzles():
+    """Returns the 8-puzzles of PUZZLES as (problem, optimal cost) pairs."""
+    module = load_module('eight-puzzle-a-star', 'puzzle.py', 'puzzle')
+    problems = [module.SlidingPuzzle(initial, goal) for initial, goal in PUZZLES]
+    return [(problem, search(problem, 'bfs')[1]) for problem in problems]  # Unit moves: BFS finds the cheapest goal
+
+
+@pytest.mark.parametrize('strategy, frontier', [('ucs', None), ('astar', 'priority'), ('astar', 'bucket')])
+def test_search_is_optimal(puzzles, strategy, frontier):
+    for problem, optimum in puzzles:
+        path, cost = search(problem, strategy, frontier=frontier)
+        assert cost == optimum
+        assert path[0] == problem.initial() and problem.is_goal(path[-1])
+        assert path_cost(problem, path) == cost
+
+
+@pytest.mark.parametrize('weight', [1.5, 2.0, 3.0])
+def test_weighted_astar_bound(puzzles, weight):
+    for problem, optimum in puzzles:
+        path, cost = search(problem, 'wastar', weight=weight)
+        assert cost <= weight * optimum
+        assert path_cost(problem, path) == cost
+
+
+def test_ara_star_converges_to_optimal(puzzles):
+    for problem, optimum in puzzles:
+        solutions = list(ara_star(problem, weight=3.0))
+        for path, cost, bound in solutions:
+            assert path_cost(problem, path) == cost
+            assert cost <= bound * optimum + 1e-9  # The bound is a float ratio such as 30 / 22
+        costs = [cost for _, cost, _ in solutions]
+        assert costs == sorted(costs, reverse=True)
+        assert solutions[-1][1:] == (optimum, 1.0)
+
+
+def test_external_bfs_goal_at_max_depth(puzzles):
+    for problem, optimum in puzzles[:5]:
+        assert external_bfs(problem, reversible=True, max_depth=optimum)[1] == optimum
+        assert external_bfs(problem, reversible=True, max_depth=optimum - 1)[1] is None
@@ -0,0 +1,105 @@
+"""
+Benchmark of the incremental TSPSolver API against re-solving from scratch.
+
+A random Euclidean instance goes through a sequence of edits (a city inserted, a city removed, or the distance
+between a city and one of its nearest cities changed, as for traffic). After every edit the tour is repaired
+incrementally (insert_city / remove_city / update_edge) and, separately, re-solved on a copy of the changed instance
+by a fresh TSPSolver: start_tour (greedy route plus a local search over all cities) for large instances, and A* for
+small ones, whose optimal cost shows the quality of the repaired tours.
+
+Example:
+    python benchmark.py
+    python benchmark.py --cities 200 1000 --edits 50
+"""
+import argparse
+import math
+import random
+import statistics
+import time
+
+from tsp import TSPSolver
+
+
+def euclidean_matrix(points):
+    """Returns the distance matrix of a list of (x, y) points."""
+    return [[math.dist(a, b) for b in points] for a in points]
+
+
+def apply_edit(solver, points, rng):
+    """
+    Applies a random edit to an incremental solver and to the points it was built from.
+
+    :param solver: TSPSolver whose incremental API is started.
+    :param points: (x, y) points of the cities, kept in step with the solver's indices.
+    :param rng: random.Random.
+    :return: Name of the edit.
+    """
+    kind = rng.choice(('insert', 'remove', 'update'))
+    if kind == 'insert' or solver.num_cities < 4:
+        point = (rng.random(), rng.random())
+        solver.insert_city([math.dist(point, other) for other in points])
+        points.append(point)
+        return 'insert'
+    if kind == 'remove':
+        city = rng.randrange(solver.num_cities)
+        solver.remove_city(city)
+        points.pop(city)
+        return 'remove'
+    city = rng.randrange(solver.num_cities)
+    other = rng.choice(solver.neighbors[city])
+    solver.update_edge(city, other, solver.distance_matrix[city][other] * rng.uniform(0.5, 2.0))
+    return 'update'
+
+
+def bench(num_cities, num_edits, exact, seed=0):
+    """
+    Times num_edits incremental edits of a random instance against full re-solves.
+
+    :param num_cities: Number of cities of the instance.
+    :param num_edits: Number of edits.
+    :param exact: Re-solve with A* (optimal, small instances only) instead of start_tour.
+    :param seed: Seed of the instance and the edits.
+    """
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for _ in range(num_cities)]
+    solver = TSPSolver(euclidean_matrix(points))
+    solver.start_tour()
+
+    latencies, resolve_times, ratios = {}, [], []
+    for _ in range(num_edits):
+        start = time.perf_counter()
+        kind = apply_edit(solver, points, rng)
+        latencies.setdefault(kind, []).append(time.perf_counter() - start)
+
+        fresh = TSPSolver([row[:] for row in solver.distance_matrix])
+        start = time.perf_counter()
+        _, cost = fresh.a_star() if exact else fresh.start_tour()
+        resolve_times.append(time.perf_counter() - start)
+        ratios.append(solver.tour_cost / cost)
+
+    resolve = statistics.median(resolve_times)
+    reference = "A* optimum" if exact else "re-solved tour"
+    print(f"== {num_cities} cities, {num_edits} edits, re-solve with {'A*' if exact else 'start_tour'} ==")
+    for kind, times in sorted(latencies.items()):
+        median = statistics.median(times)
+        print(f"{kind:8s} x{len(times):3d}  incremental median: {median * 1000:8.3f} ms  max: {max(times) * 1000:8.3f} ms"
+              f"  speedup vs re-solve: {resolve / median:8.1f}x")
+    print(f"re-solve median: {resolve * 1000:9.3f} ms")
+    print(f"incremental cost / {reference}: mean {statistics.mean(ratios):.4f}, max {max(ratios):.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental TSP edits against re-solving.")
+    parser.add_argument('--cities', type=int, nargs='*', default=[200, 1000], help="Sizes re-solved with start_tour")
+    parser.add_argument('--exact-cities', type=int, default=11, help="Size re-solved with A* (0 to skip)")
+    parser.add_argument('--edits', type=int, default=30, help="Edits per instance")
+    args = parser.parse_args()
+
+    if args.exact_cities:
+        bench(args.exact_cities, args.edits, exact=True)
+    for num_cities in args.cities:
+        bench(num_cities, args.edits, exact=False)
+
+
+if __name__ == "__main__":
+    main()
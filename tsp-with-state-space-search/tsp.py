@@ -1,134 +1,179 @@
+import heapq
 import itertools
+import os
 import sys
 import random
-from queue import Queue, LifoQueue, PriorityQueue
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'search-core'))
+from search import Problem, hill_climbing, search
+
+
+class TourProblem(Problem):
+    def __init__(self, distance_matrix, start=0):
+        """
+        Building a tour city by city as a search problem (see search-core/search.py).
+        A state is (current city, bit mask of the visited cities); the last step returns to the start city and sets
+        the extra bit 1 << num_cities. Partial tours that visited the same cities and stand in the same city share a
+        state, so only the cheapest of them is extended.
+        :param distance_matrix: 2D list representing distances between cities
+        :param start: City the tour starts and ends at.
+        """
+        self.distance_matrix = distance_matrix
+        self.num_cities = len(distance_matrix)
+        self.start = start
+        self.full = (1 << self.num_cities) - 1  # Mask with every city visited
+        self.done = 1 << self.num_cities  # Bit set once the tour is closed
+
+    def initial(self):
+        return self.start, 1 << self.start
+
+    def is_goal(self, state):
+        return state[1] & self.done != 0
+
+    def successors(self, state):
+        city, mask = state
+        row = self.distance_matrix[city]
+        if mask == self.full:
+            return [((self.start, mask | self.done), row[self.start])]  # Return to the start city
+        return [((next_city, mask | 1 << next_city), row[next_city])
+                for next_city in range(self.num_cities) if not mask >> next_city & 1]
+
+    def heuristic(self, state):
+        """
+        Lower bound on the cost of completing the tour: every city still to leave (the current one and the unvisited
+        ones) is left exactly once, towards an unvisited city or finally the start, so each contributes at least its
+        cheapest such edge.
+        """
+        city, mask = state
+        if mask & self.done:
+            return 0
+        distance = self.distance_matrix
+        unvisited = [c for c in range(self.num_cities) if not mask >> c & 1]
+        if not unvisited:
+            return distance[city][self.start]
+        bound = min(distance[city][c] for c in unvisited)
+        targets = unvisited + [self.start]
+        for c in unvisited:
+            bound += min(distance[c][t] for t in targets if t != c)
+        return bound
+
+    def key(self, state):
+        return state[1] * self.num_cities + state[0]
+
+    def state(self, key):
+        return key % self.num_cities, key // self.num_cities
+
+
+class TourSwapProblem(Problem):
+    def __init__(self, solver, route):
+        """
+        Improving a complete tour by swapping two cities, as a local search problem (see search-core/search.py).
+        The heuristic is the tour length, which hill climbing minimises.
+        :param solver: TSPSolver with the distance matrix.
+        :param route: Initial route.
+        """
+        self.solver = solver
+        self.route = tuple(route)
+
+    def initial(self):
+        return self.route
+
+    def successors(self, state):
+        return [(tuple(neighbor), 1) for neighbor in self.solver.get_neighbors(list(state))]
+
+    def heuristic(self, state):
+        return self.solver.calculate_total_distance(state, self.solver.distance_matrix)
 
 
 class TSPSolver:
-    def __init__(self, distance_matrix):
+    def __init__(self, distance_matrix, num_neighbors=8):
         """
         Initialize the TSP Solver with a distance matrix.
         :param distance_matrix: 2D list representing distances between cities
+        :param num_neighbors: Length of the nearest-neighbour lists cached by the incremental API (see start_tour).
         """
         self.distance_matrix = distance_matrix
         self.num_cities = len(distance_matrix)
+        self.num_neighbors = num_neighbors
+        # State of the incremental API, created by start_tour: the current tour as successor and predecessor of every
+        # city, its cost, the nearest cities of every city (sorted by distance) and whether distances are symmetric
+        self.succ = self.pred = None
+        self.tour_cost = None
+        self.neighbors = None
+        self.symmetric = None
     
-    def brute_force(self):
+    def brute_force(self, stats=None):
         """
         Solves the TSP using brute-force approach (checking all permutations).
+        :param stats: Optional SearchStats to report the search's work into.
         :return: The minimum distance and the best route.
         """
+        if stats is not None:
+            stats.start()
         cities = list(range(self.num_cities))
         min_distance = sys.maxsize
         best_route = None
+        generated = 0
 
         # Check all possible permutations of city routes
         for route in itertools.permutations(cities):
+            generated += 1
             total_distance = self.calculate_total_distance(route, self.distance_matrix)
             if total_distance < min_distance:
                 min_distance = total_distance
                 best_route = route
 
+        if stats is not None:
+            stats.add(generated=generated)
+            stats.stop()
         return best_route, min_distance
 
-    def bfs(self):
+    def bfs(self, stats=None):
         """
-        Solves the TSP using Breadth-First Search.
+        Solves the TSP using Breadth-First Search over the tour states, exploring them all and keeping the best tour.
+        :param stats: Optional SearchStats to report the search's work into.
         :return: The minimum distance and the best route.
         """
-        cities = list(range(self.num_cities))
-        q = Queue()
-        q.put((0, [0], 0))  # (current city, path, current distance)
-        min_distance = sys.maxsize
-        best_route = None
-
-        while not q.empty():
-            current_city, path, current_distance = q.get()
-
-            # If all cities are visited, check the return to the starting city
-            if len(path) == self.num_cities:
-                total_distance = current_distance + self.distance_matrix[current_city][0]
-                if total_distance < min_distance:
-                    min_distance = total_distance
-                    best_route = path + [0]
-                continue
-
-            # Explore next cities
-            for next_city in cities:
-                if next_city not in path:
-                    new_distance = current_distance + self.distance_matrix[current_city][next_city]
-                    q.put((next_city, path + [next_city], new_distance))
-
-        return best_route, min_distance
+        return self.solve('bfs', exhaustive=True, stats=stats)
 
-    def dfs(self):
+    def dfs(self, stats=None):
         """
-        Solves the TSP using Depth-First Search.
+        Solves the TSP using Depth-First Search as branch and bound: partial tours that cannot beat the best tour found
+        so far are pruned.
+        :param stats: Optional SearchStats to report the search's work into.
         :return: The minimum distance and the best route.
         """
-        cities = list(range(self.num_cities))
-        stack = LifoQueue()
-        stack.put((0, [0], 0))  # (current city, path, current distance)
-        min_distance = sys.maxsize
-        best_route = None
-
-        while not stack.empty():
-            current_city, path, current_distance = stack.get()
-
-            # If all cities are visited, check the return to the starting city
-            if len(path) == self.num_cities:
-                total_distance = current_distance + self.distance_matrix[current_city][0]
-                if total_distance < min_distance:
-                    min_distance = total_distance
-                    best_route = path + [0]
-                continue
+        return self.solve('dfs', exhaustive=True, stats=stats)
 
-            # Explore next cities
-            for next_city in cities:
-                if next_city not in path:
-                    new_distance = current_distance + self.distance_matrix[current_city][next_city]
-                    stack.put((next_city, path + [next_city], new_distance))
-
-        return best_route, min_distance
-
-    def a_star(self):
+    def a_star(self, stats=None):
         """
         Solves the TSP using the A* search algorithm.
+        :param stats: Optional SearchStats to report the search's work into.
         :return: The minimum distance and the best route.
         """
-        cities = list(range(self.num_cities))
-        pq = PriorityQueue()
-        pq.put((0, 0, [0]))  # (f-cost (priority), current distance, path)
-        min_distance = sys.maxsize
-        best_route = None
-
-        while not pq.empty():
-            _, current_distance, path = pq.get()
+        return self.solve('astar', stats=stats)
 
-            current_city = path[-1]
-
-            # If all cities are visited, check the return to the starting city
-            if len(path) == self.num_cities:
-                total_distance = current_distance + self.distance_matrix[current_city][0]
-                if total_distance < min_distance:
-                    min_distance = total_distance
-                    best_route = path + [0]
-                continue
-
-            # Explore next cities
-            for next_city in cities:
-                if next_city not in path:
-                    new_distance = current_distance + self.distance_matrix[current_city][next_city]
-                    heuristic = self.estimate_heuristic(next_city, path)
-                    pq.put((new_distance + heuristic, new_distance, path + [next_city]))
-
-        return best_route, min_distance
+    def solve(self, strategy, stats=None, **kwargs):
+        """
+        Finds a tour with the search core, on the states of TourProblem.
+        :param strategy: Search strategy, see search-core/search.py.
+        :param stats: Optional SearchStats to report the search's work into.
+        :param kwargs: Further arguments of search().
+        :return: The best route (back to the starting city) and its distance.
+        """
+        path, distance = search(TourProblem(self.distance_matrix), strategy, stats=stats, **kwargs)
+        return [city for city, _ in path], distance
 
-    def greedy_search(self, start=0):
+    def greedy_search(self, start=0, stats=None):
         """
         Performs Greedy search to solve TSP starting from a specified city.
+        :param start: City the tour starts and ends at.
+        :param stats: Optional SearchStats to report the search's work into.
         :return: The best route and minimum distance.
         """
+        if stats is not None:
+            stats.start()
         visited = [False] * self.num_cities
         route = [start]
         visited[start] = True
@@ -154,39 +199,325 @@ class TSPSolver:
         total_distance += self.distance_matrix[current_city][start]
         route.append(start)
 
+        if stats is not None:
+            # Every step expands the current city and considers each unvisited city
+            steps = self.num_cities - 1
+            stats.add(steps, steps * (steps + 1) // 2, frontier=steps)
+            stats.stop()
         return route, total_distance
 
-    def hill_climbing(self):
+    def hill_climbing(self, stats=None):
         """
         Solves the TSP using Hill Climbing algorithm.
+        :param stats: Optional SearchStats to report the search's work into.
         :return: The best route and minimum distance.
         """
         # Start with a random route
         current_route = list(range(self.num_cities))
         random.shuffle(current_route)
-        current_distance = self.calculate_total_distance(current_route, self.distance_matrix)
-        
-        while True:
-            neighbors = self.get_neighbors(current_route)
-            next_route = None
-            next_distance = current_distance
-            
-            # Find the best neighbor
-            for neighbor in neighbors:
-                neighbor_distance = self.calculate_total_distance(neighbor, self.distance_matrix)
-                if neighbor_distance < next_distance:
-                    next_route = neighbor
-                    next_distance = neighbor_distance
-            
-            # If no better neighbor is found, stop
-            if next_route is None:
+        path, current_distance = hill_climbing(TourSwapProblem(self, current_route), stats=stats)
+        return list(path[-1]), current_distance
+
+    def start_tour(self, route=None):
+        """
+        Starts the incremental API from a tour. insert_city, remove_city and update_edge then repair and re-optimise
+        this tour around the edit instead of solving the changed instance from scratch. The edits change the solver's
+        own copy of the distance matrix, taken here, and never the caller's matrix.
+        :param route: Route visiting every city once (the starting city may be repeated at the end). If None, the
+            greedy route is used.
+        :return: The route (back to city 0) and its distance, after a local search over all cities.
+        :raises ValueError: If the route does not visit every city exactly once.
+        """
+        n = self.num_cities
+        matrix = self.distance_matrix = [list(row) for row in self.distance_matrix]
+        if route is None:
+            route, _ = self.greedy_search() if n else ([], 0)
+        route = list(route)
+        if len(route) == n + 1 and route[0] == route[-1]:
+            route.pop()
+        if sorted(route) != list(range(n)):
+            raise ValueError("The route must visit every city exactly once")
+
+        self.symmetric = all(matrix[i][j] == matrix[j][i] for i in range(n) for j in range(i))
+        self.neighbors = [self.nearest_cities(city) for city in range(n)]
+        self.succ, self.pred = [0] * n, [0] * n
+        for city, next_city in zip(route, route[1:] + route[:1]):
+            self.succ[city] = next_city
+            self.pred[next_city] = city
+        self.tour_cost = self.calculate_total_distance(route, matrix)
+        self.local_search(range(n))
+        return self.current_tour()
+
+    def current_tour(self):
+        """
+        Returns the tour of the incremental API.
+        :return: The route (from city 0 back to city 0) and its distance.
+        """
+        if not self.succ:
+            return [], 0
+        route = [0]
+        city = self.succ[0]
+        while city != 0:
+            route.append(city)
+            city = self.succ[city]
+        route.append(0)
+        return route, self.tour_cost
+
+    def insert_city(self, distances_from, distances_to=None):
+        """
+        Adds a city, with index num_cities, and repairs the current tour: the city goes between the two consecutive
+        cities where it lengthens the tour least (cheapest insertion), then a local search around it re-optimises.
+        :param distances_from: Distances from the new city to every existing city.
+        :param distances_to: Distances from every existing city to the new city. Defaults to distances_from.
+        :return: The new route (back to city 0) and its distance.
+        :raises ValueError: If a distance list does not have one entry per existing city.
+        """
+        self.ensure_tour()
+        n = self.num_cities
+        distances_from = list(distances_from)
+        distances_to = distances_from if distances_to is None else list(distances_to)
+        if len(distances_from) != n or len(distances_to) != n:
+            raise ValueError(f"Expected {n} distances from and to the new city")
+        matrix = self.distance_matrix
+        for row, distance in zip(matrix, distances_to):
+            row.append(distance)
+        matrix.append(distances_from + [0])
+        city = n
+        self.num_cities = n + 1
+        if distances_from != distances_to:
+            self.symmetric = False
+
+        # Cached neighbour lists: the new city's own, and the lists it enters
+        self.neighbors.append(self.nearest_cities(city))
+        for other in range(n):
+            self.offer_neighbor(other, city)
+
+        # Cheapest insertion over every edge of the tour
+        succ, pred = self.succ, self.pred
+        succ.append(city)
+        pred.append(city)
+        if n == 0:
+            self.tour_cost = 0
+            return self.current_tour()
+        best_increase, after = float('inf'), None
+        for u in range(n):
+            v = succ[u]
+            increase = distances_to[u] + distances_from[v] - matrix[u][v]
+            if increase < best_increase:
+                best_increase, after = increase, u
+        before = succ[after]
+        succ[after], pred[city], succ[city], pred[before] = city, after, before, city
+        self.tour_cost += best_increase
+        self.local_search([city, after, before])
+        return self.current_tour()
+
+    def remove_city(self, city):
+        """
+        Removes a city and repairs the current tour by joining its two tour neighbours, then a local search around
+        the gap re-optimises. Like deleting from a list, the cities after it move down one index.
+        :param city: Index of the city to remove.
+        :return: The new route (back to city 0) and its distance.
+        :raises IndexError: If there is no such city.
+        """
+        self.ensure_tour()
+        n = self.num_cities
+        if not 0 <= city < n:
+            raise IndexError(f"City {city} out of range for {n} cities")
+        matrix, succ, pred = self.distance_matrix, self.succ, self.pred
+        before, after = pred[city], succ[city]
+        if n > 1:
+            self.tour_cost += matrix[before][after] - matrix[before][city] - matrix[city][after]
+        succ[before], pred[after] = after, before
+
+        # Drop the city from the matrix and renumber the cities after it in the cached structures
+        del matrix[city]
+        for row in matrix:
+            del row[city]
+        self.num_cities -= 1
+        self.succ = [c - (c > city) for c in succ[:city] + succ[city + 1:]]
+        self.pred = [c - (c > city) for c in pred[:city] + pred[city + 1:]]
+        neighbors = self.neighbors
+        del neighbors[city]
+        for other, nearest in enumerate(neighbors):
+            if city in nearest:
+                neighbors[other] = None  # Lost a neighbour: recomputed below, once the indices are final
+            else:
+                neighbors[other] = [c - (c > city) for c in nearest]
+        for other, nearest in enumerate(neighbors):
+            if nearest is None:
+                neighbors[other] = self.nearest_cities(other)
+
+        if self.num_cities == 0:
+            self.tour_cost = 0
+            return self.current_tour()
+        self.local_search([before - (before > city), after - (after > city)])
+        return self.current_tour()
+
+    def update_edge(self, from_city, to_city, distance, symmetric=True):
+        """
+        Changes the distance between two cities and re-optimises the current tour with a local search around them.
+        :param from_city: First city.
+        :param to_city: Second city.
+        :param distance: New distance.
+        :param symmetric: Change both directions; otherwise only the distance from from_city to to_city.
+        :return: The new route (back to city 0) and its distance.
+        :raises ValueError: If both cities are the same.
+        """
+        self.ensure_tour()
+        if from_city == to_city:
+            raise ValueError("An edge joins two different cities")
+        matrix, succ, pred = self.distance_matrix, self.succ, self.pred
+        for a, b in ((from_city, to_city), (to_city, from_city)) if symmetric else ((from_city, to_city),):
+            if succ[a] == b:
+                self.tour_cost += distance - matrix[a][b]
+            matrix[a][b] = distance
+            if b in self.neighbors[a]:
+                self.neighbors[a] = self.nearest_cities(a)  # b may move within or out of the list
+            else:
+                self.offer_neighbor(a, b)
+        if matrix[to_city][from_city] != distance:
+            self.symmetric = False
+        self.local_search([from_city, to_city, pred[from_city], succ[from_city], pred[to_city], succ[to_city]])
+        return self.current_tour()
+
+    def ensure_tour(self):
+        """Starts the incremental API from the greedy route if start_tour has not been called."""
+        if self.succ is None:
+            self.start_tour()
+
+    def nearest_cities(self, city):
+        """
+        Returns the num_neighbors cities closest to a city, nearest first.
+        :param city: City index.
+        """
+        row = self.distance_matrix[city]
+        others = (other for other in range(self.num_cities) if other != city)
+        return heapq.nsmallest(self.num_neighbors, others, key=row.__getitem__)
+
+    def offer_neighbor(self, city, other):
+        """
+        Inserts `other` into the cached neighbour list of `city` if it is among its num_neighbors nearest cities.
+        :param city: City whose list is updated.
+        :param other: Candidate neighbour, not yet in the list.
+        """
+        nearest = self.neighbors[city]
+        row = self.distance_matrix[city]
+        distance = row[other]
+        if len(nearest) >= self.num_neighbors and distance >= row[nearest[-1]]:
+            return
+        position = len(nearest)
+        while position and row[nearest[position - 1]] > distance:
+            position -= 1
+        nearest.insert(position, other)
+        del nearest[self.num_neighbors:]
+
+    def local_search(self, cities):
+        """
+        Improves the current tour with 2-opt moves (symmetric distances only) and or-opt moves (relocating a run of
+        up to 3 cities) around the given cities. The candidate moves of a city only pair it with its cached nearest
+        cities, and a city is only looked at again when a move changes one of its tour edges, so the work stays
+        proportional to the part of the tour that changed rather than to the number of cities.
+        :param cities: Cities whose tour edges changed.
+        :return: Number of moves applied.
+        """
+        queue = deque(cities)
+        queued = set(queue)
+        moves = 0
+        while queue:
+            city = queue.popleft()
+            queued.discard(city)
+            touched = self.improve_city(city)
+            if touched:
+                moves += 1
+                for other in touched:
+                    if other not in queued:
+                        queued.add(other)
+                        queue.append(other)
+        return moves
+
+    def improve_city(self, a):
+        """
+        Applies the first improving 2-opt or or-opt move involving a city, updating tour_cost.
+        :param a: City index.
+        :return: The cities whose tour edges changed, or None if no move improves the tour.
+        """
+        d, succ, pred = self.distance_matrix, self.succ, self.pred
+        n = len(succ)
+        if n < 3:
+            return None
+
+        # 2-opt: replace the tour edges a-b and c-e by a-c and b-e, reversing the path between them
+        if self.symmetric and n >= 4:
+            for forward in (True, False):
+                b = succ[a] if forward else pred[a]
+                ab = d[a][b]
+                for c in self.neighbors[a]:
+                    ac = d[a][c]
+                    if ac >= ab:
+                        break  # Sorted by distance: no later neighbour can shorten the edge a-b
+                    e = succ[c] if forward else pred[c]
+                    if c == b or e == a:
+                        continue
+                    gain = ab + d[c][e] - ac - d[b][e]
+                    if gain > 1e-9:
+                        if forward:
+                            self.reverse_path(b, c)
+                        else:
+                            self.reverse_path(c, b)
+                        self.tour_cost -= gain
+                        return [a, b, c, e]
+
+        # Or-opt: move the run of cities a..last between two consecutive cities u -> v next to a or last
+        last = a
+        segment = [a]
+        for length in (1, 2, 3):
+            if length > 1:
+                last = succ[last]
+                segment.append(last)
+            if length > n - 2:
                 break
-            
-            # Move to the better neighbor
-            current_route = next_route
-            current_distance = next_distance
+            p, nx = pred[a], succ[last]
+            saving = d[p][a] + d[last][nx] - d[p][nx]
+            if saving <= 1e-9:
+                continue
+            candidates = [(u, succ[u]) for u in self.neighbors[a]] + [(pred[v], v) for v in self.neighbors[last]]
+            for u, v in candidates:
+                if u == p or u in segment:
+                    continue
+                gain = saving - (d[u][a] + d[last][v] - d[u][v])
+                if gain > 1e-9:
+                    succ[p], pred[nx] = nx, p
+                    succ[u], pred[a] = a, u
+                    succ[last], pred[v] = v, last
+                    self.tour_cost -= gain
+                    return [p, nx, u, v, a, last]
+        return None
+
+    def reverse_path(self, first, last):
+        """
+        Reverses the tour path from first to last (following succ), or the rest of the tour if that is shorter,
+        which gives the same tour with symmetric distances.
+        :param first: First city of the path.
+        :param last: Last city of the path.
+        """
+        succ, pred = self.succ, self.pred
+        # Walk the path and the rest of the tour in step, to find the shorter one
+        inner, outer, outer_last = first, succ[last], pred[first]
+        while inner != last and outer != outer_last:
+            inner, outer = succ[inner], succ[outer]
+        if inner != last:
+            first, last = succ[last], outer_last
 
-        return current_route, current_distance
+        before, after = pred[first], succ[last]
+        city = first
+        while True:
+            next_city = succ[city]
+            succ[city], pred[city] = pred[city], next_city
+            if city == last:
+                break
+            city = next_city
+        succ[before], pred[last] = last, before
+        succ[first], pred[after] = after, first
 
     def get_neighbors(self, route):
         """
@@ -202,21 +533,6 @@ class TSPSolver:
                 neighbors.append(neighbor)
         return neighbors
 
-    def estimate_heuristic(self, current_city, path):
-        """
-        A heuristic function for A* algorithm.
-        :param current_city: Current city in the path
-        :param path: The current path
-        :return: Heuristic value (minimum cost estimate to complete the tour)
-        """
-        remaining_cities = set(range(self.num_cities)) - set(path)
-        if not remaining_cities:
-            return 0
-
-        # Find minimum distance to any remaining city
-        min_heuristic = min(self.distance_matrix[current_city][city] for city in remaining_cities)
-        return min_heuristic
-
     def calculate_total_distance(self, route, distance_matrix):
         """
         Calculate the total distance of the given route.
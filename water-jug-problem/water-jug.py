@@ -1,79 +1,114 @@
-from collections import deque
+import itertools
+import os
+import sys
 
-# Helper function to check if a state has been visited
-def is_visited(visited_states, state):
-    return state in visited_states
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'search-core'))
+from instrumentation import SearchStats
+from search import Problem, rebuild_path, search
 
 # Helper function to display the steps taken to reach the solution
 def display_steps(steps):
     for i, step in enumerate(steps):
         print(f"Step {i + 1}: Jug 1 = {step[0]}L, Jug 2 = {step[1]}L")
 
-# BFS implementation for Water Jug Problem
-def bfs_water_jug(jug1_capacity, jug2_capacity, target_amount):
-    queue = deque([(0, 0, [])])  # Initial state: both jugs empty and an empty list for steps
-    visited_states = set()       # Set to track visited states
-
-    while queue:
-        jug1, jug2, steps = queue.popleft()
-
-        if jug1 == target_amount or jug2 == target_amount:
-            steps.append((jug1, jug2))
-            return steps
-
-        if is_visited(visited_states, (jug1, jug2)):
-            continue
-
-        visited_states.add((jug1, jug2))
-
-        # Generate all possible next states and add them to the queue
-        queue.append((jug1_capacity, jug2, steps + [(jug1, jug2)]))  # Fill jug 1
-        queue.append((jug1, jug2_capacity, steps + [(jug1, jug2)]))  # Fill jug 2
-        queue.append((0, jug2, steps + [(jug1, jug2)]))              # Empty jug 1
-        queue.append((jug1, 0, steps + [(jug1, jug2)]))              # Empty jug 2
-
-        # Pour from jug 1 to jug 2
-        transfer = min(jug1, jug2_capacity - jug2)
-        queue.append((jug1 - transfer, jug2 + transfer, steps + [(jug1, jug2)]))
-
-        # Pour from jug 2 to jug 1
-        transfer = min(jug2, jug1_capacity - jug1)
-        queue.append((jug1 + transfer, jug2 - transfer, steps + [(jug1, jug2)]))
+# The Water Jug Problem with any number of jugs as a search problem (see search-core/search.py)
+class MultiJugProblem(Problem):
+    def __init__(self, capacities, target_amount):
+        """
+        :param capacities: Capacity of every jug (in liters).
+        :param target_amount: Amount to measure in any one jug.
+        """
+        self.capacities = tuple(capacities)
+        self.target_amount = target_amount
+
+    def initial(self):
+        return (0,) * len(self.capacities)  # All jugs empty
+
+    def is_goal(self, state):
+        return self.target_amount in state
+
+    def successors(self, state):
+        """Returns the states reachable with one fill, empty or pour, each costing one step."""
+        result = []
+        for i, capacity in enumerate(self.capacities):  # Fill jug i
+            result.append((state[:i] + (capacity,) + state[i + 1:], 1))
+        for i in range(len(state)):  # Empty jug i
+            result.append((state[:i] + (0,) + state[i + 1:], 1))
+        for i, j in itertools.permutations(range(len(state)), 2):  # Pour from jug i to jug j
+            transfer = min(state[i], self.capacities[j] - state[j])
+            jugs = list(state)
+            jugs[i] -= transfer
+            jugs[j] += transfer
+            result.append((tuple(jugs), 1))
+        return result
+
+    def key(self, state):
+        key = 0
+        for amount, capacity in zip(state, self.capacities):  # Mixed radix, one digit per jug
+            key = key * (capacity + 1) + amount
+        return key
+
+    def state(self, key):
+        amounts = []
+        for capacity in reversed(self.capacities):
+            key, amount = divmod(key, capacity + 1)
+            amounts.append(amount)
+        return tuple(reversed(amounts))
+
+# The classic two-jug problem
+class WaterJugProblem(MultiJugProblem):
+    def __init__(self, jug1_capacity, jug2_capacity, target_amount):
+        super().__init__((jug1_capacity, jug2_capacity), target_amount)
 
-    return None  # If no solution is found
+# BFS implementation for Water Jug Problem
+def bfs_water_jug(jug1_capacity, jug2_capacity, target_amount, stats=None):
+    """
+    Solves the Water Jug Problem with BFS, which finds a solution with the fewest steps.
+    :param stats: Optional SearchStats to report the search's work into.
+    :return: List of (jug 1, jug 2) states from the empty jugs to the target, or None if there is no solution.
+    """
+    steps, _ = search(WaterJugProblem(jug1_capacity, jug2_capacity, target_amount), 'bfs', stats=stats)
+    return steps
 
 # DFS implementation for Water Jug Problem
-def dfs_water_jug(jug1_capacity, jug2_capacity, target_amount):
-    stack = [(0, 0, [])]  # Initial state: both jugs empty and an empty list for steps
-    visited_states = set()  # Set to track visited states
+def dfs_water_jug(jug1_capacity, jug2_capacity, target_amount, stats=None):
+    """
+    Solves the Water Jug Problem with DFS.
+    Unlike search()'s 'dfs', which drops a state when it is generated again, every successor is pushed and duplicates
+    are dropped when popped, so a state is expanded through the most recent way it was reached. This keeps the steps
+    of the original DFS; parent pointers, set when a state is expanded, replace the path copied into every entry.
+    :param stats: Optional SearchStats to report the search's work into.
+    :return: List of (jug 1, jug 2) states from the empty jugs to the target, or None if there is no solution.
+    """
+    problem = WaterJugProblem(jug1_capacity, jug2_capacity, target_amount)
+    if stats is not None:
+        stats.start()
+    expanded = generated = duplicates = max_frontier = 0
+    parents = {}  # Parent store of the expanded states: key -> (parent key, steps from the start)
+    stack = [(problem.initial(), None, 0)]  # (state, key of the state it was pushed from, steps from the start)
+    steps = None
 
     while stack:
-        jug1, jug2, steps = stack.pop()
-
-        if jug1 == target_amount or jug2 == target_amount:
-            steps.append((jug1, jug2))
-            return steps
-
-        if is_visited(visited_states, (jug1, jug2)):
+        state, parent_key, depth = stack.pop()
+        state_key = problem.key(state)
+        if problem.is_goal(state):  # Goal states are never expanded, so this does not overwrite a parent pointer
+            parents[state_key] = (parent_key, depth)
+            steps = rebuild_path(problem, parents, state_key)
+            break
+        if state_key in parents:
+            duplicates += 1
             continue
-
-        visited_states.add((jug1, jug2))
-
-        # Generate all possible next states and push them to the stack
-        stack.append((jug1_capacity, jug2, steps + [(jug1, jug2)]))  # Fill jug 1
-        stack.append((jug1, jug2_capacity, steps + [(jug1, jug2)]))  # Fill jug 2
-        stack.append((0, jug2, steps + [(jug1, jug2)]))              # Empty jug 1
-        stack.append((jug1, 0, steps + [(jug1, jug2)]))              # Empty jug 2
-
-        # Pour from jug 1 to jug 2
-        transfer = min(jug1, jug2_capacity - jug2)
-        stack.append((jug1 - transfer, jug2 + transfer, steps + [(jug1, jug2)]))
-
-        # Pour from jug 2 to jug 1
-        transfer = min(jug2, jug1_capacity - jug1)
-        stack.append((jug1 + transfer, jug2 - transfer, steps + [(jug1, jug2)]))
-
-    return None  # If no solution is found
+        parents[state_key] = (parent_key, depth)
+        expanded += 1
+        for child, cost in problem.successors(state):
+            generated += 1
+            stack.append((child, state_key, depth + cost))
+        max_frontier = max(max_frontier, len(stack))
+
+    if stats is not None:
+        stats.add(expanded, generated, duplicates, max_frontier)
+        stats.stop()
+    return steps
 
 # Main function to test both BFS and DFS approaches
 def main():
@@ -83,19 +118,23 @@ def main():
 
     # Solve using BFS
     print("Solving using BFS:")
-    bfs_solution = bfs_water_jug(jug1_capacity, jug2_capacity, target_amount)
+    bfs_stats = SearchStats('water_jug_bfs')
+    bfs_solution = bfs_water_jug(jug1_capacity, jug2_capacity, target_amount, stats=bfs_stats)
     if bfs_solution:
         display_steps(bfs_solution)
     else:
         print("No solution found using BFS.")
+    print(bfs_stats.to_json())
 
     print("\nSolving using DFS:")
     # Solve using DFS
-    dfs_solution = dfs_water_jug(jug1_capacity, jug2_capacity, target_amount)
+    dfs_stats = SearchStats('water_jug_dfs')
+    dfs_solution = dfs_water_jug(jug1_capacity, jug2_capacity, target_amount, stats=dfs_stats)
     if dfs_solution:
         display_steps(dfs_solution)
     else:
         print("No solution found using DFS.")
+    print(dfs_stats.to_json())
 
 # Run the main function
 if __name__ == "__main__":